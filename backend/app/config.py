@@ -13,6 +13,98 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Caché de usuarios autenticados por proceso (0 = consultar la BD en cada petición)
+    AUTH_USER_CACHE_TTL_SECONDS: int = 30
+
+    # bcrypt en un pool de hilos propio (no ocupa el threadpool de FastAPI)
+    PASSWORD_HASH_ROUNDS: int = 12           # hashes con menos rondas se rehashean al iniciar sesión
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 32       # en espera; con la cola llena se responde 429
+
+    # Pool de procesos para renderizar documentos
+    # 0 = un proceso por núcleo (se multiplica por cada worker de uvicorn)
+    RENDER_POOL_SIZE: int = 0
+    # Los procesos se reciclan después de N documentos por proceso (0 = nunca)
+    RENDER_POOL_MAX_TASKS_PER_CHILD: int = 200
+
+    # Cola de generación asíncrona (tabla generation_jobs)
+    JOB_WORKERS: int = 2              # trabajos simultáneos por proceso de API
+    JOB_POLL_SECONDS: float = 2.0     # cada cuánto se revisa la cola sin avisos
+    JOB_LEASE_SECONDS: int = 300      # un trabajo "procesando" más viejo se reintenta
+    JOB_MAX_ATTEMPTS: int = 3
+
+    # Generación en lote (POST /api/minutes/batch)
+    BATCH_MAX_UNITS: int = 500
+
+    # Almacenamiento de documentos generados: "local" o "s3" (requiere boto3)
+    STORAGE_BACKEND: str = "local"
+    STORAGE_LOCAL_DIR: Optional[str] = None  # por defecto generated_documents/
+    S3_BUCKET: str = ""
+    S3_PREFIX: str = ""
+    S3_ENDPOINT_URL: Optional[str] = None    # p. ej. http://localhost:9000 para MinIO
+    S3_ACCESS_KEY: Optional[str] = None
+    S3_SECRET_KEY: Optional[str] = None
+    S3_REGION: Optional[str] = None
+
+    # Descargas: "python" (la API envía el archivo), "x-accel" (nginx) o
+    # "x-sendfile" (Apache/lighttpd); ver app/services/storage.py
+    DOWNLOAD_MODE: str = "python"
+    DOWNLOAD_ACCEL_PREFIX: str = "/_documentos/"   # location internal de nginx con alias a STORAGE_LOCAL_DIR
+
+    # Retención: se borran los archivos más viejos (0 = sin límite)
+    STORAGE_RETENTION_DAYS: int = 0
+    STORAGE_QUOTA_MB: int = 0
+    STORAGE_RETENTION_INTERVAL_MINUTES: int = 60
+
+    # Guardar en el storage las minutas que se entregan en la respuesta
+    # (se escribe en segundo plano; False = solo se entregan, sin descarga posterior)
+    PERSIST_DOCUMENTS: bool = True
+
+    # Caché de documentos renderizados (clave = hash del payload + versión de plantilla)
+    RENDER_CACHE_DIR: Optional[str] = None   # por defecto <STORAGE_LOCAL_DIR>/.cache
+    RENDER_CACHE_MAX_MB: int = 512           # 0 = desactivada
+
+    # Buscador de plantillas: cada cuánto se comprueba si otro proceso cambió templates
+    TEMPLATE_INDEX_CHECK_SECONDS: float = 5.0
+
+    # Log de accesos LOPDP: cola en memoria escrita en lotes por una tarea de fondo
+    ACCESS_LOG_FLUSH_MS: int = 500
+    ACCESS_LOG_BATCH_SIZE: int = 200
+    ACCESS_LOG_QUEUE_SIZE: int = 10000       # con la cola llena las entradas van al archivo de respaldo
+    # Archivo de respaldo; cada proceso escribe <nombre>.<pid>.jsonl (por defecto backend/access_log_pendiente.jsonl)
+    ACCESS_LOG_FALLBACK_FILE: Optional[str] = None
+    # Archivo histórico: los meses completos más viejos que N días pasan a
+    # segmentos comprimidos y se borran de la tabla (0 = desactivado)
+    ACCESS_LOG_ARCHIVE_AFTER_DAYS: int = 0
+    ACCESS_LOG_ARCHIVE_DIR: Optional[str] = None    # por defecto backend/access_log_archive/
+    ACCESS_LOG_ARCHIVE_BATCH_ROWS: int = 2000       # filas por bloque comprimido y por DELETE
+    ACCESS_LOG_ARCHIVE_INTERVAL_HOURS: int = 24
+
+    # Blobs comprimidos y deduplicados por hash (Template.contenido, Minute.contract_data)
+    BLOB_COMPRESSION: str = "zstd"           # "zstd" (requiere zstandard, si falta no arranca) o "zlib"
+    BLOB_CHUNK_MIN_BYTES: int = 2048         # objetos/listas/textos JSON desde este tamaño van en blob propio
+    BLOB_CACHE_MB: int = 32                  # blobs ya descomprimidos en memoria (0 = sin caché)
+
+    # Compresión de respuestas (br si está instalado brotli, si no gzip)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_BYTES: int = 1024        # respuestas menores van sin comprimir
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    # Tipos (prefijos de Content-Type, separados por coma) que ya vienen comprimidos
+    COMPRESSION_SKIP_TYPES: str = (
+        "application/vnd.openxmlformats-officedocument,application/zip,application/gzip,"
+        "application/octet-stream,application/pdf,image/,audio/,video/,text/event-stream"
+    )
+
+    # Logging: DEBUG incluye los payloads completos de las peticiones
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"                 # "text" o "json"
+    LOG_FILE: Optional[str] = None           # por defecto stdout
+
+    # Monitor de bloqueos del event loop (0 = desactivado)
+    LOOP_MONITOR_INTERVAL_SECONDS: float = 10.0
+    LOOP_MONITOR_RESOLUTION_MS: int = 50
+    LOOP_LAG_WARN_MS: int = 250              # registrar la ruta más lenta desde este atraso
     
     class Config:
         env_file = ".env"
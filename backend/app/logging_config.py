@@ -0,0 +1,79 @@
+"""
+Logging de la aplicación.
+
+Los módulos usan logging.getLogger(__name__); todos cuelgan del logger "app".
+Los registros pasan por un QueueHandler (solo encola, sin I/O en el hilo de
+la petición) y un QueueListener en segundo plano los escribe en stdout o en
+LOG_FILE, en texto o JSON (LOG_FORMAT).
+
+Los volcados de payload completos se emiten solo con LOG_LEVEL=DEBUG y se
+protegen con logger.isEnabledFor(logging.DEBUG) para no serializar nada en
+producción.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+
+from app.config import settings
+
+_listener = None
+
+# Atributos estándar de LogRecord: lo demás viene de extra={...}
+_RESERVADOS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro; los campos de extra={...} se agregan tal cual"""
+
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _RESERVADOS and not clave.startswith("_"):
+                data[clave] = valor
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _handler_destino() -> logging.Handler:
+    if settings.LOG_FILE:
+        handler = logging.handlers.WatchedFileHandler(settings.LOG_FILE, encoding="utf-8")
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s"))
+    return handler
+
+
+def setup_logging():
+    """Configura el logger "app" (idempotente; también se llama en los procesos del render_pool)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    cola = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(cola, _handler_destino(), respect_handler_level=True)
+    _listener.start()
+
+    logger = logging.getLogger("app")
+    logger.handlers = [logging.handlers.QueueHandler(cola)]
+    logger.setLevel(settings.LOG_LEVEL.upper())
+    logger.propagate = False
+
+
+def shutdown_logging():
+    """Vacía la cola antes de salir"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,16 +1,67 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.models import party, system_user, document, minute, company, template, registration_token, access_log  # noqa: F401
+from app.models import party, system_user, document, minute, company, template, registration_token, access_log, generation_job, blob  # noqa: F401
 from app.database import engine, Base
-from app.routes import auth, users, parties, documents, minutes, companies, templates, registration
+from app.routes import auth, users, parties, documents, minutes, companies, templates, registration, jobs, access_logs
+from app.services.render_pool import render_pool
+from app.services.job_queue import job_queue
+from app.services.render_cache import render_cache
+from app.services.storage import retention_loop
+from app.services.loop_monitor import loop_monitor
+from app.services.user_cache import user_cache
+from app.services.template_index import template_index
+from app.services.blob_store import blob_store
+from app.services.access_log_writer import access_log_writer
+from app.services.access_log_archive import archive_loop
+from app.services.password_hasher import password_hasher, HasherSaturado
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.loop_lag import LoopLagMiddleware
+from app.config import settings
+from app.utils import metrics
+from app.logging_config import setup_logging, shutdown_logging
+
+setup_logging()
 
 # Crear tablas
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Arranque: levantar procesos de renderizado y workers de la cola
+    render_pool.start()
+    password_hasher.start()
+    job_queue.start()
+    access_log_writer.start()
+    loop_monitor.start()
+    retencion = None
+    if settings.STORAGE_RETENTION_DAYS or settings.STORAGE_QUOTA_MB:
+        retencion = asyncio.create_task(retention_loop())
+    archivo = None
+    if settings.ACCESS_LOG_ARCHIVE_AFTER_DAYS:
+        archivo = asyncio.create_task(archive_loop())
+    yield
+    # Apagado
+    if retencion:
+        retencion.cancel()
+    if archivo:
+        archivo.cancel()
+    await loop_monitor.stop()
+    await job_queue.stop()
+    await access_log_writer.stop()
+    render_pool.shutdown()
+    password_hasher.shutdown()
+    shutdown_logging()
+
+
 app = FastAPI(
     title="Sistema Notarial API",
     description="API para generación de matrices y minutas notariales",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 import os
@@ -31,8 +82,24 @@ app.add_middleware(
     allow_credentials=False if "*" in cors_origins else True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],   # GET condicional de users, companies y templates
 )
 
+# Compresión br/gzip de las respuestas (ver app/middleware/compression.py)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Tiempo que cada petición retiene el event loop
+app.add_middleware(LoopLagMiddleware)
+
+@app.exception_handler(HasherSaturado)
+async def hasher_saturado(request, exc: HasherSaturado):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Demasiados inicios de sesión simultáneos, intente de nuevo en unos segundos"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 # Registrar rutas
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -42,6 +109,8 @@ app.include_router(minutes.router, prefix="/api")
 app.include_router(companies.router)
 app.include_router(templates.router)
 app.include_router(registration.router)
+app.include_router(jobs.router)
+app.include_router(access_logs.router)
 
 @app.get("/")
 def root():
@@ -53,4 +122,10 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy", "render_cache": render_cache.stats(), "user_cache": user_cache.stats(),
+            "template_index": template_index.stats(), "blob_store": blob_store.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Métricas en formato de texto de Prometheus"""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -5,6 +5,7 @@ from typing import List
 from app.database import get_db
 from app.models.system_user import SystemUser
 from app.utils.auth import decode_access_token
+from app.services.user_cache import user_cache
 
 security = HTTPBearer()
 
@@ -33,8 +34,12 @@ def get_current_user(
             detail="Token inválido"
         )
     
-    # Buscar usuario en BD
-    user = db.query(SystemUser).filter(SystemUser.username == username).first()
+    # Buscar usuario en la caché o en BD
+    user = user_cache.get(db, username)
+    if user is None:
+        user = db.query(SystemUser).filter(SystemUser.username == username).first()
+        if user is not None and user.activo:
+            user_cache.put(user)
     if user is None or not user.activo:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
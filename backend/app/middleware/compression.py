@@ -0,0 +1,224 @@
+"""
+Middleware ASGI que comprime las respuestas con Brotli o gzip.
+
+Las notarías con enlaces lentos reciben JSON grandes (el contenido de una
+plantilla, el listado de minutas, los tokens de registro): comprimidos
+ocupan una fracción. El codec se negocia con Accept-Encoding: br si el
+cliente lo acepta y el paquete brotli está instalado, si no gzip.
+
+No se comprime:
+- lo que ya viene comprimido (.docx, PDF, zip, imágenes: COMPRESSION_SKIP_TYPES)
+  ni lo que ya trae Content-Encoding o Content-Range
+- las respuestas menores a COMPRESSION_MIN_BYTES (el encabezado gzip y la
+  CPU no compensan), ni los 204/304 ni HEAD
+
+Una respuesta de un solo mensaje se comprime entera (en un hilo desde
+_HILO_BYTES, para no retener el event loop); una que llega por partes se
+comprime parte por parte, vaciando el compresor en cada una para que el
+cliente no espere al final. El tiempo de CPU de cada respuesta queda en
+response_compression_seconds, por codec, para ajustar el nivel.
+"""
+import asyncio
+import gzip
+import time
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config import settings
+from app.utils import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+compression_seconds = metrics.registry.histogram(
+    "response_compression_seconds",
+    "Tiempo de CPU comprimiendo cada respuesta",
+    ("encoding",),
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+compression_bytes_total = metrics.registry.counter(
+    "response_compression_bytes_total", "Bytes de las respuestas comprimidas, antes y después", ("encoding", "kind")
+)
+compression_total = metrics.registry.counter(
+    "response_compression_total", "Respuestas según la decisión de comprimir", ("result",)
+)
+
+_HILO_BYTES = 256 * 1024
+_SIN_CUERPO = {204, 304}
+
+
+def negociar(accept_encoding: str, br_disponible: bool = brotli is not None):
+    """Codec a usar según Accept-Encoding ("br", "gzip" o None)"""
+    pesos = {}
+    for parte in accept_encoding.split(","):
+        codec, _, params = parte.strip().partition(";")
+        codec = codec.strip().lower()
+        if not codec:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        pesos[codec] = q
+
+    comodin = pesos.get("*", 0.0)
+    candidatos = [("br", pesos.get("br", comodin))] if br_disponible else []
+    candidatos.append(("gzip", pesos.get("gzip", pesos.get("x-gzip", comodin))))
+    # A igual peso gana el primero (br)
+    codec, q = max(candidatos, key=lambda c: c[1])
+    return codec if q > 0 else None
+
+
+class _Compresor:
+    """Compresor incremental de un codec, con el tiempo de CPU acumulado"""
+
+    def __init__(self, codec: str):
+        self.codec = codec
+        self.cpu = 0.0
+        self.entrada = self.salida = 0
+        if codec == "br":
+            self._c = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._c = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def _medir(self, fn, *args) -> bytes:
+        inicio = time.thread_time()
+        out = fn(*args)
+        self.cpu += time.thread_time() - inicio
+        self.salida += len(out)
+        return out
+
+    def parte(self, data: bytes) -> bytes:
+        self.entrada += len(data)
+        if self.codec == "br":
+            return self._medir(lambda d: self._c.process(d) + self._c.flush(), data)
+        return self._medir(lambda d: self._c.compress(d) + self._c.flush(zlib.Z_SYNC_FLUSH), data)
+
+    def fin(self) -> bytes:
+        return self._medir(self._c.finish if self.codec == "br" else self._c.flush)
+
+    def registrar(self):
+        compression_seconds.observe(self.cpu, encoding=self.codec)
+        compression_bytes_total.inc(self.entrada, encoding=self.codec, kind="in")
+        compression_bytes_total.inc(self.salida, encoding=self.codec, kind="out")
+
+
+def comprimir(codec: str, data: bytes) -> bytes:
+    """Comprime un cuerpo completo y registra las métricas"""
+    inicio = time.thread_time()
+    if codec == "br":
+        out = brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    else:
+        out = gzip.compress(data, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+    compression_seconds.observe(time.thread_time() - inicio, encoding=codec)
+    compression_bytes_total.inc(len(data), encoding=codec, kind="in")
+    compression_bytes_total.inc(len(out), encoding=codec, kind="out")
+    return out
+
+
+def _debilitar(headers: MutableHeaders):
+    """Los bytes comprimidos ya no son los del ETag fuerte: pasa a W/"..." """
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = "W/" + etag
+
+
+class CompressionMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.min_bytes = settings.COMPRESSION_MIN_BYTES
+        self.skip_types = tuple(
+            t.strip().lower() for t in settings.COMPRESSION_SKIP_TYPES.split(",") if t.strip()
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        codec = negociar(Headers(scope=scope).get("accept-encoding", ""))
+        inicio = None
+        compresor = None
+        pasar = False
+
+        async def enviar(message):
+            nonlocal inicio, compresor, pasar
+            if message["type"] == "http.response.start":
+                inicio = message
+                return
+            if message["type"] != "http.response.body" or inicio is None:
+                await send(message)
+                return
+
+            if pasar:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            mas = message.get("more_body", False)
+
+            if compresor is not None:
+                fin = compresor.parte(body)
+                if not mas:
+                    fin += compresor.fin()
+                    compresor.registrar()
+                await send({"type": "http.response.body", "body": fin, "more_body": mas})
+                return
+
+            # Primer mensaje del cuerpo: decidir
+            headers = MutableHeaders(raw=inicio["headers"])
+            resultado = self._decidir(inicio["status"], headers, body, mas, codec)
+            if resultado != "compressed":
+                compression_total.inc(result=resultado)
+                if resultado == "not_accepted":
+                    headers.add_vary_header("Accept-Encoding")
+                elif inicio["status"] == 304 and codec is not None:
+                    # El mismo ETag que tendría el 200 comprimido
+                    _debilitar(headers)
+                pasar = True
+                await send(inicio)
+                await send(message)
+                return
+
+            compression_total.inc(result="compressed")
+            headers["Content-Encoding"] = codec
+            headers.add_vary_header("Accept-Encoding")
+            _debilitar(headers)
+
+            if not mas:
+                if len(body) >= _HILO_BYTES:
+                    body = await asyncio.to_thread(comprimir, codec, body)
+                else:
+                    body = comprimir(codec, body)
+                headers["Content-Length"] = str(len(body))
+                await send(inicio)
+                await send({"type": "http.response.body", "body": body, "more_body": False})
+                return
+
+            # Cuerpo por partes: tamaño final desconocido
+            del headers["Content-Length"]
+            compresor = _Compresor(codec)
+            await send(inicio)
+            await send({"type": "http.response.body", "body": compresor.parte(body), "more_body": True})
+
+        await self.app(scope, receive, enviar)
+
+    def _decidir(self, status: int, headers: MutableHeaders, body: bytes, mas: bool, codec) -> str:
+        if status in _SIN_CUERPO or "content-encoding" in headers or "content-range" in headers:
+            return "skipped"
+        tipo = headers.get("content-type", "").lower()
+        if tipo.startswith(self.skip_types):
+            return "skipped"
+        largo = headers.get("content-length")
+        tamano = int(largo) if largo and largo.isdigit() else (None if mas else len(body))
+        if tamano is not None and tamano < self.min_bytes:
+            return "small"
+        if codec is None:
+            return "not_accepted"
+        return "compressed"
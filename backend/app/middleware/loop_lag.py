@@ -0,0 +1,60 @@
+"""
+Middleware ASGI que mide cuánto retiene el event loop cada petición.
+
+La corrutina de la petición se ejecuta paso a paso: cada paso es el código
+que corre entre dos await, durante el cual ninguna otra petición avanza.
+Al terminar se informa el paso más largo a loop_monitor, con la ruta
+(plantilla de path, p. ej. "GET /api/minutes/{minute_id}").
+"""
+import asyncio
+import time
+
+from app.services.loop_monitor import loop_monitor
+
+
+class _Cronometrado:
+    """Envuelve una corrutina y guarda la duración del paso más largo"""
+
+    def __init__(self, coro):
+        self._coro = coro
+        self.maximo = 0.0
+
+    def __await__(self):
+        pasos = self._coro.__await__()
+        enviar, valor = pasos.send, None
+        while True:
+            inicio = time.perf_counter()
+            try:
+                pendiente = enviar(valor)
+            except StopIteration as fin:
+                self.maximo = max(self.maximo, time.perf_counter() - inicio)
+                return fin.value
+            self.maximo = max(self.maximo, time.perf_counter() - inicio)
+            try:
+                valor = yield pendiente
+                enviar = pasos.send
+            except GeneratorExit:
+                # close() desde afuera: cerrar la corrutina envuelta, no reenviarle la excepción
+                self._coro.close()
+                raise
+            except (Exception, asyncio.CancelledError) as e:
+                # Cancelaciones y excepciones lanzadas dentro del await
+                enviar, valor = pasos.throw, e
+
+
+class LoopLagMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cronometro = _Cronometrado(self.app(scope, receive, send))
+        try:
+            await cronometro
+        finally:
+            route = scope.get("route")
+            ruta = f"{scope['method']} {route.path}" if route is not None else "sin ruta"
+            loop_monitor.record(ruta, cronometro.maximo)
@@ -1,16 +1,47 @@
-from sqlalchemy import Column, String, DateTime
+import uuid
+
+from sqlalchemy import Column, String, DateTime, BINARY, Index
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 from app.database import Base
+from app.utils.uuid7 import uuid7
+
+
+class UUIDBinario(TypeDecorator):
+    """uuid.UUID guardado en BINARY(16) (acepta también el texto del UUID)"""
+    impl = BINARY(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, bytes):
+            return value
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value.bytes
+
+    def process_result_value(self, value, dialect):
+        return uuid.UUID(bytes=value) if value is not None else None
 
 
 class AccessLog(Base):
     """Log de acceso a datos personales — cumplimiento LOPDP"""
     __tablename__ = "access_logs"
 
-    id = Column(String(36), primary_key=True)
+    # UUIDv7: ordenado por tiempo, los INSERT van al final del índice
+    # (migración desde uuid4 en texto: migrate_access_log_ids.py)
+    id = Column(UUIDBinario, primary_key=True, default=uuid7)
     usuario = Column(String(100), nullable=False)
     accion = Column(String(20), nullable=False)
     entidad = Column(String(50), nullable=False)
     entidad_id = Column(String(50), nullable=False)
     ip_address = Column(String(45), nullable=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Consultas de auditoría (GET /api/access-logs): "quién vio la cédula X"
+    # y "qué consultó el usuario Y", ordenadas por fecha. InnoDB agrega el id
+    # al final de cada índice, así que cubren el orden (timestamp, id) del cursor.
+    # En tablas existentes se crean con migrate_indexes.py
+    __table_args__ = (
+        Index("ix_access_logs_entidad_timestamp", "entidad", "entidad_id", "timestamp"),
+        Index("ix_access_logs_usuario_timestamp", "usuario", "timestamp"),
+    )
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, ForeignKey
+from sqlalchemy.dialects import mysql
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class Blob(Base):
+    """Fragmento JSON comprimido, direccionado por el SHA-256 de su contenido (app/services/blob_store.py)"""
+    __tablename__ = "blobs"
+
+    hash = Column(String(64), primary_key=True)       # sha256 hex del JSON sin comprimir
+    codec = Column(String(10), nullable=False)        # 'zstd' o 'zlib'
+    dict_id = Column(Integer, ForeignKey("blob_dictionaries.id"), nullable=True)  # diccionario usado al comprimir
+    data = Column(LargeBinary().with_variant(mysql.MEDIUMBLOB(), "mysql"), nullable=False)
+    raw_size = Column(Integer, nullable=False)        # bytes antes de comprimir
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class BlobDictionary(Base):
+    """Diccionario de compresión armado con muestras de formularios; no se modifica nunca"""
+    __tablename__ = "blob_dictionaries"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    data = Column(LargeBinary, nullable=False)        # hasta 32 KB de JSON de ejemplo
+    samples = Column(Integer, nullable=False)         # formularios usados para armarlo
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
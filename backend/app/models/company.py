@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Enum as SQLEnum, Numeric, Boolean, Integer
+from sqlalchemy import Column, String, DateTime, Enum as SQLEnum, Numeric, Boolean, Integer, event
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -75,4 +75,11 @@ class Company(Base):
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Sube en cada UPDATE; es el ETag de GET /api/companies/{ruc} (ver Party.version)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+
+@event.listens_for(Company, "before_update")
+def _subir_version(mapper, connection, target):
+    target.version = Company.version + 1
@@ -23,6 +23,7 @@ class Document(Base):
     
     # Archivo
     file_path = Column(String(500), nullable=True)
+    file_hash = Column(String(64), nullable=True)  # SHA-256 del .docx (ETag de la descarga)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
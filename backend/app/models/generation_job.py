@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Enum as SQLEnum, ForeignKey
+from datetime import datetime
+import enum
+import uuid
+from app.database import Base
+
+
+class JobType(enum.Enum):
+    MINUTA = "minuta"
+    PROMESA = "promesa"
+    MATRIZ = "matriz"
+
+
+class JobStatus(enum.Enum):
+    PENDIENTE = "pendiente"
+    PROCESANDO = "procesando"
+    COMPLETADO = "completado"
+    ERROR = "error"
+
+
+class GenerationJob(Base):
+    """Cola persistente de generación de documentos (sobrevive a reinicios)"""
+    __tablename__ = "generation_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_type = Column(SQLEnum(JobType), nullable=False)
+    status = Column(SQLEnum(JobStatus), nullable=False, default=JobStatus.PENDIENTE, index=True)
+
+    # Datos de entrada
+    payload = Column(JSON, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+
+    # Resultado
+    file_path = Column(String(500), nullable=True)
+    file_hash = Column(String(64), nullable=True)  # SHA-256 del .docx (ETag de la descarga)
+    result_id = Column(Integer, nullable=True)  # id de Minute o Document
+    error = Column(Text, nullable=True)
+
+    created_by = Column(Integer, ForeignKey("system_users.id"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -13,11 +13,18 @@ class Minute(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     minute_type = Column(SQLEnum(MinuteType), nullable=False)
-    contract_data = Column(Text, nullable=False)  # JSON stringified
+    contract_data_hash = Column(String(64), ForeignKey("blobs.hash"), nullable=False)  # JSON en blobs (app/services/blob_store.py)
     file_path = Column(String(500))
+    file_hash = Column(String(64), nullable=True)  # SHA-256 del .docx (ETag de la descarga)
     created_by = Column(Integer, ForeignKey("system_users.id"), nullable=False)  # Cambio aquí
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
-    creator = relationship("SystemUser", back_populates="minutes")  # Cambio aquí
\ No newline at end of file
+    creator = relationship("SystemUser", back_populates="minutes")  # Cambio aquí
+
+    # Listado paginado del usuario (GET /api/minutes/), más recientes primero
+    # En tablas existentes se crea con migrate_indexes.py
+    __table_args__ = (
+        Index("ix_minutes_created_by_created_at", "created_by", "created_at"),
+    )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Date, Enum as SQLEnum, ForeignKey, DateTime, Numeric, Integer, Boolean
+from sqlalchemy import Column, String, Date, Enum as SQLEnum, ForeignKey, DateTime, Numeric, Integer, Boolean, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -82,6 +82,9 @@ class Party(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Sube en cada UPDATE; es el ETag de GET /api/users/{document_number}
+    # (en tablas existentes: migrate_row_versions.py)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     # Relaciones
     partner = relationship(
@@ -89,4 +92,10 @@ class Party(Base):
         foreign_keys=[partner_document_number],
         remote_side="Party.document_number",
         backref="spouse_of"
-    )
\ No newline at end of file
+    )
+
+
+@event.listens_for(Party, "before_update")
+def _subir_version(mapper, connection, target):
+    # version = version + 1 en el mismo UPDATE: dos guardados simultáneos suben los dos
+    target.version = Party.version + 1
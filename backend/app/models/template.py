@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -16,8 +16,8 @@ class Template(Base):
     tipo_contrato = Column(String(50), nullable=False)    # 'compraventa', 'promesa', 'poder'
     tipo_documento = Column(String(20), nullable=False)   # 'minuta', 'matriz'
 
-    # Contenido completo del formulario
-    contenido = Column(JSON, nullable=False)
+    # Contenido completo del formulario: hash del JSON en blobs (app/services/blob_store.py)
+    contenido_hash = Column(String(64), ForeignKey('blobs.hash'), nullable=False)
 
     # Usuario que la creó
     creado_por = Column(Integer, ForeignKey('system_users.id'), nullable=False)
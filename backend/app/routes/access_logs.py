@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.middleware.auth import is_admin
+from app.models.access_log import AccessLog
+from app.models.system_user import SystemUser
+from app.schemas.access_log import AccessLogPage
+from app.services.access_log_archive import access_log_archive
+from app.utils.pagination import codificar_cursor, decodificar_cursor
+
+router = APIRouter(prefix="/api/access-logs", tags=["access-logs"])
+
+
+@router.get("/", response_model=AccessLogPage)
+def list_access_logs(
+    entidad: Optional[str] = Query(None, description="parties, companies..."),
+    entidad_id: Optional[str] = Query(None, description="Cédula, pasaporte o RUC"),
+    usuario: Optional[str] = Query(None),
+    accion: Optional[str] = Query(None),
+    desde: Optional[datetime] = Query(None, description="Incluido"),
+    hasta: Optional[datetime] = Query(None, description="Excluido"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    archivo: bool = Query(True, description="Buscar también en el archivo histórico"),
+    db: Session = Depends(get_db),
+    current_user: SystemUser = Depends(is_admin)
+):
+    """
+    GET /api/access-logs - Auditoría LOPDP (solo admin)
+    Quién consultó un dato (entidad + entidad_id) o qué consultó un usuario,
+    de lo más reciente a lo más antiguo. Para seguir, pasar next_cursor.
+    Cuando la tabla no alcanza para llenar la página se sigue por los
+    segmentos del archivo histórico (app/services/access_log_archive.py).
+    """
+    # Cada consulta debe entrar por uno de los índices de access_logs
+    if entidad_id and not entidad:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Para filtrar por entidad_id indique también la entidad"
+        )
+    if not entidad and not usuario:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Indique la entidad (y entidad_id) o el usuario a consultar"
+        )
+
+    query = db.query(AccessLog)
+    if entidad:
+        query = query.filter(AccessLog.entidad == entidad)
+    if entidad_id:
+        query = query.filter(AccessLog.entidad_id == entidad_id)
+    if usuario:
+        query = query.filter(AccessLog.usuario == usuario)
+    if accion:
+        query = query.filter(AccessLog.accion == accion)
+    if desde:
+        query = query.filter(AccessLog.timestamp >= desde)
+    if hasta:
+        query = query.filter(AccessLog.timestamp < hasta)
+
+    antes_de = None
+    if cursor:
+        ultimo = decodificar_cursor(cursor)
+        try:
+            antes_de = (ultimo["t"], ultimo["id"])
+        except KeyError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+        ts, id_ = antes_de
+        # timestamp <= t da el rango sobre el índice; el OR desempata por id
+        query = query.filter(
+            AccessLog.timestamp <= ts,
+            or_(AccessLog.timestamp < ts, and_(AccessLog.timestamp == ts, AccessLog.id < id_)),
+        )
+
+    entradas = [
+        {
+            "id": str(log.id),
+            "usuario": log.usuario,
+            "accion": log.accion,
+            "entidad": log.entidad,
+            "entidad_id": log.entidad_id,
+            "ip_address": log.ip_address,
+            "timestamp": log.timestamp,
+            "archivado": False,
+        }
+        for log in query.order_by(AccessLog.timestamp.desc(), AccessLog.id.desc()).limit(limit + 1)
+    ]
+
+    # Lo archivado es más viejo que lo que queda en la tabla: solo hace
+    # falta cuando la tabla no llenó la página
+    if archivo and len(entradas) <= limit:
+        vistos = {e["id"] for e in entradas}
+        archivadas = access_log_archive.buscar(
+            entidad=entidad, entidad_id=entidad_id, usuario=usuario, accion=accion,
+            desde=desde, hasta=hasta, antes_de=antes_de, limite=limit + 1,
+        )
+        entradas += [
+            {**e, "archivado": True} for e in archivadas if e["id"] not in vistos
+        ]
+        entradas.sort(key=lambda e: (e["timestamp"], e["id"]), reverse=True)
+
+    next_cursor = None
+    if len(entradas) > limit:
+        entradas = entradas[:limit]
+        next_cursor = codificar_cursor(t=entradas[-1]["timestamp"], id=entradas[-1]["id"])
+
+    return {"items": entradas, "next_cursor": next_cursor}
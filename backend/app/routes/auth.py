@@ -1,3 +1,5 @@
+import asyncio
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from datetime import timedelta
@@ -9,17 +11,40 @@ from app.schemas.system_user import (
     VerifyResponse,
     UserData
 )
-from app.utils.auth import verify_password, create_access_token
+from app.utils.auth import create_access_token
 from app.middleware.auth import get_current_user
+from app.services.password_hasher import password_hasher
+from app.services.user_cache import user_cache
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
+
+def buscar_usuario(db: Session, username: str):
+    return db.query(SystemUser).filter(SystemUser.username == username).first()
+
+
+def guardar_rehash(db: Session, user: SystemUser, nuevo_hash: str):
+    """Reemplaza un hash de una configuración más débil; si falla, el login sigue"""
+    try:
+        user.password = nuevo_hash
+        db.commit()
+        db.refresh(user)
+    except Exception as e:
+        db.rollback()
+        logger.warning("No se pudo actualizar el hash de %s: %s", user.username, e)
+        return
+    user_cache.invalidate(user.username)
+
+
 @router.post("/login", response_model=LoginResponse)
-def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     """
     POST /api/auth/login - Login de usuario
     Devuelve: { message, token, user: {id, nombre, username, rol, iniciales} }
+    bcrypt corre en password_hasher (429 si su cola está llena)
     """
     
     # Validar que vengan los datos (FastAPI ya valida, pero por consistencia)
@@ -30,9 +55,7 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
         )
     
     # Buscar el usuario
-    user = db.query(SystemUser).filter(
-        SystemUser.username == login_data.username
-    ).first()
+    user = await asyncio.to_thread(buscar_usuario, db, login_data.username)
     
     if not user:
         raise HTTPException(
@@ -48,11 +71,14 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
         )
     
     # Verificar la contraseña
-    if not verify_password(login_data.password, user.password):
+    valido, nuevo_hash = await password_hasher.verify(login_data.password, user.password)
+    if not valido:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales inválidas"
         )
+    if nuevo_hash:
+        await asyncio.to_thread(guardar_rehash, db, user, nuevo_hash)
     
     # Crear el token JWT
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -86,19 +112,10 @@ def verify_token(
 ):
     """
     GET /api/auth/verify - Verificar token válido
-    El usuario ya viene del middleware de autenticación
+    El usuario ya viene del middleware de autenticación (activo y al día:
+    la caché de usuarios se invalida al modificarlo)
     """
-    
-    # Buscar usuario actualizado en BD
-    user = db.query(SystemUser).filter(
-        SystemUser.id == current_user.id
-    ).first()
-    
-    if not user or not user.activo:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Usuario no válido"
-        )
+    user = current_user
     
     return {
         "user": {
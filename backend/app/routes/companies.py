@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.company import Company
 from app.schemas.company import CompanyCreate, CompanyUpdate, CompanyResponse
 from app.middleware.auth import get_current_user
 from app.models.system_user import SystemUser
+from app.utils.etag import agregar_etag, calcular_etag, coincide, no_modificado
 
 router = APIRouter(prefix="/api/companies", tags=["companies"])
 
@@ -45,22 +46,30 @@ def save_company(
 @router.get("/{ruc}", response_model=CompanyResponse)
 def get_company(
     ruc: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: SystemUser = Depends(get_current_user)
 ):
     """
     GET /api/companies/{ruc} - Obtener empresa por RUC
+    Con If-None-Match responde 304 si la empresa no cambió.
     """
     try:
-        company = db.query(Company).filter(Company.ruc == ruc).first()
+        version = db.query(Company.version).filter(Company.ruc == ruc).scalar()
 
-        if not company:
+        if version is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Empresa no encontrada"
             )
 
-        return company
+        etag = calcular_etag("companies", ruc, version)
+        if coincide(request, etag):
+            return no_modificado(etag)
+        agregar_etag(response, etag)
+
+        return db.query(Company).filter(Company.ruc == ruc).first()
 
     except HTTPException:
         raise
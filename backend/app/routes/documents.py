@@ -1,16 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.orm import Session, load_only
 from app.database import get_db
 from app.models.system_user import SystemUser
 from app.models.document import Document
 from app.schemas.document import GenerateMatrizRequest, GenerateMatrizResponse
 from app.middleware.auth import get_current_user
-from app.services.document_generator import generate_matriz_compraventa
-import os
+from app.services import storage
+from app.services.render_cache import render_cache
+from app.utils import metrics
+from app.utils.descargas import descarga
+import time
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/documents", tags=["documents"])
 
+def identificador(p):
+    """Devuelve RUC para empresas o cédula para personas"""
+    if p.get('esEmpresa'):
+        return p.get('ruc', '')
+    return p.get('cedula', '')
+
+
+def preparar_datos_matriz(request: GenerateMatrizRequest) -> dict:
+    """Datos para docxtpl (mismo formato que usabas en frontend)"""
+    return {
+        "numeroProtocolo": request.numero_protocolo,
+        "tipoContrato": request.tipo_contrato.upper(),
+        "cuantia": request.cuantia,
+        "fechaActual": request.fecha_escritura,
+        "notario": request.notario.nombre,
+        "tituloNotario": request.notario.titulo,
+        "matrizador": request.matrizador,
+        "isAnyTerceraEdad": request.is_any_tercera_edad,
+        
+        # Concuerdo
+        "needsConcuerdo": request.needs_concuerdo,
+        "datosConcuerdo": request.datos_concuerdo.dict() if request.datos_concuerdo else None,
+        
+        # Abogado
+        "abogadoNombre": request.abogado.nombre_abogado,
+        "abogadoNumeroMatricula": request.abogado.numero_matricula,
+        "abogadoTipoMatricula": request.abogado.tipo_matricula,
+        "abogadoProvincia": request.abogado.provincia_abogado,
+        "abogadoEsMujer": request.abogado.genero_abogado.lower() == "femenino",
+        "abogadoTexto": request.abogado.minuta_texto,
+        
+        # Participantes
+        "participantesList": request.participantes_list,
+        "vendedoresList": request.vendedores_list,
+        "compradoresList": request.compradores_list,
+    }
+
+
+def preparar_registro_matriz(request: GenerateMatrizRequest) -> dict:
+    """Campos del registro Document (auditoría), sin usuario ni archivo"""
+    return {
+        "document_type": request.tipo_contrato,
+        "protocol_number": request.numero_protocolo,
+        "amount": request.cuantia,
+        "notario": request.notario.nombre,
+        "matrizador": request.matrizador,
+        "parties_data": {
+            "vendedores": [identificador(v) for v in request.vendedores_list],
+            "compradores": [identificador(c) for c in request.compradores_list]
+        },
+    }
+
+
 @router.post("/generate-matriz", response_model=GenerateMatrizResponse)
 def generate_matriz(
     request: GenerateMatrizRequest,
@@ -20,64 +78,31 @@ def generate_matriz(
     """
     Genera matriz de compraventa
     """
+    inicio = time.perf_counter()
     try:
-        # Preparar datos para docxtpl (mismo formato que usabas en frontend)
-        datos_para_docx = {
-            "numeroProtocolo": request.numero_protocolo,
-            "tipoContrato": request.tipo_contrato.upper(),
-            "cuantia": request.cuantia,
-            "fechaActual": request.fecha_escritura,
-            "notario": request.notario.nombre,
-            "tituloNotario": request.notario.titulo,
-            "matrizador": request.matrizador,
-            "isAnyTerceraEdad": request.is_any_tercera_edad,
-            
-            # Concuerdo
-            "needsConcuerdo": request.needs_concuerdo,
-            "datosConcuerdo": request.datos_concuerdo.dict() if request.datos_concuerdo else None,
-            
-            # Abogado
-            "abogadoNombre": request.abogado.nombre_abogado,
-            "abogadoNumeroMatricula": request.abogado.numero_matricula,
-            "abogadoTipoMatricula": request.abogado.tipo_matricula,
-            "abogadoProvincia": request.abogado.provincia_abogado,
-            "abogadoEsMujer": request.abogado.genero_abogado.lower() == "femenino",
-            "abogadoTexto": request.abogado.minuta_texto,
-            
-            # Participantes
-            "participantesList": request.participantes_list,
-            "vendedoresList": request.vendedores_list,
-            "compradoresList": request.compradores_list,
-        }
+        datos_para_docx = preparar_datos_matriz(request)
         
-        # Generar documento
-        file_path = generate_matriz_compraventa(datos_para_docx)
+        # Generar documento (en el pool de procesos; este hilo sólo espera)
+        key, contenido = render_cache.render_sync("matriz", datos_para_docx)
+
+        # La respuesta es un enlace de descarga: el archivo se guarda antes de responder
+        file_path = storage.new_key(f"matriz_{request.numero_protocolo}")
+        render_cache.save(key, contenido, file_path, "matriz")
         
         # Guardar registro en BD
-        def identificador(p):
-            """Devuelve RUC para empresas o cédula para personas"""
-            if p.get('esEmpresa'):
-                return p.get('ruc', '')
-            return p.get('cedula', '')
-
         document = Document(
-            document_type=request.tipo_contrato,
-            protocol_number=request.numero_protocolo,
-            amount=request.cuantia,
+            **preparar_registro_matriz(request),
             generated_by=current_user.id,
-            notario=request.notario.nombre,
-            matrizador=request.matrizador,
-            parties_data={
-                "vendedores": [identificador(v) for v in request.vendedores_list],
-                "compradores": [identificador(c) for c in request.compradores_list]
-            },
-            file_path=file_path
+            file_path=file_path,
+            file_hash=storage.hash_contenido(contenido)
         )
         
         db.add(document)
-        db.commit()
+        with metrics.stage_timer("matriz", "db_commit"):
+            db.commit()
         db.refresh(document)
         
+        metrics.document_request_seconds.observe(time.perf_counter() - inicio, document_type="matriz")
         return {
             "message": "Documento generado exitosamente",
             "document_id": document.id,
@@ -86,22 +111,25 @@ def generate_matriz(
         }
         
     except Exception as e:
-        print(f"Error generando documento: {e}")
+        logger.exception("Error generando documento")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al generar documento: {str(e)}"
         )
 
-@router.get("/download/{document_id}")
+@router.api_route("/download/{document_id}", methods=["GET", "HEAD"])
 def download_document(
     document_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: SystemUser = Depends(get_current_user)
 ):
     """
-    Descargar documento generado
+    Descargar documento generado (admite Range, If-None-Match y HEAD)
     """
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = db.query(Document).options(
+        load_only(Document.id, Document.protocol_number, Document.file_path, Document.file_hash)
+    ).filter(Document.id == document_id).first()
     
     if not document:
         raise HTTPException(
@@ -109,16 +137,6 @@ def download_document(
             detail="Documento no encontrado"
         )
     
-    if not os.path.exists(document.file_path):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Archivo no encontrado en el servidor"
-        )
-    
     filename = f"matriz_{document.protocol_number}.docx"
     
-    return FileResponse(
-        document.file_path,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        filename=filename
-    )
\ No newline at end of file
+    return descarga(request, document.file_path, filename, document.file_hash)
\ No newline at end of file
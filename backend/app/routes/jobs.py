@@ -0,0 +1,143 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.orm import Session
+from typing import Dict, Any
+
+from app.database import get_db
+from app.middleware.auth import get_current_user
+from app.models.system_user import SystemUser
+from app.models.generation_job import GenerationJob, JobStatus, JobType
+from app.schemas.document import GenerateMatrizRequest
+from app.schemas.generation_job import JobSubmitResponse, JobStatusResponse
+from app.routes.documents import preparar_datos_matriz, preparar_registro_matriz
+from app.services.job_queue import job_queue
+from app.utils.descargas import descarga
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+def _submit_response(job: GenerationJob) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status.value,
+        "status_url": f"/api/jobs/{job.id}",
+        "download_url": f"/api/jobs/{job.id}/download",
+    }
+
+
+def _get_own_job(job_id: str, db: Session, current_user: SystemUser) -> GenerationJob:
+    job = db.query(GenerationJob).filter(
+        GenerationJob.id == job_id,
+        GenerationJob.created_by == current_user.id
+    ).first()
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trabajo no encontrado"
+        )
+    return job
+
+
+@router.post("/generate-minuta", response_model=JobSubmitResponse, status_code=status.HTTP_202_ACCEPTED)
+def submit_minuta(
+    data: Dict[Any, Any],
+    db: Session = Depends(get_db),
+    current_user: SystemUser = Depends(get_current_user)
+):
+    """
+    POST /api/jobs/generate-minuta - Encolar minuta de compraventa
+    Devuelve el id del trabajo sin esperar el renderizado.
+    """
+    if data.get('tipoContrato') != 'compraventa':
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Solo se soporta tipo de contrato 'compraventa' por ahora"
+        )
+
+    job = job_queue.submit(db, JobType.MINUTA, data, current_user.id)
+    return _submit_response(job)
+
+
+@router.post("/generate-promesa", response_model=JobSubmitResponse, status_code=status.HTTP_202_ACCEPTED)
+def submit_promesa(
+    data: Dict[Any, Any],
+    db: Session = Depends(get_db),
+    current_user: SystemUser = Depends(get_current_user)
+):
+    """
+    POST /api/jobs/generate-promesa - Encolar minuta de promesa de compraventa
+    """
+    job = job_queue.submit(db, JobType.PROMESA, data, current_user.id)
+    return _submit_response(job)
+
+
+@router.post("/generate-matriz", response_model=JobSubmitResponse, status_code=status.HTTP_202_ACCEPTED)
+def submit_matriz(
+    request: GenerateMatrizRequest,
+    db: Session = Depends(get_db),
+    current_user: SystemUser = Depends(get_current_user)
+):
+    """
+    POST /api/jobs/generate-matriz - Encolar matriz de compraventa
+    """
+    payload = {
+        "datos": preparar_datos_matriz(request),
+        "registro": preparar_registro_matriz(request),
+    }
+    job = job_queue.submit(db, JobType.MATRIZ, payload, current_user.id)
+    return _submit_response(job)
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+def get_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: SystemUser = Depends(get_current_user)
+):
+    """
+    GET /api/jobs/{job_id} - Estado del trabajo
+    pendiente → procesando → completado | error
+    """
+    job = _get_own_job(job_id, db, current_user)
+
+    return {
+        "job_id": job.id,
+        "job_type": job.job_type.value,
+        "status": job.status.value,
+        "attempts": job.attempts,
+        "result_id": job.result_id,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "download_url": f"/api/jobs/{job.id}/download" if job.status == JobStatus.COMPLETADO else None,
+    }
+
+
+@router.api_route("/{job_id}/download", methods=["GET", "HEAD"])
+def download_job(
+    job_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: SystemUser = Depends(get_current_user)
+):
+    """
+    GET /api/jobs/{job_id}/download - Descargar el documento generado
+    Responde 409 si el trabajo todavía no terminó. Admite Range, If-None-Match y HEAD.
+    """
+    job = _get_own_job(job_id, db, current_user)
+
+    if job.status != JobStatus.COMPLETADO:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"El trabajo está en estado '{job.status.value}'"
+        )
+
+    if job.job_type == JobType.MATRIZ:
+        filename = f"matriz_{job.payload['registro']['protocol_number']}.docx"
+    elif job.job_type == JobType.PROMESA:
+        filename = f"promesa_compraventa_{job.result_id}.docx"
+    else:
+        filename = f"minuta_{job.result_id}.docx"
+
+    return descarga(request, job.file_path, filename, job.file_hash)
@@ -1,30 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from typing import Dict, Any
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, load_only
+from typing import Dict, Any, Optional
+from datetime import datetime
+import asyncio
 import json
-import os
+import logging
+import time
 
 from app.database import get_db
 from app.middleware.auth import get_current_user  # Cambio aquí
 from app.models.system_user import SystemUser
 from app.models.minute import Minute, MinuteType
-from app.services.minuta_generator import generate_minuta_compraventa
-from app.services.promesa_minuta_generator import generate_promesa_minuta_compraventa
+from app.models.template import Template
+from app.schemas.minute import MinutePage
+from app.config import settings
+from app.routes.templates import check_template_access
+from app.services import storage
+from app.services.blob_store import blob_store
+from app.services.render_cache import render_cache
+from app.services.batch_generator import BatchError, leer_unidades, stream_zip
+from app.utils import metrics
+from app.utils.descargas import descarga
+from app.utils.pagination import codificar_cursor, decodificar_cursor
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/minutes", tags=["minutes"])
 
+# Nada bloqueante corre en el event loop: las rutas que solo consultan la BD
+# son síncronas (FastAPI las ejecuta en su threadpool) y las async llaman a
+# la BD y al disco con asyncio.to_thread.
+
+
+def docx_response(content: bytes, filename: str) -> Response:
+    """Entrega el .docx renderizado en memoria, sin leerlo de disco"""
+    return Response(
+        content=content,
+        media_type=storage.DOCX_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def guardar_minuta(db: Session, tipo: str, data: dict, output_path, contenido: bytes, user_id: int) -> Minute:
+    """Inserta el registro de la minuta generada (bloqueante)"""
+    new_minute = Minute(
+        minute_type=MinuteType.COMPRAVENTA_INMUEBLE,
+        contract_data_hash=blob_store.guardar(db, data),
+        file_path=output_path,
+        file_hash=storage.hash_contenido(contenido) if output_path else None,
+        created_by=user_id
+    )
+    db.add(new_minute)
+    with metrics.stage_timer(tipo, "db_commit"):
+        db.commit()
+    db.refresh(new_minute)
+    return new_minute
+
+
 @router.post("/generate-minuta")
 async def generate_minuta(
     data: Dict[Any, Any],
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: SystemUser = Depends(get_current_user)
 ):
     """
     Generar minuta de compraventa de inmueble
     """
+    inicio = time.perf_counter()
     try:
-        print("DEBUG - Datos recibidos:", json.dumps(data, indent=2, ensure_ascii=False))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Datos recibidos (minuta): %s", json.dumps(data, indent=2, ensure_ascii=False))
         
         # Validar tipo de contrato
         if data.get('tipoContrato') != 'compraventa':
@@ -33,53 +81,94 @@ async def generate_minuta(
                 detail="Solo se soporta tipo de contrato 'compraventa' por ahora"
             )
         
-        # Generar el documento
-        output_path = generate_minuta_compraventa(data, current_user)
-        
-        if not output_path or not os.path.exists(output_path):
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Error al generar el documento"
-            )
+        # Generar el documento en memoria
+        key, contenido = await render_cache.render("minuta", data)
+        output_path = storage.new_key(f"minuta_compraventa_{current_user.id}") if settings.PERSIST_DOCUMENTS else None
         
         # Guardar en la base de datos
-        new_minute = Minute(
-            minute_type=MinuteType.COMPRAVENTA_INMUEBLE,
-            contract_data=json.dumps(data, ensure_ascii=False),
-            file_path=output_path,
-            created_by=current_user.id
-        )
-        db.add(new_minute)
-        db.commit()
-        db.refresh(new_minute)
+        new_minute = await asyncio.to_thread(guardar_minuta, db, "minuta", data, output_path, contenido, current_user.id)
+        
+        # El archivo se escribe después de enviar la respuesta
+        background_tasks.add_task(render_cache.persist, key, contenido, output_path, "minuta")
         
         # Retornar el archivo
-        return FileResponse(
-            path=output_path,
-            filename=f"minuta_{new_minute.id}.docx",
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        )
+        metrics.document_request_seconds.observe(time.perf_counter() - inicio, document_type="minuta")
+        return docx_response(contenido, f"minuta_{new_minute.id}.docx")
         
     except Exception as e:
-        print(f"ERROR al generar minuta: {str(e)}")
+        logger.exception("Error al generar minuta")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al generar minuta: {str(e)}"
         )
 
-@router.get("/")
-async def list_minutes(
+@router.get("/", response_model=MinutePage)
+def list_minutes(
+    tipo: Optional[str] = Query(None, description="compraventa_inmueble, poderes"),
+    desde: Optional[datetime] = Query(None, description="Creadas desde (incluido)"),
+    hasta: Optional[datetime] = Query(None, description="Creadas hasta (excluido)"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
     db: Session = Depends(get_db),
     current_user: SystemUser = Depends(get_current_user)  # Cambio aquí
 ):
     """
-    Listar todas las minutas del usuario actual
+    Listar las minutas del usuario actual, más recientes primero
+    Solo el resumen: contract_data no se lee de la BD (está en GET /minutes/{id}).
+    Para seguir, pasar next_cursor.
     """
-    minutes = db.query(Minute).filter(Minute.created_by == current_user.id).all()
-    return minutes
+    query = db.query(Minute).options(
+        load_only(Minute.id, Minute.minute_type, Minute.file_path, Minute.created_at, Minute.updated_at)
+    ).filter(Minute.created_by == current_user.id)
+
+    if tipo:
+        try:
+            query = query.filter(Minute.minute_type == MinuteType(tipo))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Tipo inválido. Debe ser uno de: {', '.join(t.value for t in MinuteType)}"
+            )
+    if desde:
+        query = query.filter(Minute.created_at >= desde)
+    if hasta:
+        query = query.filter(Minute.created_at < hasta)
+
+    if cursor:
+        ultimo = decodificar_cursor(cursor)
+        try:
+            ts, id_ = ultimo["t"], ultimo["id"]
+        except KeyError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+        # Mismo keyset que /api/access-logs: rango sobre el índice y desempate por id
+        query = query.filter(
+            Minute.created_at <= ts,
+            or_(Minute.created_at < ts, and_(Minute.created_at == ts, Minute.id < id_)),
+        )
+
+    minutes = query.order_by(Minute.created_at.desc(), Minute.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(minutes) > limit:
+        minutes = minutes[:limit]
+        next_cursor = codificar_cursor(t=minutes[-1].created_at, id=minutes[-1].id)
+
+    return {
+        "items": [
+            {
+                "id": m.id,
+                "minute_type": m.minute_type.value,
+                "created_at": m.created_at,
+                "updated_at": m.updated_at,
+                "download_url": f"/api/minutes/download/{m.id}" if m.file_path else None,
+            }
+            for m in minutes
+        ],
+        "next_cursor": next_cursor,
+    }
 
 @router.get("/{minute_id}")
-async def get_minute(
+def get_minute(
     minute_id: int,
     db: Session = Depends(get_db),
     current_user: SystemUser = Depends(get_current_user)  # Cambio aquí
@@ -98,18 +187,30 @@ async def get_minute(
             detail="Minuta no encontrada"
         )
     
-    return minute
+    # contract_data sigue saliendo como el JSON en texto que se guardaba antes
+    return {
+        "id": minute.id,
+        "minute_type": minute.minute_type,
+        "contract_data": json.dumps(blob_store.cargar(db, minute.contract_data_hash), ensure_ascii=False),
+        "file_path": minute.file_path,
+        "created_by": minute.created_by,
+        "created_at": minute.created_at,
+        "updated_at": minute.updated_at,
+    }
 
-@router.get("/download/{minute_id}")
-async def download_minute(
+@router.api_route("/download/{minute_id}", methods=["GET", "HEAD"])
+def download_minute(
     minute_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: SystemUser = Depends(get_current_user)  # Cambio aquí
 ):
     """
-    Descargar una minuta
+    Descargar una minuta (admite Range, If-None-Match y HEAD)
     """
-    minute = db.query(Minute).filter(
+    minute = db.query(Minute).options(
+        load_only(Minute.id, Minute.file_path, Minute.file_hash)
+    ).filter(
         Minute.id == minute_id,
         Minute.created_by == current_user.id
     ).first()
@@ -120,58 +221,100 @@ async def download_minute(
             detail="Minuta no encontrada"
         )
     
-    if not os.path.exists(minute.file_path):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Archivo no encontrado"
-        )
-    
-    return FileResponse(
-        path=minute.file_path,
-        filename=f"minuta_{minute.id}.docx",
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-    )
+    return descarga(request, minute.file_path, f"minuta_{minute.id}.docx", minute.file_hash)
 
 @router.post("/generate-promesa")
 async def generate_promesa(
     data: Dict[Any, Any],
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: SystemUser = Depends(get_current_user)
 ):
     """
     Generar minuta de promesa de compraventa
     """
+    inicio = time.perf_counter()
     try:
-        import json
-        print("DEBUG PROMESA - Datos recibidos:", json.dumps(data, indent=2, ensure_ascii=False))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Datos recibidos (promesa): %s", json.dumps(data, indent=2, ensure_ascii=False))
 
-        output_path = generate_promesa_minuta_compraventa(data, current_user)
+        key, contenido = await render_cache.render("promesa", data)
+        output_path = storage.new_key(f"minuta_promesa_{current_user.id}") if settings.PERSIST_DOCUMENTS else None
 
-        if not output_path or not os.path.exists(output_path):
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Error al generar el documento"
-            )
+        new_minute = await asyncio.to_thread(guardar_minuta, db, "promesa", data, output_path, contenido, current_user.id)
 
-        new_minute = Minute(
-            minute_type=MinuteType.COMPRAVENTA_INMUEBLE,
-            contract_data=json.dumps(data, ensure_ascii=False),
-            file_path=output_path,
-            created_by=current_user.id
-        )
-        db.add(new_minute)
-        db.commit()
-        db.refresh(new_minute)
+        background_tasks.add_task(render_cache.persist, key, contenido, output_path, "promesa")
 
-        return FileResponse(
-            path=output_path,
-            filename=f"promesa_compraventa_{new_minute.id}.docx",
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        )
+        metrics.document_request_seconds.observe(time.perf_counter() - inicio, document_type="promesa")
+        return docx_response(contenido, f"promesa_compraventa_{new_minute.id}.docx")
 
     except Exception as e:
-        print(f"ERROR al generar promesa: {str(e)}")
+        logger.exception("Error al generar promesa")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al generar promesa: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+def buscar_plantilla(db: Session, template_id: int):
+    """(plantilla, contenido) o (None, None); el contenido se lee del blob store en el mismo hilo"""
+    plantilla = db.query(Template).filter(Template.id == template_id).first()
+    if not plantilla:
+        return None, None
+    return plantilla, blob_store.cargar(db, plantilla.contenido_hash)
+
+
+@router.post("/batch")
+async def generate_batch(
+    template_id: int = Form(..., description="Plantilla guardada con el contenido común"),
+    archivo: UploadFile = File(..., description="CSV o JSONL con una fila por unidad"),
+    db: Session = Depends(get_db),
+    current_user: SystemUser = Depends(get_current_user)
+):
+    """
+    Generar minutas en lote a partir de una plantilla guardada.
+    Cada fila del archivo reemplaza claves del contenido (compradores, predios,
+    precioTotal...). Devuelve un ZIP que se transmite a medida que cada
+    documento termina; las unidades con error se listan en ERRORES.txt.
+    """
+    plantilla, contenido = await asyncio.to_thread(buscar_plantilla, db, template_id)
+
+    if not plantilla:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Plantilla no encontrada"
+        )
+
+    check_template_access(current_user, plantilla.tipo_documento)
+
+    if plantilla.tipo_documento != "minuta" or plantilla.tipo_contrato not in ("compraventa", "promesa"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Solo se soportan plantillas de minuta de compraventa o promesa"
+        )
+
+    try:
+        unidades = await asyncio.to_thread(leer_unidades, await archivo.read(), archivo.filename or "")
+    except BatchError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if not unidades:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El archivo no tiene unidades"
+        )
+
+    if len(unidades) > settings.BATCH_MAX_UNITS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo {settings.BATCH_MAX_UNITS} unidades por lote"
+        )
+
+    base = dict(contenido)
+    base['tipoContrato'] = plantilla.tipo_contrato
+
+    return StreamingResponse(
+        stream_zip(plantilla.tipo_contrato, base, unidades),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="minutas_plantilla_{plantilla.id}.zip"'}
+    )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.party import Party
@@ -6,6 +6,7 @@ from app.schemas.party import PartyCreate, PartyResponse, PartyWithPartner
 from app.middleware.auth import get_current_user
 from app.models.system_user import SystemUser
 from app.utils.access_log import registrar_acceso
+from app.utils.etag import agregar_etag, calcular_etag, coincide, no_modificado
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
@@ -34,16 +35,16 @@ def save_user(
             for field, value in user_data.model_dump().items():
                 setattr(existing_user, field, value)
             db.flush()
-            registrar_acceso(db, current_user.username, "actualizar", "parties", user_data.document_number, get_client_ip(request))
             db.commit()
+            registrar_acceso(current_user.username, "actualizar", "parties", user_data.document_number, get_client_ip(request))
             db.refresh(existing_user)
             return existing_user
 
         new_user = Party(**user_data.model_dump())
         db.add(new_user)
         db.flush()
-        registrar_acceso(db, current_user.username, "crear", "parties", user_data.document_number, get_client_ip(request))
         db.commit()
+        registrar_acceso(current_user.username, "crear", "parties", user_data.document_number, get_client_ip(request))
         db.refresh(new_user)
         return new_user
 
@@ -56,20 +57,40 @@ def save_user(
 def get_user(
     document_number: str,
     request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: SystemUser = Depends(get_current_user)
 ):
-    """GET /api/users/:documentNumber — Obtener compareciente por número de documento"""
+    """
+    GET /api/users/:documentNumber — Obtener compareciente por número de documento
+    Con If-None-Match responde 304 si ni el compareciente ni su cónyuge cambiaron.
+    """
     try:
-        user = db.query(Party).filter(
+        # Primero solo las versiones: si el navegador ya tiene estos datos no se lee la fila
+        version = db.query(Party.version, Party.marital_status, Party.partner_document_number).filter(
             Party.document_number == document_number
         ).first()
 
-        if not user:
+        if not version:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
 
-        registrar_acceso(db, current_user.username, "ver", "parties", document_number, get_client_ip(request))
-        db.commit()
+        partes = [document_number, version.version]
+        if version.marital_status.value == 'casado' and version.partner_document_number:
+            partes += [version.partner_document_number, db.query(Party.version).filter(
+                Party.document_number == version.partner_document_number
+            ).scalar()]
+        etag = calcular_etag("parties", *partes)
+
+        # Un 304 también es una consulta del dato: se registra igual
+        registrar_acceso(current_user.username, "ver", "parties", document_number, get_client_ip(request))
+
+        if coincide(request, etag):
+            return no_modificado(etag)
+        agregar_etag(response, etag)
+
+        user = db.query(Party).filter(
+            Party.document_number == document_number
+        ).first()
 
         partner = None
         if user.marital_status.value == 'casado' and user.partner_document_number:
@@ -180,6 +180,7 @@ def registrar_cliente(
     """
     token_obj = _verificar_token_obj(token, db)
     ip = request.headers.get("X-Forwarded-For", request.client.host if request.client else None)
+    accesos = []   # (entidad, entidad_id): se registran después del commit
 
     try:
         tipo = payload.get("tipo", "persona")
@@ -191,7 +192,7 @@ def registrar_cliente(
 
             token_obj.usado = True
             token_obj.party_document_number = empresa.ruc
-            registrar_acceso(db, "registro_publico", "registro_publico", "companies", empresa.ruc, ip)
+            accesos.append(("companies", empresa.ruc))
 
         else:
             # Persona natural
@@ -208,15 +209,17 @@ def registrar_cliente(
                 titular_data_dict['partner_document_number'] = conyugue_raw.get('document_number')
                 titular = _upsert_party(db, PartyCreate(**titular_data_dict))
 
-                registrar_acceso(db, "registro_publico", "registro_publico", "parties", conyugue.document_number, ip)
+                accesos.append(("parties", conyugue.document_number))
             else:
                 titular = _upsert_party(db, titular_data)
 
             token_obj.usado = True
             token_obj.party_document_number = titular.document_number
-            registrar_acceso(db, "registro_publico", "registro_publico", "parties", titular.document_number, ip)
+            accesos.append(("parties", titular.document_number))
 
         db.commit()
+        for entidad, entidad_id in accesos:
+            registrar_acceso("registro_publico", "registro_publico", entidad, entidad_id, ip)
         return {"message": "Datos registrados correctamente"}
 
     except HTTPException:
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
 from app.models.template import Template
 from app.schemas.template import TemplateCreate, TemplateResponse, TemplateSearchResult
 from app.middleware.auth import get_current_user, require_role
+from app.services.blob_store import blob_store
+from app.services.template_index import template_index
+from app.utils.etag import agregar_etag, calcular_etag, coincide, no_modificado
 from app.models.system_user import SystemUser
 
 router = APIRouter(prefix="/api/templates", tags=["templates"])
@@ -24,6 +27,20 @@ def check_template_access(current_user: SystemUser, tipo_documento: str):
         )
 
 
+def con_contenido(plantilla: Template, contenido: dict) -> dict:
+    """Plantilla con su contenido ya leído del blob store (forma de TemplateResponse)"""
+    return {
+        "id": plantilla.id,
+        "nombre": plantilla.nombre,
+        "nombre_vendedor": plantilla.nombre_vendedor,
+        "tipo_contrato": plantilla.tipo_contrato,
+        "tipo_documento": plantilla.tipo_documento,
+        "contenido": contenido,
+        "creado_por": plantilla.creado_por,
+        "creado_at": plantilla.creado_at,
+    }
+
+
 @router.post("/", response_model=TemplateResponse, status_code=status.HTTP_201_CREATED)
 def create_template(
     template_data: TemplateCreate,
@@ -42,13 +59,14 @@ def create_template(
             nombre_vendedor=template_data.nombre_vendedor,
             tipo_contrato=template_data.tipo_contrato,
             tipo_documento=template_data.tipo_documento,
-            contenido=template_data.contenido,
+            contenido_hash=blob_store.guardar(db, template_data.contenido),
             creado_por=current_user.id
         )
         db.add(nueva)
         db.commit()
         db.refresh(nueva)
-        return nueva
+        template_index.invalidar()
+        return con_contenido(nueva, template_data.contenido)
 
     except Exception as e:
         db.rollback()
@@ -68,49 +86,32 @@ def search_templates(
 ):
     """
     GET /api/templates - Buscar plantillas
-    Búsqueda case-insensitive por nombre o nombre_vendedor.
+    Búsqueda por nombre o nombre_vendedor, sin distinguir mayúsculas ni tildes.
     Filtros opcionales por tipo_documento y tipo_contrato.
     """
     # Verificar acceso si se filtra por tipo_documento
     if tipo_documento:
         check_template_access(current_user, tipo_documento)
 
-    query = db.query(Template)
-
-    # Filtro por tipo_documento
-    if tipo_documento:
-        query = query.filter(Template.tipo_documento == tipo_documento)
-
-    # Filtro por tipo_contrato
-    if tipo_contrato:
-        query = query.filter(Template.tipo_contrato == tipo_contrato)
-
-    # Búsqueda case-insensitive por nombre o nombre_vendedor
-    if q and q.strip():
-        termino = f"%{q.strip()}%"
-        query = query.filter(
-            Template.nombre.ilike(termino) |
-            Template.nombre_vendedor.ilike(termino)
-        )
-
-    # Ordenar por más recientes primero
-    query = query.order_by(Template.creado_at.desc())
-
-    # Limitar resultados para el buscador
-    resultados = query.limit(10).all()
-
-    return resultados
+    # Índice en memoria con las columnas del resumen (app/services/template_index.py)
+    return template_index.buscar(
+        db, q=q, tipo_documento=tipo_documento, tipo_contrato=tipo_contrato, limite=10
+    )
 
 
 @router.get("/{template_id}", response_model=TemplateResponse)
 def get_template(
     template_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: SystemUser = Depends(get_current_user)
 ):
     """
     GET /api/templates/{id} - Obtener plantilla completa con contenido
     Se llama cuando el usuario selecciona una plantilla del buscador.
+    Las plantillas no se editan y contenido_hash es el hash del contenido:
+    con If-None-Match responde 304 sin leer el contenido del blob store.
     """
     plantilla = db.query(Template).filter(Template.id == template_id).first()
 
@@ -122,7 +123,12 @@ def get_template(
 
     check_template_access(current_user, plantilla.tipo_documento)
 
-    return plantilla
+    etag = calcular_etag("templates", plantilla.id, plantilla.contenido_hash)
+    if coincide(request, etag):
+        return no_modificado(etag)
+    agregar_etag(response, etag)
+
+    return con_contenido(plantilla, blob_store.cargar(db, plantilla.contenido_hash))
 
 
 @router.delete("/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -146,4 +152,5 @@ def delete_template(
     check_template_access(current_user, plantilla.tipo_documento)
 
     db.delete(plantilla)
-    db.commit()
\ No newline at end of file
+    db.commit()
+    template_index.invalidar()
\ No newline at end of file
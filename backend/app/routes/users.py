@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
@@ -13,7 +14,8 @@ from app.schemas.system_user import (
     ChangePasswordRequest
 )
 from app.middleware.auth import get_current_user, is_admin
-from app.utils.auth import get_password_hash, verify_password
+from app.services.password_hasher import password_hasher
+from app.services.user_cache import user_cache
 
 router = APIRouter(prefix="/api/system-users", tags=["system-users"])
 
@@ -56,7 +58,7 @@ def create_system_user(
     new_user = SystemUser(
         nombre=user_data.nombre,
         username=user_data.username,
-        password=get_password_hash(user_data.password),
+        password=password_hasher.hash_sync(user_data.password),
         rol=UserRole[user_data.rol],  # Convertir string a enum
         iniciales=user_data.iniciales,  # 🔥 NUEVO
         activo=True
@@ -146,7 +148,7 @@ def update_system_user(
     
     # Actualizar contraseña si se proporciona
     if user_data.password is not None and user_data.password.strip():
-        user.password = get_password_hash(user_data.password)
+        user.password = password_hasher.hash_sync(user_data.password)
     
     # 🔥 NUEVO: Actualizar iniciales
     if user_data.iniciales is not None:
@@ -161,6 +163,7 @@ def update_system_user(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al actualizar usuario: {str(e)}"
         )
+    user_cache.invalidate(user.username)
     
     return {
         "message": "Usuario actualizado exitosamente",
@@ -200,11 +203,19 @@ def delete_system_user(
     
     db.delete(user)
     db.commit()
+    user_cache.invalidate(user.username)
     
     return {"message": "Usuario eliminado exitosamente"}
 
+def buscar_usuario_por_id(db: Session, id: int):
+    return db.query(SystemUser).filter(SystemUser.id == id).first()
+
+def guardar_password(db: Session, user: SystemUser, nuevo_hash: str):
+    user.password = nuevo_hash
+    db.commit()
+
 @router.put("/{id}/change-password", response_model=MessageResponse)
-def change_password(
+async def change_password(
     id: int,
     password_data: ChangePasswordRequest,
     db: Session = Depends(get_db),
@@ -213,6 +224,7 @@ def change_password(
     """
     PUT /api/system-users/:id/change-password - Cambiar contraseña
     Puede cambiarla el mismo usuario o un admin
+    bcrypt corre en password_hasher (429 si su cola está llena)
     """
     
     # Validar que vengan los datos
@@ -222,7 +234,7 @@ def change_password(
             detail="Contraseña actual y nueva contraseña son requeridas"
         )
     
-    user = db.query(SystemUser).filter(SystemUser.id == id).first()
+    user = await asyncio.to_thread(buscar_usuario_por_id, db, id)
     
     if not user:
         raise HTTPException(
@@ -239,14 +251,17 @@ def change_password(
     
     # Si no es admin, verificar la contraseña actual
     if current_user.rol.value != 'admin':
-        if not verify_password(password_data.current_password, user.password):
+        valido, _ = await password_hasher.verify(password_data.current_password, user.password)
+        if not valido:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Contraseña actual incorrecta"
             )
     
     # Actualizar contraseña
-    user.password = get_password_hash(password_data.new_password)
-    db.commit()
+    nuevo_hash = await password_hasher.hash(password_data.new_password)
+    username = user.username
+    await asyncio.to_thread(guardar_password, db, user, nuevo_hash)
+    user_cache.invalidate(username)
     
     return {"message": "Contraseña actualizada exitosamente"}
\ No newline at end of file
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class AccessLogResponse(BaseModel):
+    """Entrada del log de accesos a datos personales"""
+    id: str
+    usuario: str
+    accion: str
+    entidad: str
+    entidad_id: str
+    ip_address: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    archivado: bool = False          # viene del archivo histórico
+
+
+class AccessLogPage(BaseModel):
+    """Página de resultados; next_cursor es None en la última"""
+    items: List[AccessLogResponse]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class JobSubmitResponse(BaseModel):
+    """Respuesta inmediata al encolar una generación"""
+    job_id: str
+    status: str
+    status_url: str
+    download_url: str
+
+
+class JobStatusResponse(BaseModel):
+    """Estado de un trabajo de generación"""
+    job_id: str
+    job_type: str
+    status: str
+    attempts: int
+    result_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    download_url: Optional[str] = None
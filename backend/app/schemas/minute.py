@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class MinuteSummary(BaseModel):
+    """Minuta en el listado, sin contract_data (está en GET /api/minutes/{id})"""
+    id: int
+    minute_type: str
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    download_url: Optional[str] = None
+
+
+class MinutePage(BaseModel):
+    """Página del listado; next_cursor es None en la última"""
+    items: List[MinuteSummary]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,357 @@
+"""
+Archivo histórico del log de accesos (access_logs).
+
+La tabla solo crece. Los meses completos más viejos que
+ACCESS_LOG_ARCHIVE_AFTER_DAYS se pasan a segmentos en ACCESS_LOG_ARCHIVE_DIR
+y se borran de la BD en lotes; GET /api/access-logs sigue encontrándolos.
+
+Cada segmento es un mes (o una parte más, si llegaron filas tarde):
+- access_logs_2025-03.1.seg: bloques de ACCESS_LOG_ARCHIVE_BATCH_ROWS filas
+  en JSON por línea, cada bloque comprimido aparte con gzip, así una
+  búsqueda descomprime solo los bloques que necesita;
+- access_logs_2025-03.1.idx.json.gz: posición y rango de fechas de cada
+  bloque, y en qué bloques aparece cada entidad/entidad_id y cada usuario.
+
+El mes se toma del id (UUIDv7, ordenado por tiempo): el rango de un mes es
+un rango de la clave primaria, que se recorre sin índice extra. Primero se
+escribe el segmento y su índice (con fsync y rename), después se borran de
+la BD exactamente los ids leídos en cada bloque (una fila que llegue durante
+el archivado queda para la parte siguiente). Se asume que no se insertan
+filas con fechas de meses ya archivados (el respaldo del log se reprocesa al
+arrancar).
+"""
+import asyncio
+import fcntl
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import delete, func, select
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.access_log import AccessLog
+from app.utils import metrics
+from app.utils.uuid7 import uuid7_desde
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = Path(settings.ACCESS_LOG_ARCHIVE_DIR) if settings.ACCESS_LOG_ARCHIVE_DIR \
+    else Path(__file__).parent.parent.parent / "access_log_archive"
+
+_NOMBRE_INDICE = re.compile(r"^access_logs_(\d{4})-(\d{2})\.(\d+)\.idx\.json\.gz$")
+
+access_log_archived_rows_total = metrics.registry.counter(
+    "access_log_archived_rows_total",
+    "Filas del log de accesos pasadas al archivo histórico",
+)
+
+_tabla = AccessLog.__table__
+
+
+def _ms(anio: int, mes: int) -> int:
+    return int(datetime(anio, mes, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _mes_siguiente(anio: int, mes: int):
+    return (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+
+def _sin_zona(dt):
+    """
+    Las fechas del log son la hora de la BD sin zona. Se compara igual que
+    la consulta a la tabla (pymysql descarta la zona), así la paginación
+    sigue igual al pasar de la tabla al archivo
+    """
+    if dt is not None and dt.tzinfo is not None:
+        return dt.replace(tzinfo=None)
+    return dt
+
+
+def _fsync_dir(path: Path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AccessLogArchive:
+    def __init__(self, directorio: Path):
+        self.directorio = directorio
+        self._indices = {}   # path -> (mtime, índice)
+        self._lock = threading.Lock()
+
+    # ============================================
+    # ARCHIVAR
+    # ============================================
+
+    @contextmanager
+    def _exclusivo(self):
+        """Un solo proceso archiva a la vez (varios workers comparten el directorio)"""
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        with open(self.directorio / ".lock", "w") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def archivar(self, after_days: int = None, ahora: datetime = None) -> dict:
+        """Archiva los meses completos anteriores a ahora - after_days"""
+        after_days = settings.ACCESS_LOG_ARCHIVE_AFTER_DAYS if after_days is None else after_days
+        corte = (ahora or datetime.now(timezone.utc)) - timedelta(days=after_days)
+        corte_ms = int(corte.timestamp() * 1000)
+
+        with self._exclusivo() as propio:
+            if not propio:
+                return {"skipped": True}
+
+            db = SessionLocal()
+            try:
+                primero = db.execute(select(func.min(_tabla.c.id))).scalar()
+            finally:
+                db.close()
+            if primero is None:
+                return {"months": [], "rows": 0}
+
+            ms = primero.int >> 80
+            fecha = datetime.fromtimestamp(ms / 1000, timezone.utc)
+            anio, mes = fecha.year, fecha.month
+            meses, total = [], 0
+            while _ms(*_mes_siguiente(anio, mes)) <= corte_ms:
+                filas = self._archivar_mes(anio, mes)
+                if filas:
+                    meses.append(f"{anio:04d}-{mes:02d}")
+                    total += filas
+                anio, mes = _mes_siguiente(anio, mes)
+            return {"months": meses, "rows": total}
+
+    def _siguiente_parte(self, anio: int, mes: int) -> int:
+        partes = [
+            int(m.group(3))
+            for m in map(_NOMBRE_INDICE.match, os.listdir(self.directorio))
+            if m and (int(m.group(1)), int(m.group(2))) == (anio, mes)
+        ]
+        return max(partes, default=0) + 1
+
+    def _archivar_mes(self, anio: int, mes: int) -> int:
+        desde_id = uuid7_desde(_ms(anio, mes))
+        hasta_id = uuid7_desde(_ms(*_mes_siguiente(anio, mes)))
+        lote = settings.ACCESS_LOG_ARCHIVE_BATCH_ROWS
+
+        base = f"access_logs_{anio:04d}-{mes:02d}.{self._siguiente_parte(anio, mes)}"
+        segmento = self.directorio / f"{base}.seg"
+        indice_path = self.directorio / f"{base}.idx.json.gz"
+        tmp_segmento = segmento.with_name(segmento.name + ".tmp")
+        tmp_indice = indice_path.with_name(indice_path.name + ".tmp")
+
+        bloques = []
+        ids = []            # ids de cada bloque, para borrar exactamente lo archivado
+        por_entidad = defaultdict(set)
+        por_usuario = defaultdict(set)
+        ultimo = None
+
+        db = SessionLocal()
+        try:
+            with open(tmp_segmento, "wb") as f:
+                while True:
+                    consulta = select(_tabla).where(_tabla.c.id >= desde_id, _tabla.c.id < hasta_id)
+                    if ultimo is not None:
+                        consulta = consulta.where(_tabla.c.id > ultimo)
+                    filas = db.execute(consulta.order_by(_tabla.c.id).limit(lote)).mappings().all()
+                    if not filas:
+                        break
+                    ultimo = filas[-1]["id"]
+
+                    n = len(bloques)
+                    lineas = []
+                    for fila in filas:
+                        ts = fila["timestamp"]
+                        lineas.append(json.dumps({
+                            **fila, "id": str(fila["id"]), "timestamp": ts.isoformat() if ts else None,
+                        }, ensure_ascii=False))
+                        por_entidad[f"{fila['entidad']}/{fila['entidad_id']}"].add(n)
+                        por_usuario[fila["usuario"]].add(n)
+                    datos = gzip.compress(("\n".join(lineas) + "\n").encode("utf-8"))
+
+                    fechas = [fila["timestamp"] for fila in filas if fila["timestamp"]]
+                    bloques.append({
+                        "offset": f.tell(),
+                        "size": len(datos),
+                        "rows": len(filas),
+                        "first_id": str(filas[0]["id"]),
+                        "last_id": str(ultimo),
+                        "desde": min(fechas).isoformat() if fechas else None,
+                        "hasta": max(fechas).isoformat() if fechas else None,
+                    })
+                    ids.append([fila["id"] for fila in filas])
+                    f.write(datos)
+                f.flush()
+                os.fsync(f.fileno())
+        finally:
+            db.close()
+
+        if not bloques:
+            tmp_segmento.unlink()
+            return 0
+
+        fechas = [b[k] for b in bloques for k in ("desde", "hasta") if b[k]]
+        indice = {
+            "version": 1,
+            "month": f"{anio:04d}-{mes:02d}",
+            "segment": segmento.name,
+            "rows": sum(b["rows"] for b in bloques),
+            "desde": min(fechas) if fechas else None,
+            "hasta": max(fechas) if fechas else None,
+            "blocks": bloques,
+            "entidad": {k: sorted(v) for k, v in por_entidad.items()},
+            "usuario": {k: sorted(v) for k, v in por_usuario.items()},
+        }
+        with gzip.open(tmp_indice, "wt", encoding="utf-8") as f:
+            json.dump(indice, f, ensure_ascii=False, separators=(",", ":"))
+        with open(tmp_indice, "rb") as f:
+            os.fsync(f.fileno())
+
+        # El índice se publica al final: un segmento sin índice no existe
+        os.replace(tmp_segmento, segmento)
+        os.replace(tmp_indice, indice_path)
+        _fsync_dir(self.directorio)
+
+        # Borrar de la BD por bloques (transacciones cortas), solo los ids
+        # leídos: una fila que entre al rango después de leerlo no está en
+        # el segmento y se queda en la tabla para la próxima pasada
+        for bloque_ids in ids:
+            db = SessionLocal()
+            try:
+                db.execute(delete(_tabla).where(_tabla.c.id.in_(bloque_ids)))
+                db.commit()
+            finally:
+                db.close()
+
+        access_log_archived_rows_total.inc(indice["rows"])
+        logger.info("Log de accesos %s archivado: %d filas en %s (%d bytes)",
+                    indice["month"], indice["rows"], segmento.name, segmento.stat().st_size)
+        return indice["rows"]
+
+    # ============================================
+    # BUSCAR
+    # ============================================
+
+    def _segmentos(self):
+        """(índice, path del segmento) del más nuevo al más viejo"""
+        if not self.directorio.exists():
+            return []
+        encontrados = []
+        for nombre in os.listdir(self.directorio):
+            m = _NOMBRE_INDICE.match(nombre)
+            if m:
+                encontrados.append(((int(m.group(1)), int(m.group(2)), int(m.group(3))), nombre))
+        encontrados.sort(reverse=True)
+        return [self._indice(self.directorio / nombre) for _, nombre in encontrados]
+
+    def _indice(self, path: Path) -> dict:
+        mtime = path.stat().st_mtime
+        with self._lock:
+            cacheado = self._indices.get(path)
+            if cacheado and cacheado[0] == mtime:
+                return cacheado[1]
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            indice = json.load(f)
+        for bloque in indice["blocks"]:
+            for k in ("desde", "hasta"):
+                bloque[k] = datetime.fromisoformat(bloque[k]) if bloque[k] else None
+        indice["path"] = path.with_name(indice["segment"])
+
+        with self._lock:
+            self._indices[path] = (mtime, indice)
+        return indice
+
+    def buscar(self, entidad=None, entidad_id=None, usuario=None, accion=None,
+               desde=None, hasta=None, antes_de=None, limite: int = 50) -> list:
+        """
+        Entradas archivadas que cumplen los filtros, de la más nueva a la más
+        vieja; antes_de = (timestamp, id) de la última entrada ya devuelta
+        """
+        desde, hasta = _sin_zona(desde), _sin_zona(hasta)
+        if antes_de is not None:
+            antes_de = (_sin_zona(antes_de[0]), str(antes_de[1]))
+
+        encontradas = []
+        for indice in self._segmentos():
+            if entidad and entidad_id:
+                candidatos = indice["entidad"].get(f"{entidad}/{entidad_id}", [])
+            elif usuario:
+                candidatos = indice["usuario"].get(usuario, [])
+            else:
+                candidatos = range(len(indice["blocks"]))
+
+            # Con la página llena, solo sirven bloques más nuevos que la última
+            tope = None
+            if len(encontradas) >= limite:
+                encontradas.sort(key=lambda e: (e["timestamp"], e["id"]), reverse=True)
+                del encontradas[limite:]
+                tope = encontradas[-1]["timestamp"]
+
+            for n in candidatos:
+                bloque = indice["blocks"][n]
+                if bloque["hasta"] is not None:
+                    if (desde and bloque["hasta"] < desde) or (tope and bloque["hasta"] < tope):
+                        continue
+                if bloque["desde"] is not None:
+                    if (hasta and bloque["desde"] >= hasta) or (antes_de and bloque["desde"] > antes_de[0]):
+                        continue
+                for entrada in self._leer_bloque(indice["path"], bloque):
+                    ts = entrada["timestamp"]
+                    if entidad and entrada["entidad"] != entidad:
+                        continue
+                    if entidad_id and entrada["entidad_id"] != entidad_id:
+                        continue
+                    if usuario and entrada["usuario"] != usuario:
+                        continue
+                    if accion and entrada["accion"] != accion:
+                        continue
+                    if (desde and ts < desde) or (hasta and ts >= hasta):
+                        continue
+                    if antes_de and (ts, entrada["id"]) >= antes_de:
+                        continue
+                    encontradas.append(entrada)
+
+        encontradas.sort(key=lambda e: (e["timestamp"], e["id"]), reverse=True)
+        return encontradas[:limite]
+
+    def _leer_bloque(self, path: Path, bloque: dict):
+        with open(path, "rb") as f:
+            f.seek(bloque["offset"])
+            datos = gzip.decompress(f.read(bloque["size"]))
+        for linea in datos.decode("utf-8").splitlines():
+            entrada = json.loads(linea)
+            entrada["timestamp"] = datetime.fromisoformat(entrada["timestamp"]) if entrada["timestamp"] else datetime.min
+            yield entrada
+
+
+access_log_archive = AccessLogArchive(ARCHIVE_DIR)
+
+
+async def archive_loop():
+    """Archiva periódicamente (tarea de fondo del lifespan)"""
+    while True:
+        try:
+            resultado = await asyncio.to_thread(access_log_archive.archivar)
+            if resultado.get("rows"):
+                logger.info("Archivo del log de accesos: %s", resultado)
+        except Exception:
+            logger.exception("Error al archivar el log de accesos")
+        await asyncio.sleep(settings.ACCESS_LOG_ARCHIVE_INTERVAL_HOURS * 3600)
@@ -0,0 +1,300 @@
+"""
+Escritura en lote del log de accesos LOPDP (tabla access_logs).
+
+registrar_acceso solo encola la entrada en memoria; una tarea de fondo la
+escribe con INSERT de varias filas cada ACCESS_LOG_FLUSH_MS o en cuanto hay
+ACCESS_LOG_BATCH_SIZE pendientes. Así una consulta (GET /api/users/...) ya
+no agrega un INSERT ni un commit a la petición.
+
+Ninguna entrada se pierde:
+- si el INSERT falla, el lote se agrega al archivo de respaldo (JSON por
+  línea, con fsync) y se reintenta al arrancar el próximo proceso;
+- con la cola llena (ACCESS_LOG_QUEUE_SIZE) la entrada va directo al archivo;
+- al apagar se escribe lo que quede en la cola.
+
+Cada proceso (worker de uvicorn) escribe su propio archivo de respaldo
+(<nombre>.<pid>.jsonl) con un flock exclusivo mientras agrega. La
+recuperación toma el mismo lock antes de reclamar (renombrar) un archivo, y
+quien escribe comprueba después del lock que el archivo sigue siendo el del
+path; así nunca se agrega a un archivo ya reclamado.
+
+El timestamp es el del acceso, no el del INSERT, con la misma semántica que
+tenía server_default=func.now(): la hora local de la sesión de la BD. En
+memoria y en el archivo de respaldo se guarda en UTC (con zona); al insertar
+se pasa a la hora de la BD con el desfase NOW() - UTC_TIMESTAMP(), que se
+consulta cada _DESFASE_SEGUNDOS.
+"""
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import insert, text
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.access_log import AccessLog
+from app.utils import metrics
+from app.utils.uuid7 import uuid7
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_FILE = Path(settings.ACCESS_LOG_FALLBACK_FILE) if settings.ACCESS_LOG_FALLBACK_FILE \
+    else Path(__file__).parent.parent.parent / "access_log_pendiente.jsonl"
+
+_DESFASE_SEGUNDOS = 3600
+
+access_log_queue_depth = metrics.registry.gauge(
+    "access_log_queue_depth",
+    "Entradas del log de accesos esperando el INSERT",
+)
+access_log_entries_total = metrics.registry.counter(
+    "access_log_entries_total",
+    "Entradas del log de accesos escritas, según destino",
+    ("destination",),
+)
+access_log_flush_seconds = metrics.registry.histogram(
+    "access_log_flush_seconds",
+    "Duración de cada INSERT en lote del log de accesos",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+
+def _fila_desde_json(linea: str) -> dict:
+    fila = json.loads(linea)
+    fila["id"] = uuid.UUID(fila["id"])
+    fila["timestamp"] = datetime.fromisoformat(fila["timestamp"])
+    if fila["timestamp"].tzinfo is None:
+        # Archivos anteriores: UTC sin zona
+        fila["timestamp"] = fila["timestamp"].replace(tzinfo=timezone.utc)
+    return fila
+
+
+def _archivo_proceso() -> Path:
+    """Archivo de respaldo de este proceso"""
+    return FALLBACK_FILE.with_name(f"{FALLBACK_FILE.stem}.{os.getpid()}{FALLBACK_FILE.suffix}")
+
+
+def _es_el_mismo(f, path: Path) -> bool:
+    """El archivo abierto sigue siendo el que está en path (nadie lo reclamó)"""
+    try:
+        return os.fstat(f.fileno()).st_ino == os.stat(path).st_ino
+    except FileNotFoundError:
+        return False
+
+
+class AccessLogWriter:
+    def __init__(self):
+        self._pendientes = deque()
+        self._lock = threading.Lock()
+        self._archivo_lock = threading.Lock()
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+        self._desfase = None            # hora de la BD - UTC
+        self._desfase_en = 0.0
+
+    # ============================================
+    # CICLO DE VIDA
+    # ============================================
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+        await asyncio.to_thread(self.flush)
+
+    # ============================================
+    # ENCOLAR
+    # ============================================
+
+    def registrar(self, usuario, accion, entidad, entidad_id, ip_address=None):
+        """Encola una entrada (se puede llamar desde cualquier hilo)"""
+        fila = {
+            "id": uuid7(),
+            "usuario": usuario,
+            "accion": accion,
+            "entidad": entidad,
+            "entidad_id": entidad_id,
+            "ip_address": ip_address,
+            "timestamp": datetime.now(timezone.utc),
+        }
+        loop = self._loop
+        if loop is None:
+            # Sin tarea de fondo (scripts, pruebas): escribir ya
+            self._escribir([fila])
+            return
+
+        with self._lock:
+            llena = len(self._pendientes) >= settings.ACCESS_LOG_QUEUE_SIZE
+            if not llena:
+                self._pendientes.append(fila)
+                pendientes = len(self._pendientes)
+        if llena:
+            self._respaldar([fila])
+            return
+        access_log_queue_depth.set(pendientes)
+        if pendientes >= settings.ACCESS_LOG_BATCH_SIZE:
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    # ============================================
+    # ESCRITURA
+    # ============================================
+
+    async def _run(self):
+        await asyncio.to_thread(self.reprocesar_respaldo)
+        intervalo = settings.ACCESS_LOG_FLUSH_MS / 1000
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=intervalo)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception:
+                logger.exception("Error al escribir el log de accesos")
+
+    def flush(self):
+        """Escribe todo lo encolado en lotes de ACCESS_LOG_BATCH_SIZE"""
+        while True:
+            with self._lock:
+                n = min(len(self._pendientes), settings.ACCESS_LOG_BATCH_SIZE)
+                lote = [self._pendientes.popleft() for _ in range(n)]
+                access_log_queue_depth.set(len(self._pendientes))
+            if not lote:
+                return
+            self._escribir(lote)
+
+    def _hora_bd(self, db) -> timezone:
+        """Zona de la sesión de la BD, como desfase fijo respecto de UTC (lo que daba NOW())"""
+        if self._desfase is None or time.monotonic() - self._desfase_en >= _DESFASE_SEGUNDOS:
+            if db.get_bind().dialect.name == "mysql":
+                segundos = db.execute(text("SELECT TIMESTAMPDIFF(SECOND, UTC_TIMESTAMP(), NOW())")).scalar()
+            else:
+                # SQLite (desarrollo): CURRENT_TIMESTAMP es UTC
+                segundos = 0
+            # Redondeado a minutos: las dos lecturas no son simultáneas
+            self._desfase = timezone(timedelta(minutes=round(segundos / 60)))
+            self._desfase_en = time.monotonic()
+        return self._desfase
+
+    def _insertar(self, filas):
+        """
+        INSERT de varias filas en una sola transacción. Va como executemany:
+        pymysql lo reescribe en INSERT ... VALUES (...), (...) y se evita
+        compilar en SQLAlchemy una sentencia distinta por cada tamaño de lote
+        """
+        with access_log_flush_seconds.time():
+            db = SessionLocal()
+            try:
+                zona = self._hora_bd(db)
+                filas = [
+                    {**fila, "timestamp": fila["timestamp"].astimezone(zona).replace(tzinfo=None)}
+                    for fila in filas
+                ]
+                db.execute(insert(AccessLog.__table__), filas)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+    def _escribir(self, filas):
+        try:
+            self._insertar(filas)
+            access_log_entries_total.inc(len(filas), destination="db")
+        except Exception as e:
+            logger.error("No se pudo escribir el log de accesos (%d entradas), van al archivo de respaldo: %s", len(filas), e)
+            self._respaldar(filas)
+
+    # ============================================
+    # ARCHIVO DE RESPALDO
+    # ============================================
+
+    def _respaldar(self, filas):
+        lineas = "".join(
+            json.dumps({**fila, "id": str(fila["id"]), "timestamp": fila["timestamp"].isoformat()}, ensure_ascii=False) + "\n"
+            for fila in filas
+        )
+        destino = _archivo_proceso()
+        with self._archivo_lock:
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            while True:
+                f = open(destino, "a", encoding="utf-8")
+                fcntl.flock(f, fcntl.LOCK_EX)
+                if _es_el_mismo(f, destino):
+                    break
+                # Se reclamó mientras se esperaba el lock: abrir el archivo nuevo
+                f.close()
+            with f:
+                f.write(lineas)
+                f.flush()
+                os.fsync(f.fileno())
+        access_log_entries_total.inc(len(filas), destination="fallback_file")
+
+    def _reclamar(self, archivo: Path):
+        """Renombra archivo a un .reintento propio; None si no existe o lo reclamó otro"""
+        reclamado = FALLBACK_FILE.with_name(f"{FALLBACK_FILE.name}.{uuid.uuid4().hex}.reintento")
+        try:
+            f = open(archivo, "rb")
+        except FileNotFoundError:
+            return None
+        with f, self._archivo_lock:
+            # Espera a que termine quien esté agregando líneas
+            fcntl.flock(f, fcntl.LOCK_EX)
+            if not _es_el_mismo(f, archivo):
+                return None
+            os.rename(archivo, reclamado)
+        return reclamado
+
+    def reprocesar_respaldo(self):
+        """
+        Pasa a la BD las entradas de los archivos de respaldo (de todos los
+        procesos). Cada archivo se reclama renombrándolo con el lock tomado,
+        así dos procesos no lo insertan dos veces y nadie agrega líneas a un
+        archivo ya leído; si el INSERT falla el archivo queda para el
+        próximo arranque.
+        """
+        candidatos = [
+            FALLBACK_FILE,   # archivo único de versiones anteriores
+            *FALLBACK_FILE.parent.glob(f"{FALLBACK_FILE.stem}.*{FALLBACK_FILE.suffix}"),
+            *FALLBACK_FILE.parent.glob(FALLBACK_FILE.name + ".*.reintento"),
+        ]
+        for archivo in candidatos:
+            reclamado = self._reclamar(archivo)
+            if reclamado is None:
+                continue
+
+            try:
+                with open(reclamado, encoding="utf-8") as f:
+                    filas = [_fila_desde_json(linea) for linea in f if linea.strip()]
+                if filas:
+                    self._insertar(filas)
+            except Exception as e:
+                logger.error("No se pudo reprocesar %s, se reintentará al arrancar: %s", reclamado, e)
+                continue
+            os.remove(reclamado)
+            access_log_entries_total.inc(len(filas), destination="db")
+            logger.info("Log de accesos: %d entradas recuperadas de %s", len(filas), archivo)
+
+
+access_log_writer = AccessLogWriter()
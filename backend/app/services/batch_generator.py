@@ -0,0 +1,167 @@
+"""
+Generación de minutas en lote: una plantilla guardada + una fila por unidad.
+
+El archivo de unidades puede ser CSV o JSONL. Cada fila reemplaza claves del
+contenido de la plantilla (compradores, predios, precioTotal, ...):
+- Las columnas con punto se aplican anidadas: "ubicacion.numero".
+- Los valores que empiezan con [ o { se decodifican como JSON (útil en CSV).
+- La columna "archivo" (opcional) da el nombre del .docx dentro del ZIP.
+
+Los documentos se renderizan en el render_pool y el ZIP se arma al vuelo:
+cada .docx se escribe en cuanto termina, sin armar el archivo completo en memoria.
+"""
+import asyncio
+import csv
+import io
+import json
+import re
+import zipfile
+from datetime import datetime
+
+from app.services.render_pool import render_pool
+from app.services.renderers import render_document_timed
+from app.utils import metrics
+
+
+class BatchError(ValueError):
+    """Archivo de unidades inválido"""
+
+
+def leer_unidades(content: bytes, filename: str = "") -> list:
+    """Convierte el CSV/JSONL subido en una lista de diccionarios de reemplazo"""
+    try:
+        texto = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise BatchError("El archivo debe estar en UTF-8")
+
+    if filename.lower().endswith((".jsonl", ".ndjson")) or texto.lstrip().startswith("{"):
+        unidades = []
+        for numero, linea in enumerate(texto.splitlines(), start=1):
+            if not linea.strip():
+                continue
+            try:
+                fila = json.loads(linea)
+            except json.JSONDecodeError as e:
+                raise BatchError(f"Línea {numero}: JSON inválido ({e.msg})")
+            if not isinstance(fila, dict):
+                raise BatchError(f"Línea {numero}: se esperaba un objeto JSON")
+            unidades.append(fila)
+        return unidades
+
+    return [
+        {k.strip(): v for k, v in fila.items() if k and v not in (None, "")}
+        for fila in csv.DictReader(io.StringIO(texto))
+    ]
+
+
+def _valor(valor):
+    if isinstance(valor, str) and valor.strip()[:1] in ("[", "{"):
+        try:
+            return json.loads(valor)
+        except json.JSONDecodeError:
+            pass
+    return valor
+
+
+def aplicar_reemplazos(base: dict, reemplazos: dict) -> dict:
+    """Copia de `base` con los valores de la fila aplicados"""
+    data = json.loads(json.dumps(base))
+    for clave, valor in reemplazos.items():
+        if clave == "archivo":
+            continue
+        destino = data
+        partes = clave.split(".")
+        for parte in partes[:-1]:
+            if not isinstance(destino.get(parte), dict):
+                destino[parte] = {}
+            destino = destino[parte]
+        destino[partes[-1]] = _valor(valor)
+    return data
+
+
+def nombre_archivo(reemplazos: dict, indice: int, usados: set) -> str:
+    """Nombre seguro y único para la entrada del ZIP"""
+    nombre = str(reemplazos.get("archivo") or f"minuta_{indice:03d}")
+    nombre = re.sub(r"[^\w\-. ]", "_", nombre).strip() or f"minuta_{indice:03d}"
+    if not nombre.lower().endswith(".docx"):
+        nombre += ".docx"
+    base, n = nombre[:-5], 2
+    while nombre in usados:
+        nombre = f"{base}_{n}.docx"
+        n += 1
+    usados.add(nombre)
+    return nombre
+
+
+class _ZipStream(io.RawIOBase):
+    """Destino no-seekable para ZipFile: acumula lo escrito hasta que se consume"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def consumir(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def stream_zip(tipo_contrato: str, base: dict, unidades: list):
+    """
+    Genera los bytes del ZIP a medida que cada documento termina.
+    Mantiene a lo sumo 2 x tamaño del pool documentos en vuelo para que un
+    cliente lento no acumule en memoria todo el lote.
+    """
+    destino = _ZipStream()
+    zf = zipfile.ZipFile(destino, mode="w", compression=zipfile.ZIP_STORED)
+    ventana = max(2, render_pool.size * 2)
+    tipo = "promesa" if tipo_contrato == "promesa" else "minuta"
+    usados = set()
+    errores = []
+
+    pendientes = {}
+    siguiente = 0
+
+    def encolar(i):
+        reemplazos = unidades[i]
+        data = aplicar_reemplazos(base, reemplazos)
+        tarea = asyncio.ensure_future(render_pool.run(render_document_timed, tipo, data))
+        pendientes[tarea] = (i + 1, nombre_archivo(reemplazos, i + 1, usados))
+
+    try:
+        while siguiente < len(unidades) and len(pendientes) < ventana:
+            encolar(siguiente)
+            siguiente += 1
+
+        while pendientes:
+            listas, _ = await asyncio.wait(pendientes, return_when=asyncio.FIRST_COMPLETED)
+            for tarea in listas:
+                indice, nombre = pendientes.pop(tarea)
+                try:
+                    contenido, tiempos = tarea.result()
+                except Exception as e:
+                    errores.append(f"Unidad {indice} ({nombre}): {e}")
+                    continue
+                metrics.observe_stages(tipo, tiempos)
+                metrics.documents_generated_total.inc(document_type=tipo, source="render")
+                zf.writestr(zipfile.ZipInfo(nombre, datetime.now().timetuple()[:6]), contenido)
+                yield destino.consumir()
+
+                if siguiente < len(unidades):
+                    encolar(siguiente)
+                    siguiente += 1
+
+        if errores:
+            zf.writestr("ERRORES.txt", "\n".join(errores))
+        zf.close()
+        yield destino.consumir()
+    finally:
+        # Cliente desconectado: no seguir renderizando
+        for tarea in pendientes:
+            tarea.cancel()
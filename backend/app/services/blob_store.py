@@ -0,0 +1,338 @@
+"""
+Almacén de blobs JSON comprimidos y direccionados por contenido.
+
+Template.contenido y Minute.contract_data son formularios muy repetidos: el
+mismo vendedor, la misma historia de dominio y los mismos linderos aparecen
+en cientos de unidades. En lugar del JSON completo, cada fila guarda el hash
+(SHA-256) de un blob de la tabla blobs.
+
+Al guardar, el JSON se parte de abajo hacia arriba: cada objeto, lista o
+texto cuya serialización llega a BLOB_CHUNK_MIN_BYTES (la lista de
+vendedores de un proyecto grande, una historia de dominio larga) va en un
+blob propio y en su lugar queda {"$blob": "<hash>"}. Las minutas de un mismo
+proyecto comparten así esos blobs, y un formulario idéntico a uno ya
+guardado no escribe nada. Por debajo de ese tamaño conviene dejar el
+fragmento en su blob padre: comprime mejor junto al resto que solo.
+Las claves del formulario que empiezan con "$" se guardan con un "$" más
+("$blob" -> "$$blob"), así un {"$blob": ...} del usuario no se confunde con
+una referencia.
+
+Cada blob se comprime con zstd (o zlib, según BLOB_COMPRESSION) y,
+si existe, con el último diccionario de blob_dictionaries: JSON de ejemplo
+de formularios reales con las claves y los textos que se repiten. Un
+fragmento de pocos KB comprimido solo apenas se reduce; con el diccionario
+se codifica casi todo como referencias a él. El codec y el diccionario
+quedan en cada fila, así que conviven blobs de distinto tipo.
+
+Un blob no cambia nunca: los ya descomprimidos se guardan en una caché LRU
+sin invalidación.
+
+Migración de las columnas anteriores, diccionarios y recolección de blobs
+sin uso: migrate_blobs.py
+"""
+import hashlib
+import json
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.blob import Blob, BlobDictionary
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+blob_writes_total = metrics.registry.counter(
+    "blob_store_writes_total", "Blobs a guardar, según si ya existían", ("result",)
+)
+blob_bytes_total = metrics.registry.counter(
+    "blob_store_bytes_total", "Bytes de los blobs nuevos, antes y después de comprimir", ("kind",)
+)
+blob_cache_requests_total = metrics.registry.counter(
+    "blob_store_cache_requests_total", "Lecturas de blobs, según si salieron de la caché", ("result",)
+)
+
+REF = "$blob"
+NIVEL_ZSTD = 10
+NIVEL_ZLIB = 9
+_LOTE_IN = 500   # hashes por consulta IN
+# zlib solo aprovecha los últimos 32 KB del diccionario (tamaño de su ventana)
+DICCIONARIO_BYTES = 32 * 1024
+
+
+def _serializar(valor: Any) -> bytes:
+    return json.dumps(valor, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _escapar(clave: str) -> str:
+    return "$" + clave if clave.startswith("$") else clave
+
+
+def _desescapar(clave: str) -> str:
+    return clave[1:] if clave.startswith("$") else clave
+
+
+def _referencias(valor: Any, destino: Set[str]):
+    if isinstance(valor, dict):
+        if len(valor) == 1 and REF in valor:
+            destino.add(valor[REF])
+            return
+        for v in valor.values():
+            _referencias(v, destino)
+    elif isinstance(valor, list):
+        for v in valor:
+            _referencias(v, destino)
+
+
+def armar_diccionario(muestras: List[Any]) -> bytes:
+    """Muestras serializadas, las más recientes al final (es lo que zlib aprovecha)"""
+    return b"".join(_serializar(m) for m in muestras)[-DICCIONARIO_BYTES:]
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+class BlobStore:
+    def __init__(self, codec: str, chunk_min: int, cache_bytes: int):
+        self._zstd = _zstandard()
+        if codec not in ("zstd", "zlib"):
+            raise RuntimeError(f"BLOB_COMPRESSION inválido: {codec} (zstd o zlib)")
+        # Sin el paquete no se leen los blobs zstd ya guardados: mejor no arrancar
+        if codec == "zstd" and self._zstd is None:
+            raise RuntimeError("BLOB_COMPRESSION=zstd pero zstandard no está instalado (pip install -r requirements.txt)")
+        self.codec = codec
+        self.chunk_min = chunk_min
+        self.cache_bytes = cache_bytes
+        self._cache = OrderedDict()   # hash -> JSON sin comprimir
+        self._cache_usado = 0
+        self._diccionarios = {}       # id -> bytes (no cambian)
+        self._activo = None           # id del diccionario para comprimir; False = no hay
+        self._lock = threading.Lock()
+
+    # ============================================
+    # COMPRESIÓN
+    # ============================================
+
+    def comprimir(self, raw: bytes, diccionario: Optional[bytes] = None) -> bytes:
+        if self.codec == "zstd":
+            if diccionario is None:
+                return self._zstd.compress(raw, NIVEL_ZSTD)
+            dic = self._zstd.ZstdCompressionDict(diccionario, dict_type=self._zstd.DICT_TYPE_RAWCONTENT)
+            return self._zstd.ZstdCompressor(level=NIVEL_ZSTD, dict_data=dic).compress(raw)
+        comp = zlib.compressobj(NIVEL_ZLIB, zdict=diccionario) if diccionario else zlib.compressobj(NIVEL_ZLIB)
+        return comp.compress(raw) + comp.flush()
+
+    def descomprimir(self, codec: str, data: bytes, diccionario: Optional[bytes] = None) -> bytes:
+        if codec == "zlib":
+            decomp = zlib.decompressobj(zdict=diccionario) if diccionario else zlib.decompressobj()
+            return decomp.decompress(data) + decomp.flush()
+        if codec == "zstd":
+            if self._zstd is None:
+                raise RuntimeError("Hay blobs comprimidos con zstd: instale zstandard (pip install zstandard)")
+            if diccionario is None:
+                return self._zstd.decompress(data)
+            dic = self._zstd.ZstdCompressionDict(diccionario, dict_type=self._zstd.DICT_TYPE_RAWCONTENT)
+            return self._zstd.ZstdDecompressor(dict_data=dic).decompress(data)
+        raise RuntimeError(f"Codec de blob desconocido: {codec}")
+
+    # ============================================
+    # DICCIONARIOS
+    # ============================================
+
+    def _diccionario(self, db: Session, dict_id: int) -> bytes:
+        with self._lock:
+            data = self._diccionarios.get(dict_id)
+        if data is None:
+            data = db.execute(select(BlobDictionary.data).where(BlobDictionary.id == dict_id)).scalar_one()
+            with self._lock:
+                self._diccionarios[dict_id] = data
+        return data
+
+    def _diccionario_activo(self, db: Session):
+        """(id, bytes) del diccionario más reciente, o (None, None); se busca una vez por proceso"""
+        if self._activo is None:
+            self._activo = db.execute(select(func.max(BlobDictionary.id))).scalar() or False
+        if not self._activo:
+            return None, None
+        return self._activo, self._diccionario(db, self._activo)
+
+    def entrenar(self, db: Session, muestras: List[Any]) -> int:
+        """
+        Guarda un diccionario nuevo armado con muestras (formularios completos)
+        y lo deja activo en este proceso; los demás lo toman al reiniciar
+        """
+        data = armar_diccionario(muestras)
+        dict_id = db.execute(insert(BlobDictionary).values(data=data, samples=len(muestras))).inserted_primary_key[0]
+        db.commit()
+        with self._lock:
+            self._diccionarios[dict_id] = data
+        self._activo = dict_id
+        return dict_id
+
+    # ============================================
+    # ESCRITURA
+    # ============================================
+
+    def partir(self, valor: Any):
+        """(hash de la raíz, {hash: JSON sin comprimir}) de todos los blobs de valor"""
+        blobs = {}
+
+        def nodo(v, raiz=False):
+            if isinstance(v, dict):
+                v = {_escapar(k): nodo(x) for k, x in v.items()}
+            elif isinstance(v, list):
+                v = [nodo(x) for x in v]
+            elif not isinstance(v, str) and not raiz:
+                return v
+            raw = _serializar(v)
+            if len(raw) < self.chunk_min and not raiz:
+                return v
+            h = hashlib.sha256(raw).hexdigest()
+            blobs[h] = raw
+            return {REF: h}
+
+        return nodo(valor, raiz=True)[REF], blobs
+
+    def guardar(self, db: Session, valor: Any) -> str:
+        """
+        Agrega a la sesión los blobs de valor que falten y devuelve el hash de
+        la raíz. El commit es del que llama, junto con la fila que lo referencia.
+        """
+        raiz, blobs = self.partir(valor)
+        hashes = list(blobs)
+        existentes = set()
+        for i in range(0, len(hashes), _LOTE_IN):
+            existentes.update(db.execute(
+                select(Blob.hash).where(Blob.hash.in_(hashes[i:i + _LOTE_IN]))
+            ).scalars())
+
+        nuevos = []
+        dict_id, diccionario = self._diccionario_activo(db) if len(existentes) < len(hashes) else (None, None)
+        for h in hashes:
+            if h in existentes:
+                continue
+            data = self.comprimir(blobs[h], diccionario)
+            nuevos.append({
+                "hash": h, "codec": self.codec, "dict_id": dict_id, "data": data, "raw_size": len(blobs[h]),
+            })
+            blob_bytes_total.inc(len(blobs[h]), kind="raw")
+            blob_bytes_total.inc(len(data), kind="stored")
+
+        if nuevos:
+            # Otro proceso puede estar guardando el mismo blob: el duplicado se ignora
+            dialecto = db.get_bind().dialect.name
+            sentencia = insert(Blob)
+            if dialecto == "mysql":
+                sentencia = sentencia.prefix_with("IGNORE")
+            elif dialecto == "sqlite":
+                sentencia = sentencia.prefix_with("OR IGNORE")
+            db.execute(sentencia, nuevos)
+
+        blob_writes_total.inc(len(nuevos), result="nuevo")
+        blob_writes_total.inc(len(existentes), result="existente")
+        for h, raw in blobs.items():
+            self._cachear(h, raw)
+        return raiz
+
+    # ============================================
+    # LECTURA
+    # ============================================
+
+    def _cachear(self, h: str, raw: bytes):
+        # Un blob de más de 1/8 de la caché la vaciaría casi entera
+        if len(raw) > self.cache_bytes // 8:
+            return
+        with self._lock:
+            if h in self._cache:
+                self._cache.move_to_end(h)
+                return
+            self._cache[h] = raw
+            self._cache_usado += len(raw)
+            while self._cache_usado > self.cache_bytes:
+                _, viejo = self._cache.popitem(last=False)
+                self._cache_usado -= len(viejo)
+
+    def _leer(self, db: Session, hashes: Iterable[str]) -> Dict[str, bytes]:
+        """JSON sin comprimir de cada hash, de la caché o de la BD"""
+        crudos, faltan = {}, []
+        with self._lock:
+            for h in hashes:
+                raw = self._cache.get(h)
+                if raw is None:
+                    faltan.append(h)
+                else:
+                    self._cache.move_to_end(h)
+                    crudos[h] = raw
+        blob_cache_requests_total.inc(len(crudos), result="hit")
+        blob_cache_requests_total.inc(len(faltan), result="miss")
+
+        for i in range(0, len(faltan), _LOTE_IN):
+            filas = db.execute(
+                select(Blob.hash, Blob.codec, Blob.dict_id, Blob.data).where(Blob.hash.in_(faltan[i:i + _LOTE_IN]))
+            )
+            for h, codec, dict_id, data in filas:
+                diccionario = self._diccionario(db, dict_id) if dict_id else None
+                crudos[h] = self.descomprimir(codec, data, diccionario)
+                self._cachear(h, crudos[h])
+
+        perdidos = [h for h in faltan if h not in crudos]
+        if perdidos:
+            raise LookupError(f"Blobs no encontrados: {', '.join(perdidos[:5])}")
+        return crudos
+
+    def _recorrer(self, db: Session, raices: Iterable[str]) -> Dict[str, Any]:
+        """Todos los blobs alcanzables desde raices, ya parseados (por niveles, una consulta por nivel)"""
+        parseados = {}
+        pendientes = set(raices)
+        while pendientes:
+            siguientes = set()
+            for h, raw in self._leer(db, pendientes).items():
+                parseados[h] = json.loads(raw)
+                _referencias(parseados[h], siguientes)
+            pendientes = siguientes - parseados.keys()
+        return parseados
+
+    def cargar_varios(self, db: Session, hashes: Iterable[str]) -> Dict[str, Any]:
+        hashes = list(hashes)
+        parseados = self._recorrer(db, hashes)
+
+        def armar(v):
+            if isinstance(v, dict):
+                if len(v) == 1 and REF in v:
+                    return armar(parseados[v[REF]])
+                return {_desescapar(k): armar(x) for k, x in v.items()}
+            if isinstance(v, list):
+                return [armar(x) for x in v]
+            return v
+
+        return {h: armar(parseados[h]) for h in hashes}
+
+    def cargar(self, db: Session, h: str) -> Any:
+        """El JSON guardado con guardar() bajo el hash h"""
+        return self.cargar_varios(db, [h])[h]
+
+    def alcanzables(self, db: Session, raices: Iterable[str]) -> Set[str]:
+        """Hashes de todos los blobs que usan las raíces (para recolectar los demás)"""
+        return set(self._recorrer(db, raices))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "codec": self.codec,
+                "dictionary_id": self._activo or None,
+                "cache_entries": len(self._cache),
+                "cache_bytes": self._cache_usado,
+            }
+
+
+blob_store = BlobStore(settings.BLOB_COMPRESSION, settings.BLOB_CHUNK_MIN_BYTES, settings.BLOB_CACHE_MB * 1024 * 1024)
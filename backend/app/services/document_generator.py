@@ -1,8 +1,13 @@
-from docxtpl import DocxTemplate, RichText
+import logging
+from docxtpl import RichText
+from io import BytesIO
 from pathlib import Path
 from datetime import datetime
 from app.utils.number_to_words import numero_a_letras, numero_a_digitos, formatear_fecha_notarial
 from app.utils.html_to_richtext import html_to_richtext
+from app.services.template_registry import template_registry
+
+logger = logging.getLogger(__name__)
 
 TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
 OUTPUTS_DIR = Path(__file__).parent.parent.parent / "generated_documents"
@@ -203,16 +208,11 @@ def procesar_empresa(comp, index):
     }
 
 
-def generate_matriz_compraventa(data: dict) -> str:
+def build_matriz_context(data: dict) -> dict:
     """
-    Genera matriz de compraventa usando docxtpl
+    Arma el contexto de la plantilla de matriz a partir de los datos del endpoint
     """
-    
-    print("=" * 50)
-    print("PROCESANDO DATOS PARA PLANTILLA")
-    print("=" * 50)
-    print("DEBUG - abogadoTexto recibido:", data.get('abogadoTexto'))
-    print("DEBUG - Tipo:", type(data.get('abogadoTexto')))
+
     # Convertir vendedores y compradores a diccionarios si son objetos Pydantic
     vendedores_raw = data.get('vendedoresList', [])
     compradores_raw = data.get('compradoresList', [])
@@ -311,49 +311,61 @@ def generate_matriz_compraventa(data: dict) -> str:
     
     # Convertir minuta a RichText
     if 'abogadoTexto' in data and data['abogadoTexto']:
-        print("DEBUG - Procesando minuta HTML:", data['abogadoTexto'][:100], "...")
         context['abogadoTexto'] = html_to_richtext(data['abogadoTexto'])
-        print("DEBUG - RichText con formato creado")
     else:
-        print("DEBUG - NO hay abogadoTexto en data")
         context['abogadoTexto'] = ''
-        
-    print("Contexto preparado:")
-    print(f"- Vendedores: {len(vendedores_procesados)}")
-    print(f"- Compradores: {len(compradores_procesados)}")
-    print(f"- Hay tercera edad: {hay_tercera_edad}")
-    print(f"- Hay intérprete: {hay_interprete}")
-    print(f"- Hay no vidente: {hay_no_vidente}")
-    print(f"- Hay analfabeta: {hay_analfabeta}")
-    print(f"- Hay discapacidad intelectual: {hay_discapacidad_intelectual}")
-    
+
+    logger.debug(
+        "Contexto de matriz: %d vendedores, %d compradores, tercera_edad=%s, interprete=%s, "
+        "no_vidente=%s, analfabeta=%s, discapacidad_intelectual=%s",
+        len(vendedores_procesados), len(compradores_procesados), hay_tercera_edad,
+        hay_interprete, hay_no_vidente, hay_analfabeta, hay_discapacidad_intelectual,
+    )
+
+    return context
+
+
+def render_matriz_compraventa(data: dict) -> BytesIO:
+    """
+    Genera matriz de compraventa usando docxtpl, en memoria
+    """
+    context = build_matriz_context(data)
+
     # Cargar plantilla
     template_path = TEMPLATES_DIR / "compraventa.docx"
     
     if not template_path.exists():
         raise FileNotFoundError(f"Plantilla no encontrada en: {template_path}")
     
-    doc = DocxTemplate(template_path)
+    doc = template_registry.get(template_path)
     
     # Renderizar con autoescape desactivado
     try:
-        print("Renderizando documento...")
         doc.render(context, autoescape=False)
-        print("Documento renderizado exitosamente")
-    except Exception as e:
-        print(f"ERROR AL RENDERIZAR: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error al renderizar la matriz")
         raise
     
-    # Guardar
+    file_stream = BytesIO()
+    doc.save(file_stream)
+    file_stream.seek(0)
+
+    return file_stream
+
+
+def generate_matriz_compraventa(data: dict) -> str:
+    """
+    Genera matriz de compraventa, la guarda en disco y retorna el path
+    """
+    file_stream = render_matriz_compraventa(data)
+
     protocol = data.get('numeroProtocolo', 'sin-protocolo')
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
     filename = f"matriz_{protocol}_{timestamp}.docx"
     output_path = OUTPUTS_DIR / filename
     
-    doc.save(str(output_path))
-    print(f"Documento guardado en: {output_path}")
-    print("=" * 50)
+    with open(str(output_path), "wb") as f:
+        f.write(file_stream.read())
+    logger.debug("Documento guardado en: %s", output_path)
     
     return str(output_path)
\ No newline at end of file
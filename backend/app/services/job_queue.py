@@ -0,0 +1,256 @@
+"""
+Cola de generación de documentos respaldada en la tabla generation_jobs.
+
+Los endpoints de /api/jobs insertan un trabajo y responden de inmediato;
+los workers de este módulo (tareas asyncio dentro de cada proceso de la API)
+reclaman trabajos pendientes, renderizan en el render_pool (pasando por
+render_cache) y guardan el registro Minute/Document igual que los
+endpoints síncronos.
+
+Como la cola vive en la BD, un reinicio no pierde trabajos: los pendientes
+se toman al arrancar y los que quedaron "procesando" se reintentan cuando
+vence su lease (JOB_LEASE_SECONDS). El reclamo es un UPDATE condicional,
+así que varios nodos pueden compartir la misma cola.
+
+Cada reclamo incrementa attempts, que sirve de token: un render que tarda
+más que el lease puede terminar después de que otro worker retomó el
+trabajo, y solo cuenta el resultado (o el error) del reclamo vigente, con
+un UPDATE condicionado a status y attempts. El otro se descarta con
+rollback, sin crear un segundo registro.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.generation_job import GenerationJob, JobStatus, JobType
+from app.models.minute import Minute, MinuteType
+from app.models.document import Document
+from app.services.blob_store import blob_store
+from app.services.render_cache import render_cache
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _render_args(job: GenerationJob):
+    """Argumentos de render_cache.generate() según el tipo de trabajo"""
+    if job.job_type == JobType.MINUTA:
+        return "minuta", job.payload, f"minuta_compraventa_{job.created_by}"
+    if job.job_type == JobType.PROMESA:
+        return "promesa", job.payload, f"minuta_promesa_{job.created_by}"
+    datos = job.payload["datos"]
+    return "matriz", datos, f"matriz_{datos.get('numeroProtocolo', 'sin-protocolo')}"
+
+
+def _crear_registro(db: Session, job: GenerationJob, file_path: str, file_hash: str):
+    """Registro de auditoría equivalente al de los endpoints síncronos"""
+    if job.job_type == JobType.MATRIZ:
+        return Document(
+            **job.payload["registro"],
+            generated_by=job.created_by,
+            file_path=file_path,
+            file_hash=file_hash
+        )
+    return Minute(
+        minute_type=MinuteType.COMPRAVENTA_INMUEBLE,
+        contract_data_hash=blob_store.guardar(db, job.payload),
+        file_path=file_path,
+        file_hash=file_hash,
+        created_by=job.created_by
+    )
+
+
+class JobQueue:
+    def __init__(self):
+        self._loop = None
+        self._wakeup = None
+        self._workers = []
+        self._stopping = False
+
+    # ============================================
+    # CICLO DE VIDA
+    # ============================================
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(settings.JOB_WORKERS)
+        ]
+
+    async def stop(self):
+        self._stopping = True
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def notify(self):
+        """Despierta a los workers (se puede llamar desde cualquier hilo)"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    # ============================================
+    # ENCOLAR
+    # ============================================
+
+    def submit(self, db, job_type: JobType, payload: dict, user_id: int) -> GenerationJob:
+        job = GenerationJob(job_type=job_type, payload=payload, created_by=user_id)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self.notify()
+        return job
+
+    # ============================================
+    # WORKERS
+    # ============================================
+
+    async def _worker(self):
+        while not self._stopping:
+            try:
+                reclamo = await asyncio.to_thread(self._claim)
+            except Exception:
+                logger.exception("Error al reclamar trabajo")
+                reclamo = None
+
+            if reclamo is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            await self._process(*reclamo)
+
+    def _claim(self):
+        """
+        Marca como 'procesando' el trabajo más antiguo disponible y devuelve
+        (id, intento), o None
+        """
+        now = datetime.utcnow()
+        vencidos = now - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+        db = SessionLocal()
+        try:
+            candidatos = db.query(
+                GenerationJob.id, GenerationJob.status, GenerationJob.started_at, GenerationJob.attempts
+            ).filter(
+                or_(
+                    GenerationJob.status == JobStatus.PENDIENTE,
+                    and_(GenerationJob.status == JobStatus.PROCESANDO, GenerationJob.started_at < vencidos)
+                )
+            ).order_by(GenerationJob.created_at).limit(5).all()
+
+            for candidato in candidatos:
+                filtro = [
+                    GenerationJob.id == candidato.id,
+                    GenerationJob.status == candidato.status,
+                    GenerationJob.started_at.is_(None) if candidato.started_at is None
+                    else GenerationJob.started_at == candidato.started_at,
+                ]
+
+                if candidato.attempts >= settings.JOB_MAX_ATTEMPTS:
+                    db.query(GenerationJob).filter(*filtro).update({
+                        GenerationJob.status: JobStatus.ERROR,
+                        GenerationJob.error: "Se superó el número máximo de intentos",
+                        GenerationJob.finished_at: now,
+                    }, synchronize_session=False)
+                    db.commit()
+                    continue
+
+                reclamado = db.query(GenerationJob).filter(*filtro).update({
+                    GenerationJob.status: JobStatus.PROCESANDO,
+                    GenerationJob.started_at: now,
+                    GenerationJob.attempts: GenerationJob.attempts + 1,
+                }, synchronize_session=False)
+                db.commit()
+                if reclamado:
+                    return candidato.id, candidato.attempts + 1
+            return None
+        finally:
+            db.close()
+
+    async def _process(self, job_id: str, intento: int):
+        try:
+            args = await asyncio.to_thread(self._load, job_id)
+            file_path, file_hash = await render_cache.generate(*args)
+            await asyncio.to_thread(self._complete, job_id, intento, file_path, file_hash)
+        except asyncio.CancelledError:
+            # Apagado: el lease vence y otro worker lo retoma
+            raise
+        except Exception as e:
+            logger.exception("Error en trabajo %s", job_id)
+            try:
+                await asyncio.to_thread(self._fail, job_id, intento, str(e))
+            except Exception:
+                # Si ni siquiera se pudo marcar, el lease vencido lo reintentará
+                logger.exception("Error al marcar trabajo %s", job_id)
+
+    def _load(self, job_id: str):
+        db = SessionLocal()
+        try:
+            return _render_args(db.query(GenerationJob).filter(GenerationJob.id == job_id).one())
+        finally:
+            db.close()
+
+    @staticmethod
+    def _vigente(db: Session, job_id: str, intento: int):
+        """Consulta del trabajo solo si sigue siendo el reclamo intento"""
+        return db.query(GenerationJob).filter(
+            GenerationJob.id == job_id,
+            GenerationJob.status == JobStatus.PROCESANDO,
+            GenerationJob.attempts == intento,
+        )
+
+    def _complete(self, job_id: str, intento: int, file_path: str, file_hash: str) -> bool:
+        db = SessionLocal()
+        try:
+            job = db.query(GenerationJob).filter(GenerationJob.id == job_id).one()
+            registro = _crear_registro(db, job, file_path, file_hash)
+            db.add(registro)
+            db.flush()
+            actualizado = self._vigente(db, job_id, intento).update({
+                GenerationJob.status: JobStatus.COMPLETADO,
+                GenerationJob.file_path: file_path,
+                GenerationJob.file_hash: file_hash,
+                GenerationJob.result_id: registro.id,
+                GenerationJob.finished_at: datetime.utcnow(),
+            }, synchronize_session=False)
+            if not actualizado:
+                # Lease vencido: otro worker lo retomó (o ya lo terminó)
+                db.rollback()
+                logger.warning("Trabajo %s: el intento %d terminó tarde, se descarta", job_id, intento)
+                return False
+            with metrics.stage_timer(job.job_type.value, "db_commit"):
+                db.commit()
+            return True
+        finally:
+            db.close()
+
+    def _fail(self, job_id: str, intento: int, error: str) -> bool:
+        db = SessionLocal()
+        try:
+            actualizado = self._vigente(db, job_id, intento).update({
+                GenerationJob.status: JobStatus.ERROR,
+                GenerationJob.error: error[:2000],
+                GenerationJob.finished_at: datetime.utcnow(),
+            }, synchronize_session=False)
+            if not actualizado:
+                db.rollback()
+                logger.warning("Trabajo %s: el error del intento %d llegó tarde, se descarta", job_id, intento)
+                return False
+            db.commit()
+            return True
+        finally:
+            db.close()
+
+
+job_queue = JobQueue()
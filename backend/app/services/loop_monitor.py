@@ -0,0 +1,101 @@
+"""
+Monitor de bloqueos del event loop.
+
+Una tarea duerme LOOP_MONITOR_RESOLUTION_MS y mide cuánto se atrasa al
+despertar: ese atraso es el tiempo que algún código síncrono retuvo el loop.
+Cada LOOP_MONITOR_INTERVAL_SECONDS publica el atraso máximo del intervalo
+(event_loop_lag_seconds) y, si supera LOOP_LAG_WARN_MS, registra la ruta
+que más tiempo retuvo el loop sin ceder.
+
+Las rutas se miden con LoopLagMiddleware (app/middleware/loop_lag.py): cada
+tramo síncrono de la petición (entre dos await) se cronometra y se anota
+aquí con record().
+"""
+import asyncio
+import logging
+import threading
+import time
+
+from app.config import settings
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+event_loop_lag_seconds = metrics.registry.gauge(
+    "event_loop_lag_seconds",
+    "Atraso máximo del event loop en el último intervalo",
+)
+
+event_loop_blocking_seconds = metrics.registry.histogram(
+    "event_loop_blocking_seconds",
+    "Tramo más largo que cada petición retuvo el event loop sin ceder",
+    ("route",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+class LoopMonitor:
+    def __init__(self):
+        self._task = None
+        self._lock = threading.Lock()
+        self._peor = (None, 0.0)   # (ruta, segundos) del intervalo actual
+
+    # ============================================
+    # CICLO DE VIDA
+    # ============================================
+
+    def start(self):
+        if settings.LOOP_MONITOR_INTERVAL_SECONDS > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ============================================
+    # API
+    # ============================================
+
+    def record(self, ruta: str, bloqueo: float):
+        """Tramo más largo sin ceder de una petición a ruta"""
+        event_loop_blocking_seconds.observe(bloqueo, route=ruta)
+        with self._lock:
+            if bloqueo > self._peor[1]:
+                self._peor = (ruta, bloqueo)
+
+    def _tomar_peor(self):
+        with self._lock:
+            peor, self._peor = self._peor, (None, 0.0)
+        return peor
+
+    # ============================================
+    # MEDICIÓN
+    # ============================================
+
+    async def _run(self):
+        resolucion = settings.LOOP_MONITOR_RESOLUTION_MS / 1000
+        intervalo = settings.LOOP_MONITOR_INTERVAL_SECONDS
+        while True:
+            fin = time.perf_counter() + intervalo
+            maximo = 0.0
+            while time.perf_counter() < fin:
+                esperado = time.perf_counter() + resolucion
+                await asyncio.sleep(resolucion)
+                maximo = max(maximo, time.perf_counter() - esperado)
+
+            event_loop_lag_seconds.set(maximo)
+            ruta, bloqueo = self._tomar_peor()
+            if maximo * 1000 >= settings.LOOP_LAG_WARN_MS:
+                logger.warning(
+                    "Event loop bloqueado hasta %.0f ms en los últimos %ss; ruta más lenta: %s (%.0f ms sin ceder)",
+                    maximo * 1000, intervalo, ruta or "ninguna (tarea de fondo)", bloqueo * 1000,
+                    extra={"loop_lag_ms": round(maximo * 1000, 1), "route": ruta},
+                )
+
+
+loop_monitor = LoopMonitor()
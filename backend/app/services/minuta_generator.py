@@ -1,4 +1,3 @@
-from docxtpl import DocxTemplate
 from io import BytesIO
 from ..utils.number_to_words import (
     numero_a_letras, 
@@ -8,7 +7,7 @@ from ..utils.number_to_words import (
     numero_casa_a_letras,
     numero_a_ordinal_notaria
 )
-from bs4 import BeautifulSoup
+from ..utils.html_to_richtext import html_to_text
 import re
 
 
@@ -347,47 +346,21 @@ def limpiar_html(html_content):
     if not html_content:
         return ""
     
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Reemplazar <br> y <p> con saltos de línea
-    for br in soup.find_all("br"):
-        br.replace_with("\n")
-    for p in soup.find_all("p"):
-        p.insert_after("\n")
-    
-    text = soup.get_text()
-    # Limpiar múltiples saltos de línea
-    text = re.sub(r'\n\s*\n', '\n\n', text)
-    return text.strip()
+    return html_to_text(html_content)
 
 
 
 from pathlib import Path
 from datetime import datetime
+from .template_registry import template_registry
 
 TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
 OUTPUTS_DIR = Path(__file__).parent.parent.parent / "generated_documents"
 OUTPUTS_DIR.mkdir(exist_ok=True)
 
 
-def generate_minuta_compraventa(data: dict, current_user=None) -> str:
-    """
-    Genera una minuta de compraventa, la guarda en disco y retorna el path.
-
-    Args:
-        data: Diccionario con todos los datos del formulario
-        current_user: Usuario actual (opcional, para nombre de archivo)
-
-    Returns:
-        str con el path del archivo generado
-    """
-    template_path = TEMPLATES_DIR / "minuta_compraventa.docx"
-
-    if not template_path.exists():
-        raise FileNotFoundError(f"Plantilla no encontrada en: {template_path}")
-
-    doc = DocxTemplate(str(template_path))
-
+def build_minuta_context(data: dict) -> dict:
+    """Arma el contexto de la plantilla de minuta de compraventa a partir del formulario"""
     # Inicializar contexto
     context = {}
 
@@ -708,16 +681,58 @@ def generate_minuta_compraventa(data: dict, current_user=None) -> str:
         'provincia': abogado.get('provincia', ''),
     }
 
+    return context
+
+
+def render_minuta_compraventa(data: dict) -> BytesIO:
+    """
+    Genera una minuta de compraventa en formato .docx, en memoria.
+
+    Args:
+        data: Diccionario con todos los datos del formulario
+
+    Returns:
+        BytesIO con el documento generado
+    """
+    template_path = TEMPLATES_DIR / "minuta_compraventa.docx"
+
+    if not template_path.exists():
+        raise FileNotFoundError(f"Plantilla no encontrada en: {template_path}")
+
+    doc = template_registry.get(template_path)
+
+    context = build_minuta_context(data)
+
     # ============================================
-    # RENDERIZAR Y GUARDAR EN DISCO
+    # RENDERIZAR DOCUMENTO
     # ============================================
     doc.render(context)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    user_id = current_user.id if current_user else "unknown"
-    filename = f"minuta_compraventa_{user_id}_{timestamp}.docx"
+    file_stream = BytesIO()
+    doc.save(file_stream)
+    file_stream.seek(0)
+
+    return file_stream
+
+
+def generate_minuta_compraventa(data: dict, user_id=None) -> str:
+    """
+    Genera una minuta de compraventa, la guarda en disco y retorna el path.
+
+    Args:
+        data: Diccionario con todos los datos del formulario
+        user_id: ID del usuario actual (opcional, para nombre de archivo)
+
+    Returns:
+        str con el path del archivo generado
+    """
+    file_stream = render_minuta_compraventa(data)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    filename = f"minuta_compraventa_{user_id or 'unknown'}_{timestamp}.docx"
     output_path = OUTPUTS_DIR / filename
 
-    doc.save(str(output_path))
+    with open(str(output_path), "wb") as f:
+        f.write(file_stream.read())
 
-    return str(output_path)
\ No newline at end of file
+    return str(output_path)
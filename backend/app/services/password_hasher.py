@@ -0,0 +1,147 @@
+"""
+Pool de hilos propio para bcrypt.
+
+Cada hash o verificación con 12 rondas son ~250 ms de CPU. En el threadpool
+compartido de FastAPI, una ráfaga de logins ocupa los hilos que usan todos
+los demás endpoints síncronos. Aquí el trabajo va a PASSWORD_HASH_WORKERS
+hilos dedicados (bcrypt libera el GIL mientras calcula) con una cola de
+espera de PASSWORD_HASH_QUEUE_SIZE: con la cola llena se lanza
+HasherSaturado y la API responde 429 en vez de acumular peticiones.
+
+Uso desde un endpoint async:
+    valido, hash_nuevo = await password_hasher.verify(password, user.password)
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import settings
+from app.utils import metrics
+from app.utils.auth import get_password_hash, verify_and_update_password
+
+password_hash_queue_depth = metrics.registry.gauge(
+    "password_hash_queue_depth",
+    "Operaciones de bcrypt esperando un hilo libre",
+)
+password_hash_in_progress = metrics.registry.gauge(
+    "password_hash_in_progress",
+    "Operaciones de bcrypt en curso",
+)
+password_hash_wait_seconds = metrics.registry.histogram(
+    "password_hash_wait_seconds",
+    "Tiempo en cola antes de empezar el hash",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+password_hash_seconds = metrics.registry.histogram(
+    "password_hash_seconds",
+    "Duración de cada operación de bcrypt",
+    ("operation",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+password_hash_rejected_total = metrics.registry.counter(
+    "password_hash_rejected_total",
+    "Operaciones de bcrypt rechazadas con la cola llena (429)",
+)
+
+
+class HasherSaturado(Exception):
+    """La cola de bcrypt está llena; la API responde 429"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Cola de hash de contraseñas llena")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+        self._en_espera = 0
+        self._en_curso = 0
+        self.workers = 0
+        self.max_pendientes = 0
+
+    def start(self):
+        with self._lock:
+            if self._executor is not None:
+                return
+            self.workers = max(1, settings.PASSWORD_HASH_WORKERS)
+            self.max_pendientes = self.workers + max(0, settings.PASSWORD_HASH_QUEUE_SIZE)
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _publicar(self):
+        password_hash_queue_depth.set(self._en_espera)
+        password_hash_in_progress.set(self._en_curso)
+
+    def _ejecutar(self, operacion, encolado, fn, args):
+        with self._lock:
+            self._en_espera -= 1
+            self._en_curso += 1
+            self._publicar()
+        inicio = time.perf_counter()
+        password_hash_wait_seconds.observe(inicio - encolado)
+        try:
+            return fn(*args)
+        finally:
+            password_hash_seconds.observe(time.perf_counter() - inicio, operation=operacion)
+            with self._lock:
+                self._en_curso -= 1
+                self._publicar()
+
+    def _submit(self, operacion, fn, args):
+        with self._lock:
+            executor = self._executor
+            if executor is None:
+                return None
+            if self._en_espera + self._en_curso >= self.max_pendientes:
+                password_hash_rejected_total.inc()
+                # Lo que tarda en vaciarse la cola, a ~250 ms por operación
+                raise HasherSaturado(retry_after=max(1, round(self.max_pendientes * 0.25 / self.workers)))
+            self._en_espera += 1
+            self._publicar()
+        try:
+            return executor.submit(self._ejecutar, operacion, time.perf_counter(), fn, args)
+        except RuntimeError:
+            # Pool apagándose
+            with self._lock:
+                self._en_espera -= 1
+                self._publicar()
+            raise
+
+    async def _run(self, operacion, fn, *args):
+        future = self._submit(operacion, fn, args)
+        if future is None:
+            # Pool no iniciado (scripts, pruebas): usar un hilo
+            return await asyncio.to_thread(fn, *args)
+        return await asyncio.wrap_future(future)
+
+    def _run_sync(self, operacion, fn, *args):
+        """Para endpoints síncronos: bloquea el hilo actual mientras espera"""
+        future = self._submit(operacion, fn, args)
+        if future is None:
+            return fn(*args)
+        return future.result()
+
+    # ============================================
+    # API
+    # ============================================
+
+    async def verify(self, password: str, hashed: str):
+        """(valido, hash_nuevo o None si no hace falta rehashear)"""
+        return await self._run("verify", verify_and_update_password, password, hashed)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", get_password_hash, password)
+
+    def hash_sync(self, password: str) -> str:
+        return self._run_sync("hash", get_password_hash, password)
+
+
+password_hasher = PasswordHasher()
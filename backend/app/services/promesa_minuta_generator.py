@@ -1,4 +1,3 @@
-from docxtpl import DocxTemplate
 from io import BytesIO
 from ..utils.number_to_words import (
     numero_a_letras,
@@ -20,6 +19,7 @@ from .minuta_generator import (
     procesar_aclaratorias_declaratoria,
     limpiar_html,
 )
+from .template_registry import template_registry
 import re
 from datetime import datetime
 
@@ -135,18 +135,8 @@ def procesar_clausula_penal(penal_data: dict, precio_total) -> dict:
 # GENERADOR PRINCIPAL
 # ============================================
 
-def generate_promesa_minuta(data: dict, template_path: str) -> BytesIO:
-    """
-    Genera una minuta de promesa de compraventa en formato .docx.
-
-    Args:
-        data: Diccionario con todos los datos del formulario
-        template_path: Ruta al archivo de plantilla .docx
-
-    Returns:
-        BytesIO con el documento generado
-    """
-    doc = DocxTemplate(template_path)
+def build_promesa_context(data: dict) -> dict:
+    """Arma el contexto de la plantilla de promesa de compraventa a partir del formulario"""
     context = {}
 
     # ============================================
@@ -509,6 +499,23 @@ def generate_promesa_minuta(data: dict, template_path: str) -> BytesIO:
         'provincia': abogado.get('provincia', ''),
     }
 
+    return context
+
+
+def generate_promesa_minuta(data: dict, template_path: str) -> BytesIO:
+    """
+    Genera una minuta de promesa de compraventa en formato .docx.
+
+    Args:
+        data: Diccionario con todos los datos del formulario
+        template_path: Ruta al archivo de plantilla .docx
+
+    Returns:
+        BytesIO con el documento generado
+    """
+    doc = template_registry.get(template_path)
+    context = build_promesa_context(data)
+
     # ============================================
     # RENDERIZAR DOCUMENTO
     # ============================================
@@ -522,7 +529,7 @@ def generate_promesa_minuta(data: dict, template_path: str) -> BytesIO:
 
 
 
-def generate_promesa_minuta_compraventa(data: dict, current_user=None) -> str:
+def generate_promesa_minuta_compraventa(data: dict, user_id=None) -> str:
     """
     Genera minuta de promesa de compraventa, guarda en disco y retorna path.
     """
@@ -533,9 +540,8 @@ def generate_promesa_minuta_compraventa(data: dict, current_user=None) -> str:
 
     file_stream = generate_promesa_minuta(data, str(template_path))
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    user_id = current_user.id if current_user else "unknown"
-    filename = f"minuta_promesa_{user_id}_{timestamp}.docx"
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    filename = f"minuta_promesa_{user_id or 'unknown'}_{timestamp}.docx"
     output_path = OUTPUTS_DIR / filename
 
     with open(str(output_path), "wb") as f:
@@ -0,0 +1,328 @@
+"""
+Caché de documentos renderizados, direccionada por contenido.
+
+La clave es el sha256 de:
+- el tipo de documento,
+- el JSON canónico del payload (claves ordenadas, sin espacios),
+- la versión de la plantilla: hash del .docx y de los módulos que arman el contexto,
+- la fecha del día (las edades y la fecha por defecto dependen de "hoy").
+
+Un doble clic, un reintento o volver a generar sin cambios devuelve el .docx
+ya guardado. Los archivos viven en RENDER_CACHE_DIR/<ab>/<clave>.docx y son
+copias propias, nunca hard links con el storage: el mtime de una entrada es
+el reloj LRU del caché (la retención del storage usa el del archivo
+guardado) y expulsarla libera lo que se contó.
+
+La expulsión es LRU por tamaño total (RENDER_CACHE_MAX_MB). El índice es el
+propio directorio, compartido por todos los workers de uvicorn: cada acierto
+actualiza el mtime del archivo, y la expulsión recorre el directorio, suma
+lo que ocupan todos y borra los de mtime más viejo. Cada proceso lleva solo
+una estimación (el último recorrido más lo que escribió desde entonces) y
+vuelve a recorrer cuando escribió _RECORRER_FRACCION de la cuota, cuando la
+estimación la supera o cada _RECORRER_SEGUNDOS; un lock de archivo (flock)
+evita que dos procesos expulsen a la vez. El exceso sobre la cuota queda
+acotado a lo que escriban los workers entre dos recorridos.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+from app.config import settings
+from app.services import storage
+from app.services.storage import document_storage
+from app.services.render_pool import render_pool
+from app.services.renderers import render_document_timed
+from app.utils import metrics
+
+try:
+    import fcntl
+except ImportError:   # Windows (desarrollo, un solo proceso)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_RECORRER_FRACCION = 0.05   # de la cuota escrita por este proceso
+_RECORRER_SEGUNDOS = 60
+
+SERVICES_DIR = Path(__file__).parent
+APP_DIR = SERVICES_DIR.parent
+TEMPLATES_DIR = APP_DIR / "templates"
+
+# Archivos que determinan el resultado de cada tipo de documento
+_UTILS = [APP_DIR / "utils" / "number_to_words.py", APP_DIR / "utils" / "html_to_richtext.py"]
+FUENTES = {
+    "minuta": [TEMPLATES_DIR / "minuta_compraventa.docx", SERVICES_DIR / "minuta_generator.py"] + _UTILS,
+    "promesa": [
+        TEMPLATES_DIR / "minuta_promesa_compraventa.docx",
+        SERVICES_DIR / "promesa_minuta_generator.py",
+        SERVICES_DIR / "minuta_generator.py",
+    ] + _UTILS,
+    "matriz": [TEMPLATES_DIR / "compraventa.docx", SERVICES_DIR / "document_generator.py"] + _UTILS,
+}
+
+
+def canonical_json(payload) -> bytes:
+    """Serialización estable: el mismo contenido siempre da los mismos bytes"""
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+cache_requests_total = metrics.registry.counter(
+    "render_cache_requests_total", "Consultas al caché de renderizado", ("result",)
+)
+cache_evictions_total = metrics.registry.counter(
+    "render_cache_evictions_total", "Entradas expulsadas del caché de renderizado"
+)
+cache_bytes = metrics.registry.gauge("render_cache_bytes", "Tamaño ocupado por el caché de renderizado")
+cache_entries = metrics.registry.gauge("render_cache_entries", "Documentos en el caché de renderizado")
+
+
+class RenderCache:
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Estimación de lo que ocupa el directorio (todos los procesos)
+        self._total = 0
+        self._count = 0
+        self._escrito = 0              # bytes escritos por este proceso desde el último recorrido
+        self._recorrido = None         # time.monotonic() del último recorrido
+        self._recorriendo = False
+        self._versions = {}             # tipo -> (firma de archivos, hash)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    # ============================================
+    # CLAVES
+    # ============================================
+
+    def template_version(self, tipo: str) -> str:
+        """Hash de la plantilla y del código del generador; se recalcula solo si cambian"""
+        fuentes = FUENTES[tipo]
+        firma = tuple((str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in fuentes)
+        cached = self._versions.get(tipo)
+        if cached and cached[0] == firma:
+            return cached[1]
+
+        h = hashlib.sha256()
+        for p in fuentes:
+            h.update(p.read_bytes())
+        version = h.hexdigest()
+        self._versions[tipo] = (firma, version)
+        return version
+
+    def key(self, tipo: str, payload) -> str:
+        h = hashlib.sha256()
+        h.update(tipo.encode())
+        h.update(b"\0")
+        h.update(self.template_version(tipo).encode())
+        h.update(b"\0")
+        h.update(date.today().isoformat().encode())
+        h.update(b"\0")
+        h.update(canonical_json(payload))
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.docx"
+
+    # ============================================
+    # ÍNDICE LRU (el directorio)
+    # ============================================
+
+    def _archivos(self) -> list:
+        """(mtime, path, tamaño) de las entradas en disco, de la menos a la más usada"""
+        archivos = []
+        if self.directory.exists():
+            for p in self.directory.glob("*/*.docx"):
+                try:
+                    st = p.stat()
+                    if st.st_nlink > 1:
+                        # Hard link con el storage (versiones anteriores): el
+                        # archivo guardado queda, la entrada se vuelve a crear
+                        p.unlink()
+                        continue
+                except FileNotFoundError:
+                    continue
+                archivos.append((st.st_mtime, p, st.st_size))
+        archivos.sort()
+        return archivos
+
+    def _recorrer(self):
+        """Suma el directorio y expulsa las entradas más viejas hasta entrar en la cuota"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / ".lock", "a") as candado:
+            if fcntl is not None:
+                # Un proceso expulsa a la vez; el siguiente ve lo que quedó
+                fcntl.flock(candado, fcntl.LOCK_EX)
+            archivos = self._archivos()
+            total = sum(size for _, _, size in archivos)
+            borrados = 0
+            for _, path, size in archivos:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+                borrados += 1
+        with self._lock:
+            self._total = total
+            self._count = len(archivos) - borrados
+            self._escrito = 0
+            self._recorrido = time.monotonic()
+            self.evictions += borrados
+        if borrados:
+            cache_evictions_total.inc(borrados)
+
+    def _register(self, size: int):
+        """Cuenta una entrada nueva; recorre el directorio si toca"""
+        with self._lock:
+            self._total += size
+            self._count += 1
+            self._escrito += size
+            toca = (
+                self._recorrido is None
+                or self._total > self.max_bytes
+                or self._escrito >= self.max_bytes * _RECORRER_FRACCION
+                or time.monotonic() - self._recorrido >= _RECORRER_SEGUNDOS
+            )
+            if not toca or self._recorriendo:
+                return
+            self._recorriendo = True
+        try:
+            self._recorrer()
+        finally:
+            with self._lock:
+                self._recorriendo = False
+
+    # ============================================
+    # API
+    # ============================================
+
+    def lookup(self, key: str) -> Optional[bytes]:
+        """Contenido del documento en caché, o None"""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            content = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            # Nunca se guardó, o la expulsó este u otro proceso
+            content = None
+        with self._lock:
+            if content is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        cache_requests_total.inc(result="miss" if content is None else "hit")
+        return content
+
+    def store_bytes(self, key: str, content: bytes):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        storage.write_atomic(str(path), content)
+        self._register(len(content))
+
+    def _cached(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def save(self, key: str, content: bytes, file_key: Optional[str] = None, tipo: str = ""):
+        """Guarda el documento ya entregado: en el storage si se persiste, y en el caché"""
+        if file_key is not None:
+            with metrics.stage_timer(tipo, "storage"):
+                document_storage.write(file_key, content)
+        if self.enabled and not self._cached(key):
+            self.store_bytes(key, content)
+
+    def persist(self, key: str, content: bytes, file_key: Optional[str] = None, tipo: str = ""):
+        """save() para después de la respuesta: los errores solo se registran"""
+        try:
+            self.save(key, content, file_key, tipo)
+        except Exception:
+            logger.exception("Error al guardar documento %s", file_key or key)
+
+    def clear(self):
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self._total = self._count = self._escrito = 0
+            self._recorrido = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "entries": self._count,
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+            }
+
+    # ============================================
+    # GENERACIÓN CON CACHÉ
+    # ============================================
+
+    def _buscar(self, tipo: str, payload) -> tuple:
+        """(clave, bytes del caché o None); hashea el payload y lee disco"""
+        key = self.key(tipo, payload)
+        return key, self.lookup(key)
+
+    async def render(self, tipo: str, payload) -> tuple:
+        """(clave, bytes del .docx): del caché si existe, si no del render_pool"""
+        key, content = await asyncio.to_thread(self._buscar, tipo, payload)
+        if content is not None:
+            metrics.documents_generated_total.inc(document_type=tipo, source="cache")
+            return key, content
+        content, tiempos = await render_pool.run(render_document_timed, tipo, payload)
+        metrics.observe_stages(tipo, tiempos)
+        metrics.documents_generated_total.inc(document_type=tipo, source="render")
+        return key, content
+
+    def render_sync(self, tipo: str, payload) -> tuple:
+        """Igual que render() para rutas síncronas"""
+        key, content = self._buscar(tipo, payload)
+        if content is not None:
+            metrics.documents_generated_total.inc(document_type=tipo, source="cache")
+            return key, content
+        content, tiempos = render_pool.run_sync(render_document_timed, tipo, payload)
+        metrics.observe_stages(tipo, tiempos)
+        metrics.documents_generated_total.inc(document_type=tipo, source="render")
+        return key, content
+
+    async def generate(self, tipo: str, payload, prefijo: str) -> tuple:
+        """Renderiza y guarda en el storage; retorna (clave, file_hash) (cola de trabajos)"""
+        key, content = await self.render(tipo, payload)
+        file_key = storage.new_key(prefijo)
+        await asyncio.to_thread(self.save, key, content, file_key, tipo)
+        return file_key, storage.hash_contenido(content)
+
+
+render_cache = RenderCache(
+    Path(settings.RENDER_CACHE_DIR) if settings.RENDER_CACHE_DIR else storage.LOCAL_DIR / ".cache",
+    settings.RENDER_CACHE_MAX_MB * 1024 * 1024,
+)
+
+
+def _collect_cache_stats():
+    stats = render_cache.stats()
+    cache_bytes.set(stats["bytes"])
+    cache_entries.set(stats["entries"])
+
+
+metrics.registry.add_collector(_collect_cache_stats)
@@ -0,0 +1,151 @@
+"""
+Pool de procesos para renderizar documentos.
+
+docxtpl/Jinja y la escritura del zip son CPU puro: ejecutarlos en el hilo
+del request bloquea el event loop y limita el nodo a un solo núcleo.
+Los generate_* se ejecutan en procesos precalentados (plantillas ya
+parseadas). Los procesos se reciclan por generación: después de
+RENDER_POOL_SIZE x RENDER_POOL_MAX_TASKS_PER_CHILD trabajos se levanta un
+pool nuevo y el anterior termina lo que tenía en cola y se cierra.
+(No se usa max_tasks_per_child de ProcessPoolExecutor porque en Python 3.11
+puede quedarse colgado al reemplazar procesos.)
+
+Uso desde un endpoint async:
+    output_path = await render_pool.run(generate_minuta_compraventa, data, user_id)
+
+Los argumentos y el resultado deben ser serializables con pickle
+(dicts, strings, bytes); no pasar objetos de SQLAlchemy.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+def _init_worker():
+    """Precalienta el proceso: configura el logging, importa los generadores y parsea las plantillas"""
+    from app.logging_config import setup_logging
+    from app.services.template_registry import template_registry
+    from app.services.minuta_generator import TEMPLATES_DIR
+    import app.services.document_generator  # noqa: F401
+    import app.services.promesa_minuta_generator  # noqa: F401
+
+    setup_logging()
+    template_registry.preload(
+        TEMPLATES_DIR / "compraventa.docx",
+        TEMPLATES_DIR / "minuta_compraventa.docx",
+        TEMPLATES_DIR / "minuta_promesa_compraventa.docx",
+    )
+
+
+def _ping():
+    return os.getpid()
+
+
+class RenderPool:
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+        self._tasks = 0
+        self.size = 0
+        self.max_tasks = 0
+
+    def _create_executor(self):
+        """Crea un pool nuevo y levanta todos sus procesos sin esperar a que arranquen"""
+        executor = ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        for _ in range(self.size):
+            executor.submit(_ping)
+        self._tasks = 0
+        return executor
+
+    def start(self):
+        from app.config import settings
+
+        with self._lock:
+            if self._executor is not None:
+                return
+            self.size = settings.RENDER_POOL_SIZE or os.cpu_count() or 1
+            self.max_tasks = settings.RENDER_POOL_MAX_TASKS_PER_CHILD * self.size
+            self._executor = self._create_executor()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def _restart(self, broken):
+        """Reemplaza un pool roto (p. ej. un proceso murió por falta de memoria)"""
+        with self._lock:
+            if self._executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._create_executor()
+
+    def _contar(self):
+        """
+        Cuenta el trabajo enviado (con el lock tomado) y reemplaza el pool
+        cuando alcanzó su cuota; devuelve el anterior para cerrarlo, o None
+        """
+        self._tasks += 1
+        if not self.max_tasks or self._tasks < self.max_tasks:
+            return None
+        old = self._executor
+        self._executor = self._create_executor()
+        return old
+
+    def _submit(self, fn, args):
+        """(pool, future) del envío; (None, None) si el pool no está iniciado"""
+        for reintento in (False, True):
+            with self._lock:
+                # Se envía con el lock tomado: un reciclado de otro hilo no
+                # puede cerrar este pool entre leerlo y enviar
+                executor = self._executor
+                if executor is None:
+                    return None, None
+                try:
+                    future = executor.submit(fn, *args)
+                except BrokenProcessPool:
+                    if reintento:
+                        raise
+                    future = None
+                else:
+                    old = self._contar()
+            if future is not None:
+                if old is not None:
+                    # Los trabajos ya encolados en el pool anterior terminan normalmente
+                    old.shutdown(wait=False)
+                return executor, future
+            # Un reintento en un pool nuevo
+            self._restart(executor)
+
+    def run_sync(self, fn, *args):
+        """Para endpoints síncronos: bloquea el hilo actual, no el event loop"""
+        executor, future = self._submit(fn, args)
+        if future is None:
+            return fn(*args)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise
+
+    async def run(self, fn, *args):
+        """Ejecuta fn(*args) en el pool sin bloquear el event loop"""
+        executor, future = self._submit(fn, args)
+        if future is None:
+            # Pool no iniciado (scripts, pruebas): usar un hilo
+            return await asyncio.to_thread(fn, *args)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise
+
+
+render_pool = RenderPool()
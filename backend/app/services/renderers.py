@@ -0,0 +1,46 @@
+"""
+Renderizado en memoria de cada tipo de documento.
+
+render_document_timed() es la función que se envía al render_pool: recibe el
+tipo y el payload y devuelve los bytes del .docx, sin pasar por disco, junto
+con la duración de cada etapa (context, render, save) para las métricas.
+"""
+import time
+from io import BytesIO
+
+from app.services.template_registry import template_registry
+from app.services.minuta_generator import build_minuta_context, TEMPLATES_DIR
+from app.services.promesa_minuta_generator import build_promesa_context
+from app.services.document_generator import build_matriz_context
+
+# tipo -> (armado del contexto, plantilla, argumentos de doc.render)
+RENDERERS = {
+    "minuta": (build_minuta_context, "minuta_compraventa.docx", {}),
+    "promesa": (build_promesa_context, "minuta_promesa_compraventa.docx", {}),
+    "matriz": (build_matriz_context, "compraventa.docx", {"autoescape": False}),
+}
+
+TIPOS = tuple(RENDERERS)
+
+
+def render_document_timed(tipo: str, data: dict) -> tuple:
+    """(bytes del .docx, {etapa: segundos})"""
+    if tipo not in RENDERERS:
+        raise ValueError(f"Tipo de documento desconocido: {tipo}")
+    build, plantilla, render_kwargs = RENDERERS[tipo]
+
+    t0 = time.perf_counter()
+    context = build(data)
+    t1 = time.perf_counter()
+    doc = template_registry.get(TEMPLATES_DIR / plantilla)
+    doc.render(context, **render_kwargs)
+    t2 = time.perf_counter()
+    stream = BytesIO()
+    doc.save(stream)
+    t3 = time.perf_counter()
+
+    return stream.getvalue(), {"context": t1 - t0, "render": t2 - t1, "save": t3 - t2}
+
+
+def render_document(tipo: str, data: dict) -> bytes:
+    return render_document_timed(tipo, data)[0]
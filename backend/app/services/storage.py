@@ -0,0 +1,315 @@
+"""
+Almacenamiento de los documentos generados.
+
+En la BD (Minute.file_path, Document.file_path, GenerationJob.file_path) se
+guarda una clave relativa, por ejemplo "3f/a2/minuta_compraventa_1_20250101_101010_123456.docx";
+el backend configurado (STORAGE_BACKEND) decide dónde vive el archivo:
+
+- local: STORAGE_LOCAL_DIR (por defecto generated_documents/), repartido en
+  subdirectorios por hash para que ningún directorio crezca sin límite.
+- s3: cualquier servicio compatible con S3 (AWS, MinIO...). Requiere boto3.
+  Permite que varios nodos de la API compartan los archivos.
+
+Los registros antiguos con path absoluto se siguen leyendo con el backend
+local; migrate_storage.py los pasa al esquema nuevo.
+
+La retención (STORAGE_RETENTION_DAYS / STORAGE_QUOTA_MB) borra los archivos
+más viejos; la descarga de un registro cuyo archivo ya no existe responde 404.
+
+Las rutas de generación responden con los bytes renderizados en memoria;
+guardar el archivo es un paso aparte que se ejecuta después de enviar la
+respuesta (BackgroundTasks) y que se puede desactivar con PERSIST_DOCUMENTS.
+Junto con la clave se guarda el SHA-256 del contenido (file_hash), que es el
+ETag de la descarga.
+
+Descargas (DOWNLOAD_MODE), ver app/utils/descargas.py:
+- python: la API envía el archivo (FileResponse en local, con Range y HEAD;
+  get_object con Range en S3).
+- x-accel: solo encabezados; nginx entrega el archivo desde una location
+  internal (DOWNLOAD_ACCEL_PREFIX) con alias a STORAGE_LOCAL_DIR:
+
+      location /_documentos/ {
+          internal;
+          alias /srv/notarial/generated_documents/;
+      }
+
+- x-sendfile: igual, con X-Sendfile y el path absoluto (Apache mod_xsendfile,
+  lighttpd).
+
+Con x-accel y x-sendfile el proxy atiende Range, HEAD y la transferencia, y
+el worker de Python queda libre apenas arma la respuesta. S3 (y, con x-accel,
+los registros antiguos con path absoluto) siguen en modo python.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import quote
+
+from fastapi import Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+OUTPUTS_DIR = Path(__file__).parent.parent.parent / "generated_documents"
+
+LOCAL_DIR = Path(settings.STORAGE_LOCAL_DIR) if settings.STORAGE_LOCAL_DIR else OUTPUTS_DIR
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+CHUNK_SIZE = 64 * 1024
+
+
+def write_atomic(path: str, content: bytes):
+    """Escritura atómica: quien descargue nunca ve un archivo a medias"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def hash_contenido(content: bytes) -> str:
+    """SHA-256 del documento (file_hash del registro)"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def _disposicion(filename: str) -> str:
+    return f'attachment; filename="{filename}"'
+
+
+def new_key(prefijo: str) -> str:
+    """Clave única para un documento nuevo: <ab>/<cd>/<prefijo>_<timestamp>.docx"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    nombre = f"{prefijo}_{timestamp}.docx"
+    h = hashlib.sha1(nombre.encode()).hexdigest()
+    return f"{h[:2]}/{h[2:4]}/{nombre}"
+
+
+class StoredFile:
+    """Entrada del listado usado por la retención"""
+
+    def __init__(self, key: str, size: int, mtime: float):
+        self.key = key
+        self.size = size
+        self.mtime = mtime
+
+
+class LocalStorage:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def local_path(self, key: str) -> str:
+        # Registros anteriores: path absoluto tal cual se guardó
+        if os.path.isabs(key):
+            return key
+        return str(self.root / key)
+
+    def write(self, key: str, content: bytes):
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, content)
+
+    def read(self, key: str) -> bytes:
+        with open(self.local_path(key), "rb") as f:
+            return f.read()
+
+    def exists(self, key: str) -> bool:
+        return bool(key) and os.path.exists(self.local_path(key))
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
+            pass
+
+    def iter_files(self) -> Iterator[StoredFile]:
+        # Archivos sueltos del esquema plano anterior + subdirectorios por hash
+        for pattern in ("*.docx", "??/??/*.docx"):
+            for p in self.root.glob(pattern):
+                try:
+                    st = p.stat()
+                except FileNotFoundError:
+                    continue
+                yield StoredFile(str(p.relative_to(self.root)), st.st_size, st.st_mtime)
+
+    def delega(self, key: str) -> bool:
+        """El proxy entrega este archivo (DOWNLOAD_MODE x-accel o x-sendfile)"""
+        if settings.DOWNLOAD_MODE == "x-sendfile":
+            return True
+        # X-Accel-Redirect solo alcanza lo que está bajo la location de nginx
+        return settings.DOWNLOAD_MODE == "x-accel" and not os.path.isabs(key)
+
+    def response(self, key: str, filename: str, headers: dict, request: Optional[Request] = None):
+        """Descarga; FileResponse ya atiende Range, If-Range y HEAD"""
+        if self.delega(key):
+            headers = {**headers, "Content-Type": DOCX_MEDIA_TYPE, "Content-Disposition": _disposicion(filename)}
+            if settings.DOWNLOAD_MODE == "x-sendfile":
+                headers["X-Sendfile"] = os.path.abspath(self.local_path(key))
+            else:
+                headers["X-Accel-Redirect"] = settings.DOWNLOAD_ACCEL_PREFIX.rstrip("/") + "/" + quote(key)
+            return Response(headers=headers)
+        return FileResponse(self.local_path(key), media_type=DOCX_MEDIA_TYPE, filename=filename, headers=headers)
+
+
+class S3Storage:
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None,
+                 access_key: Optional[str] = None, secret_key: Optional[str] = None,
+                 region: Optional[str] = None):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=s3 requiere boto3 (pip install boto3)")
+
+        self._ClientError = ClientError
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            region_name=region,
+        )
+
+    def _object(self, key: str) -> str:
+        return self.prefix + key
+
+    def local_path(self, key: str) -> Optional[str]:
+        return None
+
+    def write(self, key: str, content: bytes):
+        self.client.put_object(
+            Bucket=self.bucket, Key=self._object(key), Body=content, ContentType=DOCX_MEDIA_TYPE
+        )
+
+    def read(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=self._object(key))["Body"].read()
+
+    def exists(self, key: str) -> bool:
+        if not key:
+            return False
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object(key))
+            return True
+        except self._ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object(key))
+
+    def iter_files(self) -> Iterator[StoredFile]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                yield StoredFile(
+                    obj["Key"][len(self.prefix):], obj["Size"], obj["LastModified"].timestamp()
+                )
+
+    def delega(self, key: str) -> bool:
+        return False
+
+    def response(self, key: str, filename: str, headers: dict, request: Optional[Request] = None):
+        """Descarga desde el bucket; un Range simple se pide tal cual a S3"""
+        headers = {**headers, "Content-Disposition": _disposicion(filename), "Accept-Ranges": "bytes"}
+        objeto = {"Bucket": self.bucket, "Key": self._object(key)}
+
+        if request is not None and request.method == "HEAD":
+            headers["Content-Length"] = str(self.client.head_object(**objeto)["ContentLength"])
+            return Response(media_type=DOCX_MEDIA_TYPE, headers=headers)
+
+        rango = request.headers.get("Range") if request is not None else None
+        if_range = request.headers.get("If-Range") if request is not None else None
+        # Varios rangos no se soportan: se entrega el archivo completo (RFC 9110 lo permite)
+        if rango and "," not in rango and (if_range is None or if_range == headers.get("ETag")):
+            objeto["Range"] = rango
+        try:
+            obj = self.client.get_object(**objeto)
+        except self._ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "InvalidRange":
+                raise
+            tamano = self.client.head_object(Bucket=self.bucket, Key=self._object(key))["ContentLength"]
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={"Content-Range": f"bytes */{tamano}"}
+            )
+
+        headers["Content-Length"] = str(obj["ContentLength"])
+        codigo = status.HTTP_200_OK
+        if obj.get("ContentRange"):
+            headers["Content-Range"] = obj["ContentRange"]
+            codigo = status.HTTP_206_PARTIAL_CONTENT
+        return StreamingResponse(
+            obj["Body"].iter_chunks(CHUNK_SIZE),
+            status_code=codigo,
+            media_type=DOCX_MEDIA_TYPE,
+            headers=headers
+        )
+
+
+# ============================================
+# RETENCIÓN
+# ============================================
+
+def apply_retention(backend, max_age_days: int = 0, quota_bytes: int = 0) -> dict:
+    """
+    Borra los archivos más viejos que max_age_days y, si el total sigue
+    superando quota_bytes, los más antiguos hasta quedar bajo la cuota.
+    0 desactiva cada criterio.
+    """
+    archivos = sorted(backend.iter_files(), key=lambda f: f.mtime)
+    limite = time.time() - max_age_days * 86400 if max_age_days else None
+    total = sum(f.size for f in archivos)
+    borrados = liberados = 0
+
+    # Del más viejo al más nuevo: el primero que se queda marca el corte
+    for f in archivos:
+        vencido = limite is not None and f.mtime < limite
+        excedido = quota_bytes and total > quota_bytes
+        if not (vencido or excedido):
+            break
+        backend.delete(f.key)
+        total -= f.size
+        borrados += 1
+        liberados += f.size
+
+    return {"deleted": borrados, "freed_bytes": liberados, "remaining_bytes": total}
+
+
+def create_storage():
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage(
+            bucket=settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            access_key=settings.S3_ACCESS_KEY,
+            secret_key=settings.S3_SECRET_KEY,
+            region=settings.S3_REGION,
+        )
+    return LocalStorage(LOCAL_DIR)
+
+
+document_storage = create_storage()
+
+
+async def retention_loop():
+    """Aplica la retención periódicamente (tarea de fondo del lifespan)"""
+    while True:
+        try:
+            resultado = await asyncio.to_thread(
+                apply_retention, document_storage,
+                settings.STORAGE_RETENTION_DAYS, settings.STORAGE_QUOTA_MB * 1024 * 1024
+            )
+            if resultado["deleted"]:
+                logger.info("Retención de documentos: %s", resultado)
+        except Exception:
+            logger.exception("Error en retención de documentos")
+        await asyncio.sleep(settings.STORAGE_RETENTION_INTERVAL_MINUTES * 60)
@@ -0,0 +1,159 @@
+"""
+Índice en memoria para el buscador de plantillas (GET /api/templates).
+
+El buscador pedía `nombre ILIKE '%q%' OR nombre_vendedor ILIKE '%q%'`: con
+el comodín al inicio MySQL recorre la tabla entera, y además traía el
+contenido JSON de cada plantilla aunque la respuesta no lo usa.
+
+Aquí se guardan solo las columnas del resumen y un índice de trigramas sobre
+nombre y nombre_vendedor normalizados (minúsculas, sin tildes: "peña" encuentra
+"PENA" y "Peña"). Una búsqueda cruza las listas de los trigramas de q y
+confirma la subcadena en los candidatos: lo mismo que el ILIKE, además sin
+distinguir tildes, y sin tocar la BD.
+
+Cada TEMPLATE_INDEX_CHECK_SECONDS una búsqueda compara COUNT(id) y MAX(id)
+de templates con los del último llenado; si cambiaron, por altas o bajas en
+otro proceso, se vuelve a cargar el resumen completo. Las altas y bajas de
+este proceso llaman a invalidar() y se ven en la búsqueda siguiente. La
+consulta y la carga van fuera del lock, de a un hilo por vez: las demás
+búsquedas siguen con el índice vigente, y el lock solo se toma para leerlo
+o reemplazarlo.
+"""
+import threading
+import time
+import unicodedata
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.template import Template
+from app.utils import metrics
+
+template_index_reloads_total = metrics.registry.counter(
+    "template_index_reloads_total", "Cargas completas del índice del buscador de plantillas"
+)
+template_index_entries = metrics.registry.gauge(
+    "template_index_entries", "Plantillas en el índice del buscador"
+)
+
+_COLUMNAS = ("id", "nombre", "nombre_vendedor", "tipo_contrato", "tipo_documento", "creado_at")
+_N = 3
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin tildes ni diéresis (la ñ queda como n)"""
+    descompuesto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).casefold()
+
+
+def _trigramas(texto: str) -> set:
+    return {texto[i:i + _N] for i in range(len(texto) - _N + 1)}
+
+
+class TemplateIndex:
+    def __init__(self, intervalo: float = settings.TEMPLATE_INDEX_CHECK_SECONDS):
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._firma = None      # (COUNT(id), MAX(id)) del último llenado; None = recargar
+        self._revisado = 0.0    # time.monotonic() de la última comparación de la firma
+        self._generacion = 0    # sube con cada invalidar()
+        self._sincronizando = False
+        self._entradas = {}     # id -> (texto normalizado, resumen)
+        self._postings = {}     # trigrama -> set(id)
+        self.reloads = 0
+
+    @staticmethod
+    def _cargar(db: Session):
+        # Solo las columnas del resumen: contenido (JSON) no se lee
+        filas = db.query(*(getattr(Template, c) for c in _COLUMNAS)).all()
+        entradas, postings = {}, {}
+        for fila in filas:
+            resumen = dict(fila._mapping)
+            # El salto de línea evita trigramas que crucen de un campo al otro
+            texto = f"{normalizar(fila.nombre)}\n{normalizar(fila.nombre_vendedor)}"
+            entradas[fila.id] = (texto, resumen)
+            for trigrama in _trigramas(texto):
+                postings.setdefault(trigrama, set()).add(fila.id)
+        return entradas, postings
+
+    def _sincronizar(self, db: Session):
+        """(entradas, postings) vigentes; compara la firma si toca"""
+        ahora = time.monotonic()
+        with self._lock:
+            cargado = self._firma is not None
+            if cargado and (self._sincronizando or ahora - self._revisado < self.intervalo):
+                return self._entradas, self._postings
+            self._sincronizando = True
+            firma_anterior, generacion = self._firma, self._generacion
+
+        try:
+            firma = tuple(db.query(func.count(Template.id), func.max(Template.id)).one())
+            nuevo = self._cargar(db) if firma != firma_anterior else None
+        finally:
+            with self._lock:
+                self._sincronizando = False
+
+        with self._lock:
+            if generacion != self._generacion:
+                # invalidar() durante la carga: sirve para esta búsqueda, pero
+                # la próxima vuelve a cargar
+                return nuevo or (self._entradas, self._postings)
+            if nuevo is not None:
+                self._entradas, self._postings = nuevo
+                self.reloads += 1
+                template_index_reloads_total.inc()
+                template_index_entries.set(len(nuevo[0]))
+            self._firma, self._revisado = firma, ahora
+            return self._entradas, self._postings
+
+    def buscar(
+        self,
+        db: Session,
+        q: Optional[str] = None,
+        tipo_documento: Optional[str] = None,
+        tipo_contrato: Optional[str] = None,
+        limite: int = 10,
+    ) -> List[dict]:
+        """Resúmenes que coinciden, más recientes primero"""
+        entradas, postings = self._sincronizar(db)
+
+        termino = normalizar(q.strip()) if q else ""
+        if len(termino) >= _N:
+            candidatos = None
+            for trigrama in _trigramas(termino):
+                ids = postings.get(trigrama)
+                if not ids:
+                    return []
+                candidatos = set(ids) if candidatos is None else candidatos & ids
+            candidatos = (entradas[i] for i in candidatos)
+        else:
+            # Una o dos letras: no hay trigramas, se recorre el resumen en memoria
+            candidatos = entradas.values()
+
+        resultados = [
+            resumen for texto, resumen in candidatos
+            if termino in texto
+            and (not tipo_documento or resumen["tipo_documento"] == tipo_documento)
+            and (not tipo_contrato or resumen["tipo_contrato"] == tipo_contrato)
+        ]
+        resultados.sort(key=lambda r: (r["creado_at"] is not None, r["creado_at"] or 0, r["id"]), reverse=True)
+        return resultados[:limite]
+
+    def invalidar(self):
+        """Forzar la recarga en la próxima búsqueda (altas y bajas de este proceso)"""
+        with self._lock:
+            self._firma = None
+            self._generacion += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entradas),
+                "trigrams": len(self._postings),
+                "reloads": self.reloads,
+            }
+
+
+template_index = TemplateIndex()
@@ -0,0 +1,159 @@
+"""
+Registro de plantillas .docx parseadas.
+
+Cada plantilla se lee, se limpia (patch_xml) y se compila con Jinja una sola
+vez; cada render recibe un clon barato que reutiliza ese trabajo y sólo
+reconstruye el Document de python-docx desde los bytes en memoria.
+La plantilla se recarga automáticamente si cambia el archivo en disco.
+"""
+import os
+import re
+import threading
+from io import BytesIO
+from pathlib import Path
+
+from docx import Document
+from docxtpl import DocxTemplate
+from jinja2 import Template
+from jinja2.exceptions import TemplateError
+
+
+class _ParsedTemplate:
+    """Plantilla parseada una vez: bytes, XML ya parcheado y Jinja compilado"""
+
+    def __init__(self, path: str, mtime_ns: int, size: int, blob: bytes):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.blob = blob
+        self._lock = threading.Lock()
+        self._compiled = {}
+        self._parts_xml = {}
+
+        # XML del cuerpo parcheado, listo para Jinja
+        master = DocxTemplate(BytesIO(blob))
+        master.init_docx()
+        self._master = master
+        self.body_xml = master.patch_xml(master.get_xml())
+
+    def part_xml(self, part):
+        """XML parcheado de un header/footer, cacheado por nombre de parte"""
+        key = str(part.partname)
+        cached = self._parts_xml.get(key)
+        if cached is None:
+            xml = self._master.get_part_xml(part)
+            encoding = self._master.get_headers_footers_encoding(xml)
+            cached = (self._master.patch_xml(xml), encoding)
+            with self._lock:
+                self._parts_xml[key] = cached
+        return cached
+
+    def compile(self, src_xml: str) -> Template:
+        """Template de Jinja compilado para un XML parcheado (entorno por defecto)"""
+        template = self._compiled.get(src_xml)
+        if template is None:
+            template = Template(re.sub(r"<w:p([ >])", r"\n<w:p\1", src_xml))
+            with self._lock:
+                self._compiled[src_xml] = template
+        return template
+
+
+class CachedDocxTemplate(DocxTemplate):
+    """
+    DocxTemplate que reutiliza el XML parcheado y los templates compilados
+    de una _ParsedTemplate. Se usa igual que DocxTemplate (render/save).
+    """
+
+    def __init__(self, source: _ParsedTemplate):
+        super().__init__(BytesIO(source.blob))
+        self._source = source
+
+    def init_docx(self, reload: bool = True):
+        if not self.docx or (self.is_rendered and reload):
+            self.docx = Document(BytesIO(self._source.blob))
+            self.is_rendered = False
+
+    def build_xml(self, context, jinja_env=None):
+        return self.render_xml_part(self._source.body_xml, self.docx._part, context, jinja_env)
+
+    def build_headers_footers_xml(self, context, uri, jinja_env=None):
+        for relKey, part in self.get_headers_footers(uri):
+            xml, encoding = self._source.part_xml(part)
+            xml = self.render_xml_part(xml, part, context, jinja_env)
+            yield relKey, xml.encode(encoding)
+
+    def render_xml_part(self, src_xml, part, context, jinja_env=None):
+        # Con un entorno Jinja propio no se cachea (puede traer filtros distintos)
+        if jinja_env is not None:
+            return super().render_xml_part(src_xml, part, context, jinja_env)
+
+        try:
+            self.current_rendering_part = part
+            dst_xml = self._source.compile(src_xml).render(context)
+        except TemplateError as exc:
+            if hasattr(exc, "lineno") and exc.lineno is not None:
+                line_number = max(exc.lineno - 4, 0)
+                exc.docx_context = map(
+                    lambda x: re.sub(r"<[^>]+>", "", x),
+                    src_xml.splitlines()[line_number: (line_number + 7)],
+                )
+            raise exc
+        dst_xml = re.sub(r"\n<w:p([ >])", r"<w:p\1", dst_xml)
+        dst_xml = (
+            dst_xml.replace("{_{", "{{")
+            .replace("}_}", "}}")
+            .replace("{_%", "{%")
+            .replace("%_}", "%}")
+        )
+        dst_xml = self.resolve_listing(dst_xml)
+        return dst_xml
+
+
+class TemplateRegistry:
+    """
+    Cache de plantillas por path + mtime.
+
+    Uso:
+        doc = template_registry.get(TEMPLATES_DIR / "minuta_compraventa.docx")
+        doc.render(context)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._templates = {}
+
+    def _load(self, path: str) -> _ParsedTemplate:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Plantilla no encontrada en: {path}")
+
+        parsed = self._templates.get(path)
+        if parsed and parsed.mtime_ns == stat.st_mtime_ns and parsed.size == stat.st_size:
+            return parsed
+
+        with self._lock:
+            parsed = self._templates.get(path)
+            if parsed and parsed.mtime_ns == stat.st_mtime_ns and parsed.size == stat.st_size:
+                return parsed
+            with open(path, "rb") as f:
+                blob = f.read()
+            parsed = _ParsedTemplate(path, stat.st_mtime_ns, stat.st_size, blob)
+            self._templates[path] = parsed
+            return parsed
+
+    def get(self, template_path) -> CachedDocxTemplate:
+        """Devuelve un clon listo para renderizar de la plantilla indicada"""
+        return CachedDocxTemplate(self._load(str(Path(template_path))))
+
+    def preload(self, *template_paths):
+        """Parsea por adelantado las plantillas indicadas"""
+        for template_path in template_paths:
+            self._load(str(Path(template_path)))
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+
+template_registry = TemplateRegistry()
@@ -0,0 +1,98 @@
+"""
+Caché en memoria de los usuarios autenticados, por username.
+
+get_current_user consulta system_users en cada petición autenticada; con la
+caché, mientras la entrada esté vigente (AUTH_USER_CACHE_TTL_SECONDS) el
+usuario se reconstruye sin ir a la BD y se asocia a la sesión de la petición
+con merge(load=False), así las rutas reciben un SystemUser igual que antes.
+
+update_system_user, delete_system_user, change_password y el rehash del
+login invalidan la entrada del usuario modificado. Cada proceso de la API tiene su propia
+caché: en otros procesos el cambio se ve al vencer el TTL.
+"""
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.config import settings
+from app.models.system_user import SystemUser
+from app.utils import metrics
+
+user_cache_requests_total = metrics.registry.counter(
+    "auth_user_cache_requests_total",
+    "Resoluciones de usuario autenticado, según si salieron de la caché",
+    ("result",),
+)
+
+_COLUMNAS = [c.key for c in SystemUser.__table__.columns]
+
+
+class UserCache:
+    def __init__(self, ttl: float, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}   # username -> (vence, {columna: valor})
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, db: Session, username: str) -> Optional[SystemUser]:
+        """SystemUser asociado a db, o None si no está en caché (o venció)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entrada = self._entries.get(username)
+            if entrada is None or entrada[0] < time.monotonic():
+                self.misses += 1
+                user_cache_requests_total.inc(result="miss")
+                return None
+            self.hits += 1
+            valores = entrada[1]
+        user_cache_requests_total.inc(result="hit")
+
+        user = SystemUser(**valores)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    def put(self, user: SystemUser):
+        if not self.enabled:
+            return
+        valores = {columna: getattr(user, columna) for columna in _COLUMNAS}
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                ahora = time.monotonic()
+                self._entries = {k: v for k, v in self._entries.items() if v[0] >= ahora}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[user.username] = (time.monotonic() + self.ttl, valores)
+
+    def invalidate(self, username: str):
+        with self._lock:
+            if self._entries.pop(username, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "ttl_seconds": self.ttl,
+            }
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_TTL_SECONDS)
@@ -1,10 +1,7 @@
-from sqlalchemy.orm import Session
-from app.models.access_log import AccessLog
-import uuid
+from app.services.access_log_writer import access_log_writer
 
 
 def registrar_acceso(
-    db: Session,
     usuario: str,
     accion: str,
     entidad: str,
@@ -13,6 +10,8 @@ def registrar_acceso(
 ):
     """
     Registra un acceso a datos personales en el log.
+    No usa la sesión de la petición: la entrada se encola y se escribe en
+    lote (ver app/services/access_log_writer.py).
 
     Acciones posibles:
     - ver: consulta de datos
@@ -22,15 +21,6 @@ def registrar_acceso(
     - registro_publico: cliente se registró via link público
     """
     try:
-        log = AccessLog(
-            id=str(uuid.uuid4()),
-            usuario=usuario,
-            accion=accion,
-            entidad=entidad,
-            entidad_id=entidad_id,
-            ip_address=ip_address,
-        )
-        db.add(log)
-        db.flush()  # flush sin commit — el commit lo hace el endpoint
+        access_log_writer.registrar(usuario, accion, entidad, entidad_id, ip_address)
     except Exception:
         pass  # El log nunca debe romper la operación principal
\ No newline at end of file
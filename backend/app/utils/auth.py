@@ -1,14 +1,20 @@
+import logging
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 # Contexto mejorado para bcrypt
+# Los hashes con menos rondas que PASSWORD_HASH_ROUNDS quedan marcados para
+# rehash (verify_and_update_password devuelve el hash nuevo)
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
-    bcrypt__rounds=12
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS
 )
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -16,15 +22,26 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     try:
         return pwd_context.verify(plain_password, hashed_password)
     except Exception as e:
-        print(f"Error verificando password: {e}")
+        logger.error("Error verificando password: %s", e)
         return False
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica el password y, si el hash es de una configuración más débil,
+    devuelve también el hash nuevo para guardarlo: (valido, hash_nuevo o None)
+    """
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except Exception as e:
+        logger.error("Error verificando password: %s", e)
+        return False, None
+
 def get_password_hash(password: str) -> str:
     """Hashea un password"""
     try:
         return pwd_context.hash(password)
     except Exception as e:
-        print(f"Error hasheando password: {e}")
+        logger.error("Error hasheando password: %s", e)
         raise
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -0,0 +1,39 @@
+"""
+Respuesta de descarga de documentos generados (documents, minutes, jobs).
+
+El ETag es el SHA-256 del archivo guardado en el registro (file_hash); los
+registros anteriores a esa columna usan la clave, que también es única e
+inmutable (un archivo nunca se reescribe con otra clave). Con If-None-Match
+se responde 304 sin tocar el storage.
+
+Si el proxy entrega el archivo (DOWNLOAD_MODE x-accel / x-sendfile) tampoco
+se comprueba que exista: si falta, el 404 lo da el proxy.
+"""
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response, status
+
+from app.services.storage import document_storage
+from app.utils.etag import CACHE_CONTROL, calcular_etag, coincide, no_modificado
+
+
+def descarga(request: Request, key: Optional[str], filename: str, file_hash: Optional[str]) -> Response:
+    """Descarga del archivo key; 404 si el registro no tiene archivo o ya no existe"""
+    if not key:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archivo no encontrado"
+        )
+
+    etag = calcular_etag("archivo", file_hash or key)
+    if coincide(request, etag):
+        return no_modificado(etag)
+
+    if not document_storage.delega(key) and not document_storage.exists(key):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archivo no encontrado"
+        )
+
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    return document_storage.response(key, filename, headers, request)
@@ -0,0 +1,48 @@
+"""
+ETags y GET condicional (If-None-Match → 304).
+
+Los formularios vuelven a pedir el mismo compareciente, empresa o plantilla
+cada vez que se enfoca un campo. Con el ETag el navegador revalida y, si no
+cambió, recibe un 304 sin cuerpo: la ruta decide con una consulta liviana
+(la versión de la fila o el hash del contenido) antes de armar la respuesta.
+
+El ETag es fuerte: cambia con cada modificación de los datos (el número de
+versión de la fila o el hash del contenido, nunca updated_at, que en MySQL
+tiene resolución de segundos). FORMATO entra en el hash para que un cambio
+en la forma de la respuesta invalide lo que los navegadores tengan guardado.
+"""
+import hashlib
+
+from fastapi import Request, Response, status
+
+FORMATO = "1"
+
+# Datos personales: el navegador puede guardarlos, pero revalida siempre
+CACHE_CONTROL = "private, no-cache"
+
+
+def calcular_etag(*partes) -> str:
+    """ETag fuerte a partir de lo que identifica la versión de la respuesta"""
+    clave = "\x1f".join(str(p) for p in (FORMATO, *partes))
+    return '"' + hashlib.sha256(clave.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def coincide(request: Request, etag: str) -> bool:
+    """If-None-Match contiene etag (comparación débil, como pide RFC 9110 para este encabezado)"""
+    valor = request.headers.get("If-None-Match")
+    if not valor:
+        return False
+    if valor.strip() == "*":
+        return True
+    candidatos = (c.strip() for c in valor.split(","))
+    return etag in (c[2:] if c.startswith("W/") else c for c in candidatos)
+
+
+def no_modificado(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def agregar_etag(response: Response, etag: str):
+    """Encabezados de la respuesta 200 (response es el parámetro Response de la ruta)"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
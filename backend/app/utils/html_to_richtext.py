@@ -1,75 +1,222 @@
+"""
+Conversión del HTML del editor (minuta del abogado, secciones manuales) a
+RichText de docxtpl y a texto plano.
+
+Un solo recorrido por eventos de html.parser produce las dos formas a la
+vez, sin armar un árbol. El resultado queda en una caché LRU por hash del
+contenido: la misma minuta se reutiliza entre documentos y reintentos.
+
+El resultado es el mismo que daba BeautifulSoup(html, 'html.parser'):
+- RichText: b/strong, i/em y u dan formato; br y el cierre de p, div y li
+  agregan salto de línea; cada li empieza con '• '.
+- Texto plano (limpiar_html): br y el cierre de p son saltos de línea; se
+  omiten comentarios y el contenido de script/style; las líneas en blanco
+  repetidas se reducen a una.
+"""
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict, namedtuple
+from html.parser import HTMLParser
+
 from docxtpl import RichText
-from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+CACHE_SIZE = 256
+
+HtmlConvertido = namedtuple("HtmlConvertido", ["xml", "texto"])
+
+# Etiquetas sin contenido (se cierran al abrirse)
+_VACIAS = frozenset({
+    "area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr",
+    "image", "img", "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid",
+    "param", "source", "spacer", "track", "wbr",
+})
+# Texto que no cuenta para el texto plano
+_CONTENEDORES = frozenset({"rt", "rp", "style", "script", "template"})
+_PRESERVAR_ESPACIOS = frozenset({"pre", "textarea"})
+_ESPACIOS = " \n\t\x0c\r"
+
+_FORMATO = {"b": 0, "strong": 0, "i": 1, "em": 1, "u": 2}
+
+_LINEAS_EN_BLANCO = re.compile(r'\n\s*\n')
+
+
+class _Conversor(HTMLParser):
+    """Arma los runs de RichText y el texto plano a medida que llegan los eventos"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.runs = []               # xml de cada run (RichText.xml crece con +=, cuadrático)
+        self.plano = []
+        self._abiertas = []          # pila de etiquetas abiertas
+        self._formato = [0, 0, 0]    # bold, italic, underline abiertos
+        self._contenedores = []
+        self._preservar = 0
+        self._ya_cerradas = []       # vacías cuyo </tag> explícito se ignora
+        self._datos = []
+
+    # --- texto ---
+
+    def _vaciar(self, tipo="texto"):
+        if not self._datos:
+            return
+        texto = "".join(self._datos)
+        self._datos = []
+        if not self._preservar and not texto.strip(_ESPACIOS):
+            texto = "\n" if "\n" in texto else " "
+
+        if texto.strip():
+            self._run(texto)
+        if tipo == "cdata" or (tipo == "texto" and not self._contenedores):
+            self.plano.append(texto)
+
+    def _nodo(self, texto, tipo):
+        self._vaciar()
+        self._datos.append(texto)
+        self._vaciar(tipo)
+
+    def handle_data(self, data):
+        self._datos.append(data)
+
+    def handle_comment(self, data):
+        self._nodo(data, "comentario")
+
+    def handle_decl(self, decl):
+        self._nodo(decl[len("DOCTYPE "):], "doctype")
+
+    def unknown_decl(self, data):
+        if data.upper().startswith("CDATA["):
+            self._nodo(data[len("CDATA["):], "cdata")
+        else:
+            self._nodo(data, "declaracion")
+
+    def handle_pi(self, data):
+        self._nodo(data, "pi")
+
+    def _run(self, texto, formato=True):
+        bold, italic, underline = self._formato if formato else (0, 0, 0)
+        self.runs.append(RichText(texto, bold=bold > 0, italic=italic > 0, underline=underline > 0).xml)
+
+    # --- etiquetas ---
+
+    def _abrir(self, tag):
+        self._abiertas.append(tag)
+        if tag in _FORMATO:
+            self._formato[_FORMATO[tag]] += 1
+        if tag in _CONTENEDORES:
+            self._contenedores.append(len(self._abiertas))
+        if tag in _PRESERVAR_ESPACIOS:
+            self._preservar += 1
+
+        if tag == "li":
+            self._run('• ')
+
+    def _cerrar_ultima(self):
+        tag = self._abiertas.pop()
+        if tag in _FORMATO:
+            self._formato[_FORMATO[tag]] -= 1
+        if self._contenedores and self._contenedores[-1] > len(self._abiertas):
+            self._contenedores.pop()
+        if tag in _PRESERVAR_ESPACIOS:
+            self._preservar -= 1
+
+        if tag in ("p", "div", "li"):
+            self._run('\n', formato=False)
+        if tag == "p":
+            self.plano.append("\n")
+
+    def _cerrar_hasta(self, tag):
+        """Cierra tag y todo lo que quedó abierto dentro; un cierre sin apertura se ignora"""
+        if tag not in self._abiertas:
+            return
+        while self._abiertas[-1] != tag:
+            self._cerrar_ultima()
+        self._cerrar_ultima()
+
+    def _br(self):
+        self._run('\n', formato=False)
+        self.plano.append("\n")
+
+    def handle_starttag(self, tag, attrs):
+        self._vaciar()
+        if tag in _VACIAS:
+            if tag == "br":
+                self._br()
+            self._ya_cerradas.append(tag)
+        else:
+            self._abrir(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._vaciar()
+        if tag == "br":
+            self._br()
+        elif tag not in _VACIAS:
+            self._abrir(tag)
+            self._cerrar_hasta(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self._ya_cerradas:
+            self._ya_cerradas.remove(tag)
+            return
+        self._vaciar()
+        self._cerrar_hasta(tag)
+
+    def close(self):
+        super().close()
+        self._vaciar()
+        while self._abiertas:
+            self._cerrar_ultima()
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def convertir_html(html_content: str) -> HtmlConvertido:
+    """(xml del RichText, texto plano limpio) del HTML, con caché por contenido"""
+    clave = hashlib.blake2b(html_content.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    with _cache_lock:
+        resultado = _cache.get(clave)
+        if resultado is not None:
+            _cache.move_to_end(clave)
+            return resultado
+
+    conversor = _Conversor()
+    conversor.feed(html_content)
+    conversor.close()
+    texto = _LINEAS_EN_BLANCO.sub('\n\n', "".join(conversor.plano)).strip()
+    resultado = HtmlConvertido("".join(conversor.runs), texto)
+
+    with _cache_lock:
+        _cache[clave] = resultado
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return resultado
+
 
 def html_to_richtext(html_content):
     """
     Convierte HTML a RichText de docxtpl preservando formato
     """
-    print("=" * 50)
-    print("DEBUG html_to_richtext - Contenido recibido:")
-    print(html_content[:500] if html_content else "VACIO")
-    print("=" * 50)
-    
     if not html_content or html_content.strip() == '':
-        print("DEBUG: Contenido vacío, retornando RichText vacío")
         return RichText()
-    
+
+    rt = RichText()
     try:
-        # Limpiar HTML
-        soup = BeautifulSoup(html_content, 'html.parser')
-        rt = RichText()
-        
-        print("DEBUG: BeautifulSoup parseó el HTML correctamente")
-        print("DEBUG: Texto extraído:", soup.get_text()[:200])
-        
-        # Procesar el contenido del HTML
-        process_element(soup, rt)
-        
-        print("DEBUG: RichText procesado exitosamente")
-        return rt
-    except Exception as e:
-        print(f"ERROR en html_to_richtext: {e}")
-        import traceback
-        traceback.print_exc()
-        # Fallback: retornar texto plano
-        soup = BeautifulSoup(html_content, 'html.parser')
-        rt = RichText()
-        rt.add(soup.get_text())
-        return rt
-
-def process_element(element, rt, bold=False, italic=False, underline=False):
-    """
-    Procesa recursivamente elementos HTML y los agrega a RichText
-    """
-    for child in element.children:
-        if isinstance(child, str):
-            # Es texto directo
-            text = child
-            if text.strip():
-                print(f"DEBUG: Agregando texto: '{text[:50]}...' (bold={bold}, italic={italic})")
-                rt.add(text, bold=bold, italic=italic, underline=underline)
-        else:
-            # Es un tag HTML
-            tag_name = child.name.lower() if child.name else ''
-            
-            # Determinar formato según el tag
-            is_bold = bold or tag_name in ['b', 'strong']
-            is_italic = italic or tag_name in ['i', 'em']
-            is_underline = underline or tag_name in ['u']
-            
-            if tag_name == 'br':
-                rt.add('\n')
-            elif tag_name in ['p', 'div']:
-                # Procesar contenido del párrafo
-                process_element(child, rt, is_bold, is_italic, is_underline)
-                rt.add('\n')
-            elif tag_name in ['ul', 'ol']:
-                # Listas
-                process_element(child, rt, is_bold, is_italic, is_underline)
-            elif tag_name == 'li':
-                rt.add('• ', bold=is_bold, italic=is_italic, underline=is_underline)
-                process_element(child, rt, is_bold, is_italic, is_underline)
-                rt.add('\n')
-            else:
-                # Procesar cualquier otro elemento recursivamente
-                process_element(child, rt, is_bold, is_italic, is_underline)
\ No newline at end of file
+        rt.xml = convertir_html(html_content).xml
+        logger.debug("html_to_richtext: %d caracteres de HTML procesados", len(html_content))
+    except Exception:
+        logger.exception("Error en html_to_richtext, se usa texto plano")
+        # Fallback: retornar texto sin etiquetas
+        rt.add(re.sub(r'<[^>]*>', '', html_content))
+    return rt
+
+
+def html_to_text(html_content):
+    """Convierte HTML a texto plano manteniendo saltos de línea"""
+    if not html_content:
+        return ""
+    return convertir_html(html_content).texto
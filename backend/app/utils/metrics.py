@@ -0,0 +1,185 @@
+"""
+Métricas en formato de texto de Prometheus, sin dependencias externas.
+
+Cada proceso de la API lleva sus propios contadores (con varios workers de
+uvicorn, Prometheus suma los procesos al consultar cada uno). Las etapas que
+corren en el render_pool se miden dentro del proceso hijo y se registran
+aquí al volver el resultado.
+
+    with metrics.stage_timer("minuta", "db_commit"):
+        db.commit()
+"""
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _num(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {} if labelnames else {(): 0}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values = {}   # labels -> [conteos por bucket, suma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, limite in enumerate(self.buckets):
+                if value <= limite:
+                    data[0][i] += 1
+                    break
+            data[1] += value
+            data[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - inicio, **labels)
+
+    def samples(self):
+        resultado = []
+        with self._lock:
+            for key, (conteos, suma, total) in sorted(self._values.items()):
+                acumulado = 0
+                for limite, n in zip(self.buckets, conteos):
+                    acumulado += n
+                    resultado.append((f"{self.name}_bucket", key + (_num(limite),), acumulado, "le"))
+                resultado.append((f"{self.name}_sum", key, suma))
+                resultado.append((f"{self.name}_count", key, total))
+        return resultado
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, fn):
+        """fn() se llama en cada consulta de /metrics (p. ej. para copiar estadísticas a gauges)"""
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        for fn in self._collectors:
+            try:
+                fn()
+            except Exception:
+                logger.exception("Error en colector de métricas")
+
+        lineas = []
+        for metric in self._metrics:
+            lineas.append(f"# HELP {metric.name} {metric.documentation}")
+            lineas.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample in metric.samples():
+                nombre, valores, valor = sample[:3]
+                names = metric.labelnames + ((sample[3],) if len(sample) > 3 else ())
+                lineas.append(f"{nombre}{_labels(names, valores)} {_num(valor)}")
+        return "\n".join(lineas) + "\n"
+
+
+registry = MetricsRegistry()
+
+# ============================================
+# GENERACIÓN DE DOCUMENTOS
+# ============================================
+
+document_stage_seconds = registry.histogram(
+    "document_stage_seconds",
+    "Duración de cada etapa de generación (context, render, save, storage, db_commit)",
+    ("document_type", "stage"),
+)
+
+document_request_seconds = registry.histogram(
+    "document_request_seconds",
+    "Duración total de la petición de generación",
+    ("document_type",),
+)
+
+documents_generated_total = registry.counter(
+    "documents_generated_total",
+    "Documentos entregados, según si se renderizaron o salieron del caché",
+    ("document_type", "source"),
+)
+
+
+def stage_timer(document_type: str, stage: str):
+    return document_stage_seconds.time(document_type=document_type, stage=stage)
+
+
+def observe_stages(document_type: str, tiempos: dict):
+    """Registra los tiempos medidos en el proceso de renderizado"""
+    for stage, segundos in tiempos.items():
+        document_stage_seconds.observe(segundos, document_type=document_type, stage=stage)
@@ -1,3 +1,113 @@
+"""
+Conversión de números, ordinales y fechas a texto notarial.
+
+Las palabras de 0 a 999 se calculan una sola vez al importar el módulo; los
+números mayores se arman por grupos (mil, millón, billón...). La parte
+decimal se toma exacta con Decimal (hasta 10 decimales, sin errores de
+punto flotante). Los resultados se memorizan en cachés LRU acotadas, porque
+un mismo documento repite muchas veces los mismos montos y fechas.
+
+    numero_a_letras(1250.5)            -> 'mil doscientos cincuenta coma cinco'
+    numeros_a_letras([1, 21000, 0.05]) -> ['uno', 'veintiún mil', 'cero coma cero cinco']
+"""
+import logging
+import re
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_SIZE = 4096
+MAX_DECIMALES = 10
+
+_UNIDADES = (
+    "cero", "uno", "dos", "tres", "cuatro", "cinco",
+    "seis", "siete", "ocho", "nueve"
+)
+
+_MENORES_TREINTA = _UNIDADES + (
+    "diez", "once", "doce", "trece", "catorce", "quince",
+    "dieciséis", "diecisiete", "dieciocho", "diecinueve",
+    "veinte", "veintiuno", "veintidós", "veintitrés", "veinticuatro",
+    "veinticinco", "veintiséis", "veintisiete", "veintiocho", "veintinueve"
+)
+
+_DECENAS = {
+    30: "treinta", 40: "cuarenta", 50: "cincuenta",
+    60: "sesenta", 70: "setenta", 80: "ochenta", 90: "noventa"
+}
+
+_CENTENAS = {
+    100: "ciento", 200: "doscientos", 300: "trescientos", 400: "cuatrocientos",
+    500: "quinientos", 600: "seiscientos", 700: "setecientos",
+    800: "ochocientos", 900: "novecientos"
+}
+
+# (singular, plural) de cada grupo de seis cifras
+_ESCALAS = (("millón", "millones"), ("billón", "billones"), ("trillón", "trillones"))
+
+_DIAS_SEMANA = (
+    "lunes", "martes", "miércoles", "jueves",
+    "viernes", "sábado", "domingo"
+)
+
+_MESES = (
+    "enero", "febrero", "marzo", "abril", "mayo", "junio",
+    "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"
+)
+
+_ORDINALES_ESPECIALES = {
+    1: "Primera", 2: "Segunda", 3: "Tercera", 4: "Cuarta", 5: "Quinta",
+    6: "Sexta", 7: "Séptima", 8: "Octava", 9: "Novena", 10: "Décima",
+    11: "Undécima", 12: "Duodécima", 13: "Décimo Tercera", 14: "Décimo Cuarta",
+    15: "Décimo Quinta", 16: "Décimo Sexta", 17: "Décimo Séptima",
+    18: "Décimo Octava", 19: "Décimo Novena"
+}
+
+_ORDINALES_DECENAS = {
+    20: "Vigésima", 30: "Trigésima", 40: "Cuadragésima", 50: "Quincuagésima",
+    60: "Sexagésima", 70: "Septuagésima", 80: "Octogésima", 90: "Nonagésima"
+}
+
+_PRIMER_NUMERO = re.compile(r'\d+')
+
+
+def _construir_menores_mil():
+    """Palabras de 0 a 999 (uno) y su forma apocopada delante de mil/millones (un)"""
+    tabla = list(_MENORES_TREINTA)
+    for n in range(30, 100):
+        decena, unidad = divmod(n, 10)
+        tabla.append(_DECENAS[decena * 10] + (f" y {_UNIDADES[unidad]}" if unidad else ""))
+    for n in range(100, 1000):
+        centena, resto = divmod(n, 100)
+        if n == 100:
+            tabla.append("cien")
+        elif resto == 0:
+            tabla.append(_CENTENAS[centena * 100])
+        else:
+            tabla.append(f"{_CENTENAS[centena * 100]} {tabla[resto]}")
+
+    apocopadas = [
+        texto[:-3] + "ún" if n % 100 == 21
+        else texto[:-1] if texto.endswith("uno")
+        else texto
+        for n, texto in enumerate(tabla)
+    ]
+    return tuple(tabla), tuple(apocopadas)
+
+
+_MENORES_MIL, _MENORES_MIL_APOCOPE = _construir_menores_mil()
+
+# Días del mes (0-31)
+_DIAS_MES = _MENORES_MIL[:32]
+
+_ORDINALES = {**_ORDINALES_ESPECIALES, **_ORDINALES_DECENAS}
+for _n in range(21, 100):
+    if _n % 10:
+        _ORDINALES[_n] = f"{_ORDINALES_DECENAS[_n - _n % 10][:-1]}o {_ORDINALES_ESPECIALES[_n % 10]}"
+
+
 def numero_a_digitos(numero):
     """
     Convierte número a dígitos en letras: 123 -> 'uno dos tres'
@@ -5,23 +115,17 @@ def numero_a_digitos(numero):
     """
     if not numero:
         return ""
-    
-    # Convertir a string y limpiar
-    numero_str = str(numero).strip()
-    
-    unidades = [
-        "cero", "uno", "dos", "tres", "cuatro", "cinco",
-        "seis", "siete", "ocho", "nueve"
-    ]
-    
-    # Convertir cada dígito
+    return _digitos_a_letras(str(numero).strip())
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _digitos_a_letras(numero_str):
     digitos_letras = []
     for char in numero_str:
         if char.isdigit():
-            digitos_letras.append(unidades[int(char)])
+            digitos_letras.append(_UNIDADES[int(char)])
         elif char == '-':
             digitos_letras.append("guión")
-    
     return " ".join(digitos_letras)
 
 
@@ -31,190 +135,137 @@ def numero_casa_a_letras(numero_str):
     """
     if not numero_str:
         return ""
-    
-    numero_str = str(numero_str).strip()
-    
-    unidades = [
-        "cero", "uno", "dos", "tres", "cuatro", "cinco",
-        "seis", "siete", "ocho", "nueve"
-    ]
-    
+    return _casa_a_letras(str(numero_str).strip())
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _casa_a_letras(numero_str):
     resultado = []
     for char in numero_str:
         if char.isdigit():
-            resultado.append(unidades[int(char)])
+            resultado.append(_UNIDADES[int(char)])
         elif char == '-':
             resultado.append("guión")
         elif char.isalpha():
             resultado.append(char.upper())
-    
     return " ".join(resultado)
 
 
 def dia_mes_letras(n):
     """Convierte día/mes a letras (1-31)"""
-    # Casos especiales para 20-29
-    especiales_veinte = {
-        20: "veinte",
-        21: "veintiuno",
-        22: "veintidós",
-        23: "veintitrés",
-        24: "veinticuatro",
-        25: "veinticinco",
-        26: "veintiséis",
-        27: "veintisiete",
-        28: "veintiocho",
-        29: "veintinueve"
-    }
-    
-    if n in especiales_veinte:
-        return especiales_veinte[n]
-    
-    menores_veinte = [
-        "cero", "uno", "dos", "tres", "cuatro", "cinco", "seis",
-        "siete", "ocho", "nueve", "diez", "once", "doce", "trece",
-        "catorce", "quince", "dieciséis", "diecisiete", "dieciocho", "diecinueve"
-    ]
-    
-    if n < 20:
-        return menores_veinte[n]
-    if n == 30:
-        return "treinta"
-    if n == 31:
-        return "treinta y uno"
+    if 0 <= n < len(_DIAS_MES):
+        return _DIAS_MES[n]
     return ""
 
 
+def _miles_a_letras(n, apocope):
+    """0 < n < 1.000.000; apocope: 'un' en vez de 'uno' al final (delante de millón/es)"""
+    miles, resto = divmod(n, 1000)
+    menores = _MENORES_MIL_APOCOPE if apocope else _MENORES_MIL
+    if miles == 0:
+        return menores[resto]
+    texto = "mil" if miles == 1 else f"{_MENORES_MIL_APOCOPE[miles]} mil"
+    return f"{texto} {menores[resto]}" if resto else texto
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _entero_a_letras(n):
+    """Entero no negativo a letras"""
+    if n < 1000:
+        return _MENORES_MIL[n]
+
+    # Más allá de los trillones se antepone la cantidad de trillones completa
+    tope = 1000000 ** len(_ESCALAS)
+    if n >= tope * 1000000:
+        superior, resto = divmod(n, tope)
+        texto = f"{_entero_a_letras(superior)} {_ESCALAS[-1][1]}"
+        return f"{texto} {_entero_a_letras(resto)}" if resto else texto
+
+    partes = []
+    grupos = []
+    while n:
+        n, grupo = divmod(n, 1000000)
+        grupos.append(grupo)
+
+    for nivel in range(len(grupos) - 1, 0, -1):
+        grupo = grupos[nivel]
+        if grupo:
+            singular, plural = _ESCALAS[nivel - 1]
+            partes.append(f"un {singular}" if grupo == 1 else f"{_miles_a_letras(grupo, apocope=True)} {plural}")
+    if grupos[0]:
+        partes.append(_miles_a_letras(grupos[0], apocope=False))
+    return " ".join(partes)
+
+
+def _separar_decimal(valor):
+    """
+    (negativo, parte entera, dígitos decimales sin ceros finales) de un Decimal,
+    redondeado a MAX_DECIMALES con redondeo bancario (como round())
+    """
+    if not valor.is_finite():
+        raise ValueError(f"No se puede convertir {valor} a letras")
+    numerador, denominador = valor.as_integer_ratio()
+    negativo = numerador < 0
+    escala = 10 ** MAX_DECIMALES
+    cociente, resto = divmod(abs(numerador) * escala, denominador)
+    if resto * 2 > denominador or (resto * 2 == denominador and cociente % 2):
+        cociente += 1
+    entero, fraccion = divmod(cociente, escala)
+    decimales = f"{fraccion:0{MAX_DECIMALES}d}".rstrip('0') if fraccion else ""
+    return negativo, entero, decimales
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _numero_a_letras(n):
+    if isinstance(n, int):
+        negativo, entero, decimales = n < 0, abs(n), ""
+    else:
+        # Los float pasan por repr: 1.05 es '1.05', no 1.0500000000000000444
+        valor = Decimal(repr(n)) if isinstance(n, float) else Decimal(n)
+        negativo, entero, decimales = _separar_decimal(valor)
+
+    texto = _entero_a_letras(entero)
+    if decimales:
+        texto = f"{texto} coma {_digitos_a_letras(decimales)}"
+    if negativo and (entero or decimales):
+        texto = f"menos {texto}"
+    return texto
+
+
 def numero_a_letras(n):
     """
     Convierte número a letras completo
-    Maneja: int, float, str (con conversión automática)
+    Maneja: int, float, Decimal, str (con conversión automática)
     """
-    # Manejar None, vacío o 0
+    # Manejar None o vacío
     if n is None or n == "":
         return "cero"
-    
-    # Si es string, convertir a número
+
+    # Si es string, convertir a número (con coma o punto decimal)
     if isinstance(n, str):
         try:
             n = n.strip().replace(',', '.')
-            # Si tiene punto decimal, convertir a float
-            if '.' in n:
-                n = float(n)
-            else:
-                n = int(n)
-        except (ValueError, AttributeError):
-            print(f"⚠️ No se pudo convertir '{n}' a número, devolviendo como está")
+            n = Decimal(n) if '.' in n else int(n)
+        except (ArithmeticError, ValueError):
+            logger.warning("No se pudo convertir %r a número, se devuelve como está", n)
             return str(n)
-    
-    # Manejar cero explícitamente
-    if n == 0:
-        return "cero"
-    
-    # Si es float, manejar parte decimal
-    if isinstance(n, float):
-        parte_entera = int(n)
-        # Manejar hasta 10 decimales
-        parte_decimal = round((n - parte_entera) * 10000000000)
-        
-        if parte_decimal == 0:
-            return numero_a_letras(parte_entera)
-        
-        # Convertir parte decimal a dígitos
-        parte_decimal_str = str(parte_decimal).rstrip('0')
-        digitos_decimales = numero_a_digitos(parte_decimal_str)
-        
-        return f"{numero_a_letras(parte_entera)} coma {digitos_decimales}"
-    
-    # Convertir a int para evitar problemas con comparaciones
-    n = int(n)
-    
-    if n == 0:
-        return "cero"
-    
-    # Casos especiales para 20-29
-    especiales_veinte = {
-        20: "veinte",
-        21: "veintiuno",
-        22: "veintidós",
-        23: "veintitrés",
-        24: "veinticuatro",
-        25: "veinticinco",
-        26: "veintidós",
-        27: "veintisiete",
-        28: "veintiocho",
-        29: "veintinueve"
-    }
-    
-    if n in especiales_veinte:
-        return especiales_veinte[n]
-    
-    especiales = {
-        30: "treinta", 40: "cuarenta", 50: "cincuenta",
-        60: "sesenta", 70: "setenta", 80: "ochenta", 90: "noventa",
-        100: "cien"
-    }
-    
-    menores_veinte = [
-        "cero", "uno", "dos", "tres", "cuatro", "cinco", "seis",
-        "siete", "ocho", "nueve", "diez", "once", "doce", "trece",
-        "catorce", "quince", "dieciséis", "diecisiete", "dieciocho", "diecinueve"
-    ]
-    
-    if n < 20:
-        return menores_veinte[n]
-    
-    if n in especiales:
-        return especiales[n]
-    
-    if n < 100:
-        decena = (n // 10) * 10
-        unidad = n % 10
-        return f"{especiales[decena]} y {numero_a_letras(unidad)}"
-    
-    if n < 200:
-        resto = n - 100
-        if resto == 0:
-            return "cien"
-        return f"ciento {numero_a_letras(resto)}"
-    
-    centenas = {
-        200: "doscientos", 300: "trescientos", 400: "cuatrocientos",
-        500: "quinientos", 600: "seiscientos", 700: "setecientos",
-        800: "ochocientos", 900: "novecientos"
-    }
-    
-    if n < 1000:
-        centena = (n // 100) * 100
-        resto = n % 100
-        if resto == 0:
-            return centenas[centena]
-        return f"{centenas[centena]} {numero_a_letras(resto)}"
-    
-    if n < 2000:
-        resto = n - 1000
-        if resto == 0:
-            return "mil"
-        return f"mil {numero_a_letras(resto)}"
-    
-    if n < 1000000:
-        miles = n // 1000
-        resto = n % 1000
-        if resto == 0:
-            return f"{numero_a_letras(miles)} mil"
-        return f"{numero_a_letras(miles)} mil {numero_a_letras(resto)}"
-    
-    if n < 2000000:
-        resto = n - 1000000
-        if resto == 0:
-            return "un millón"
-        return f"un millón {numero_a_letras(resto)}"
-    
-    millones = n // 1000000
-    resto = n % 1000000
-    if resto == 0:
-        return f"{numero_a_letras(millones)} millones"
-    return f"{numero_a_letras(millones)} millones {numero_a_letras(resto)}"
+
+    return _numero_a_letras(n)
+
+
+def numeros_a_letras(valores):
+    """
+    Convierte una lista de montos en una sola llamada (mismo resultado que
+    numero_a_letras para cada uno; los repetidos se convierten una vez)
+    """
+    convertidos = {}
+    resultado = []
+    for valor in valores:
+        clave = (type(valor), valor)
+        if clave not in convertidos:
+            convertidos[clave] = numero_a_letras(valor)
+        resultado.append(convertidos[clave])
+    return resultado
 
 
 def numero_a_ordinal_notaria(numero):
@@ -224,92 +275,55 @@ def numero_a_ordinal_notaria(numero):
     """
     if isinstance(numero, str):
         # Si viene como texto, intentar extraer el número
-        import re
-        match = re.search(r'\d+', numero)
+        match = _PRIMER_NUMERO.search(numero)
         if match:
             numero = int(match.group())
         else:
             return numero  # Devolver como está si no tiene número
-    
+
     numero = int(numero)
-    
-    # Ordinales especiales (1-19)
-    ordinales_especiales = {
-        1: "Primera", 2: "Segunda", 3: "Tercera", 4: "Cuarta", 5: "Quinta",
-        6: "Sexta", 7: "Séptima", 8: "Octava", 9: "Novena", 10: "Décima",
-        11: "Undécima", 12: "Duodécima", 13: "Décimo Tercera", 14: "Décimo Cuarta",
-        15: "Décimo Quinta", 16: "Décimo Sexta", 17: "Décimo Séptima",
-        18: "Décimo Octava", 19: "Décimo Novena"
-    }
-    
-    if numero in ordinales_especiales:
-        return ordinales_especiales[numero]
-    
-    # Para 20-99
-    decenas = {
-        20: "Vigésima", 30: "Trigésima", 40: "Cuadragésima", 50: "Quincuagésima",
-        60: "Sexagésima", 70: "Septuagésima", 80: "Octogésima", 90: "Nonagésima"
-    }
-    
-    unidades_ordinal = {
-        1: "Primera", 2: "Segunda", 3: "Tercera", 4: "Cuarta", 5: "Quinta",
-        6: "Sexta", 7: "Séptima", 8: "Octava", 9: "Novena"
-    }
-    
-    if 20 <= numero < 100:
-        decena = (numero // 10) * 10
-        unidad = numero % 10
-        
-        if unidad == 0:
-            return decenas[decena]
-        else:
-            return f"{decenas[decena].replace('a', 'o')} {unidades_ordinal[unidad]}"
-    
+
+    if numero in _ORDINALES:
+        return _ORDINALES[numero]
+
     # Para números mayores a 99, usar formato "Notaría No. X"
     return f"Notaría No. {numero}"
 
 
+@lru_cache(maxsize=CACHE_SIZE)
 def formatear_fecha_notarial(fecha_str):
     """
     Convierte fecha ISO (YYYY-MM-DD) a formato notarial
-    Ejemplo: 2026-01-28 -> 'martes veinte y ocho de enero del año dos mil veinte y seis'
+    Ejemplo: 2026-01-28 -> 'miércoles veintiocho de enero del año dos mil veintiséis'
     """
-    from datetime import datetime
-    
-    dias = [
-        "lunes", "martes", "miércoles", "jueves",
-        "viernes", "sábado", "domingo"
-    ]
-    
-    meses = [
-        "enero", "febrero", "marzo", "abril", "mayo", "junio",
-        "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"
-    ]
-    
     fecha = datetime.strptime(fecha_str, "%Y-%m-%d")
-    
-    dia_semana = dias[fecha.weekday()]
+
+    dia_semana = _DIAS_SEMANA[fecha.weekday()]
     dia = dia_mes_letras(fecha.day)
-    mes = meses[fecha.month - 1]
+    mes = _MESES[fecha.month - 1]
     anio = numero_a_letras(fecha.year)
-    
+
     return f"{dia_semana} {dia} de {mes} del año {anio}"
 
 
+def fechas_notariales(fechas):
+    """Convierte una lista de fechas ISO en una sola llamada (vacías -> '')"""
+    return [formatear_fecha_notarial(fecha) if fecha else "" for fecha in fechas]
+
+
 def calcular_edad(fecha_nacimiento_str):
     """
     Calcula la edad a partir de fecha de nacimiento (formato YYYY-MM-DD)
-    
+
     Args:
         fecha_nacimiento_str: Fecha en formato ISO (YYYY-MM-DD)
-    
+
     Returns:
         int: Edad en años
     """
     if not fecha_nacimiento_str:
         return 0
-    
-    from datetime import datetime
+
     try:
         fecha_nacimiento = datetime.strptime(fecha_nacimiento_str, '%Y-%m-%d')
         hoy = datetime.now()
@@ -319,5 +333,5 @@ def calcular_edad(fecha_nacimiento_str):
             edad -= 1
         return edad
     except Exception as e:
-        print(f"⚠️ Error calculando edad de '{fecha_nacimiento_str}': {e}")
-        return 0
\ No newline at end of file
+        logger.warning("Error calculando edad de %r: %s", fecha_nacimiento_str, e)
+        return 0
@@ -0,0 +1,35 @@
+"""
+Cursores para paginar por keyset (WHERE (a, b) < (:a, :b) ORDER BY a, b)
+en vez de OFFSET, que recorre todas las filas saltadas.
+
+El cursor es la última fila de la página, en JSON y base64 url-safe; para
+el cliente es opaco.
+"""
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+
+def codificar_cursor(**valores) -> str:
+    datos = {
+        k: {"dt": v.isoformat()} if isinstance(v, datetime) else v
+        for k, v in valores.items()
+    }
+    return base64.urlsafe_b64encode(json.dumps(datos, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> dict:
+    """Valores del cursor; 400 si no es un cursor válido"""
+    try:
+        datos = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {
+            k: datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v
+            for k, v in datos.items()
+        }
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
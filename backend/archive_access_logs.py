@@ -0,0 +1,32 @@
+"""
+Archiva ahora los meses completos del log de accesos más viejos que N días
+(lo mismo que hace la tarea de fondo con ACCESS_LOG_ARCHIVE_AFTER_DAYS).
+
+    python archive_access_logs.py            # usa ACCESS_LOG_ARCHIVE_AFTER_DAYS
+    python archive_access_logs.py --dias 365
+"""
+import sys
+
+from app.config import settings
+from app.services.access_log_archive import access_log_archive
+
+
+def main(argv):
+    dias = settings.ACCESS_LOG_ARCHIVE_AFTER_DAYS
+    if "--dias" in argv:
+        dias = int(argv[argv.index("--dias") + 1])
+    if not dias:
+        print("⚠️  Indique --dias o configure ACCESS_LOG_ARCHIVE_AFTER_DAYS")
+        return
+
+    resultado = access_log_archive.archivar(after_days=dias)
+    if resultado.get("skipped"):
+        print("⚠️  Otro proceso está archivando en este momento")
+    elif resultado["rows"]:
+        print(f"✅ {resultado['rows']} filas archivadas ({', '.join(resultado['months'])}) en {access_log_archive.directorio}")
+    else:
+        print("✅ No hay meses para archivar")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,170 @@
+"""
+Benchmark de INSERT en access_logs según el esquema de id.
+
+Llena tablas de prueba con la misma forma que access_logs, en lotes de
+INSERT de varias filas (executemany, como access_log_writer), y mide filas
+por segundo a medida que la tabla crece:
+
+- uuid4:   VARCHAR(36) con uuid4 (esquema anterior, inserta al azar en el índice)
+- uuid7:   BINARY(16) con UUIDv7 (esquema actual, inserta al final)
+- autoinc: BIGINT AUTO_INCREMENT (referencia)
+
+Por defecto usa la BD de la app (MySQL/InnoDB, que es donde importa el
+orden del índice clustered) y 10 millones de filas por esquema. Las tablas
+bench_access_logs_* se borran al terminar salvo con --keep.
+
+    cd backend
+    python -m benchmarks.bench_access_log_ids --output ids.json
+    python -m benchmarks.bench_access_log_ids --rows 1000000 --only uuid4 --only uuid7
+    python -m benchmarks.bench_access_log_ids --url sqlite:////tmp/bench.db --rows 200000
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import (
+    BigInteger, Column, DateTime, Integer, MetaData, String, Table, create_engine, insert, text,
+)
+
+from app.models.access_log import UUIDBinario
+from app.utils.uuid7 import uuid7
+
+ESQUEMAS = {
+    "uuid4": (lambda: Column("id", String(36), primary_key=True), lambda: str(uuid.uuid4())),
+    "uuid7": (lambda: Column("id", UUIDBinario, primary_key=True), uuid7),
+    # En SQLite solo INTEGER PRIMARY KEY es autoincremental
+    "autoinc": (lambda: Column("id", BigInteger().with_variant(Integer(), "sqlite"), primary_key=True,
+                               autoincrement=True), None),
+}
+
+
+def tabla(nombre: str, columna_id) -> Table:
+    return Table(
+        f"bench_access_logs_{nombre}", MetaData(),
+        columna_id,
+        Column("usuario", String(100), nullable=False),
+        Column("accion", String(20), nullable=False),
+        Column("entidad", String(50), nullable=False),
+        Column("entidad_id", String(50), nullable=False),
+        Column("ip_address", String(45)),
+        Column("timestamp", DateTime(timezone=True)),
+    )
+
+
+def tamano_bytes(engine, nombre: str):
+    """Datos + índices en disco (solo MySQL)"""
+    if engine.dialect.name != "mysql":
+        return None
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT data_length + index_length FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = :t"
+        ), {"t": nombre}).scalar()
+
+
+def medir(engine, esquema: str, filas: int, lote: int, puntos: int, keep: bool) -> dict:
+    columna_id, generar_id = ESQUEMAS[esquema]
+    t = tabla(esquema, columna_id())
+    t.drop(engine, checkfirst=True)
+    t.create(engine)
+
+    base = datetime(2025, 1, 1)
+    tramo = max(lote, filas // puntos)
+    curva = []
+    insertadas = 0
+    inicio = inicio_tramo = time.perf_counter()
+    try:
+        while insertadas < filas:
+            n = min(lote, filas - insertadas)
+            valores = []
+            for i in range(insertadas, insertadas + n):
+                fila = {
+                    "usuario": "bench",
+                    "accion": "ver",
+                    "entidad": "parties",
+                    "entidad_id": f"17{i % 100000000:08d}",
+                    "ip_address": "10.0.0.1",
+                    "timestamp": base + timedelta(milliseconds=i),
+                }
+                if generar_id is not None:
+                    fila["id"] = generar_id()
+                valores.append(fila)
+            with engine.begin() as conn:
+                conn.execute(insert(t), valores)
+            insertadas += n
+
+            if insertadas % tramo == 0 or insertadas == filas:
+                ahora = time.perf_counter()
+                filas_tramo = insertadas - (curva[-1]["rows"] if curva else 0)
+                curva.append({
+                    "rows": insertadas,
+                    "rows_per_second": round(filas_tramo / (ahora - inicio_tramo)),
+                })
+                inicio_tramo = ahora
+                print(f"{esquema:8s} {insertadas:>11,d} filas  {curva[-1]['rows_per_second']:>9,d} filas/s",
+                      file=sys.stderr)
+
+        total = time.perf_counter() - inicio
+        return {
+            "scheme": esquema,
+            "rows": filas,
+            "seconds": round(total, 2),
+            "rows_per_second": round(filas / total),
+            # Al final de la curva se ve la degradación con la tabla grande
+            "last_segment_rows_per_second": curva[-1]["rows_per_second"],
+            "table_bytes": tamano_bytes(engine, t.name),
+            "curve": curva,
+        }
+    finally:
+        if not keep:
+            t.drop(engine, checkfirst=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de INSERT en access_logs según el esquema de id")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="filas por esquema")
+    parser.add_argument("--batch", type=int, default=1000, help="filas por INSERT")
+    parser.add_argument("--points", type=int, default=20, help="mediciones a lo largo del llenado")
+    parser.add_argument("--only", choices=sorted(ESQUEMAS), action="append", help="limitar a un esquema")
+    parser.add_argument("--url", help="URL de SQLAlchemy (por defecto la BD de la app)")
+    parser.add_argument("--keep", action="store_true", help="no borrar las tablas de prueba")
+    parser.add_argument("--output", help="archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        engine = create_engine(args.url)
+    else:
+        from app.database import engine
+
+    resultados = [
+        medir(engine, esquema, args.rows, args.batch, args.points, args.keep)
+        for esquema in ESQUEMAS
+        if not args.only or esquema in args.only
+    ]
+
+    reporte = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "dialect": engine.dialect.name,
+            "server_version": ".".join(map(str, engine.dialect.server_version_info or ())) or None,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "batch": args.batch,
+        },
+        "results": resultados,
+    }
+
+    salida = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(salida, encoding="utf-8")
+    else:
+        print(salida)
+
+
+if __name__ == "__main__":
+    main()
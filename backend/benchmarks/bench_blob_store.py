@@ -0,0 +1,171 @@
+"""
+Benchmark del blob store (app/services/blob_store.py) con minutas de proyectos.
+
+Arma las minutas de varios proyectos como las genera una inmobiliaria: dentro
+de un proyecto se repiten vendedores, historia de dominio, declaratoria y
+linderos generales; cambian compradores, predios, linderos específicos y
+precio. Compara lo que ocupa el contract_data de todas las unidades:
+
+- json:       el texto JSON por fila (esquema anterior)
+- json_zlib:  cada fila comprimida por separado, sin deduplicar (referencia)
+- blob_store: fragmentos deduplicados y comprimidos + el hash de cada fila
+
+Por defecto mide sin y con diccionario de compresión (armado con --samples
+unidades al azar, como migrate_blobs.py con las filas recientes), y también
+guardar() y cargar() por unidad, con la caché fría y caliente. Usa una BD
+SQLite en memoria salvo --url (una BD de pruebas: se crean las tablas blobs
+y blob_dictionaries).
+
+    cd backend
+    python -m benchmarks.bench_blob_store --output blobs.json
+    python -m benchmarks.bench_blob_store --projects 10 --units 200 --codec zlib
+"""
+import argparse
+import copy
+import json
+import platform
+import random
+import statistics
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.models.blob import Blob, BlobDictionary
+from app.services.blob_store import BlobStore, NIVEL_ZLIB
+from benchmarks import payloads
+
+
+def unidades_de_proyecto(proyecto: int, unidades: int) -> list:
+    """contract_data de las unidades de un proyecto (misma base, datos por unidad)"""
+    base = payloads.minuta_compraventa(seed=proyecto)
+    lista = []
+    for u in range(unidades):
+        rng = random.Random(proyecto * 100000 + u)
+        data = copy.deepcopy(base)
+        data["compradores"] = payloads.comparecientes_minuta(rng, rng.randint(1, 2))
+        data["predios"] = payloads.predios(rng, 2)
+        data["linderosEspecificos"] = payloads.linderos(rng, arriba_abajo=True)
+        data["ubicacion"]["numero"] = f"OE5-{u + 1}"
+        data["precioTotal"] = round(rng.uniform(50000, 400000), 2)
+        for parte, fraccion in zip(data["partesPago"], (0.3, 0.7)):
+            parte["monto"] = round(data["precioTotal"] * fraccion, 2)
+        lista.append(data)
+    return lista
+
+
+def _ms(tiempos: list) -> dict:
+    tiempos = sorted(tiempos)
+    return {
+        "mean_ms": round(statistics.mean(tiempos) * 1000, 3),
+        "p95_ms": round(tiempos[int(len(tiempos) * 0.95)] * 1000, 3),
+    }
+
+
+def _crear_tablas(engine):
+    Blob.__table__.drop(engine, checkfirst=True)
+    BlobDictionary.__table__.drop(engine, checkfirst=True)
+    BlobDictionary.__table__.create(engine)
+    Blob.__table__.create(engine)
+
+
+def medir(engine, codec: str, chunk_min: int, diccionario: bool, muestras: int, datos: list) -> dict:
+    _crear_tablas(engine)
+    store = BlobStore(codec, chunk_min, 64 * 1024 * 1024)
+    diccionario_bytes = 0
+
+    textos = [json.dumps(d, ensure_ascii=False).encode("utf-8") for d in datos]
+    hashes, t_guardar = [], []
+    with Session(engine) as db:
+        if diccionario:
+            store.entrenar(db, random.Random(0).sample(datos, muestras))
+            diccionario_bytes = len(db.execute(select(BlobDictionary.data)).scalar_one())
+        for d in datos:
+            inicio = time.perf_counter()
+            hashes.append(store.guardar(db, d))
+            db.commit()
+            t_guardar.append(time.perf_counter() - inicio)
+
+        fria = BlobStore(codec, chunk_min, 0)
+        t_fria, t_caliente = [], []
+        for h, d in zip(hashes, datos):
+            inicio = time.perf_counter()
+            leido = fria.cargar(db, h)
+            t_fria.append(time.perf_counter() - inicio)
+            inicio = time.perf_counter()
+            store.cargar(db, h)
+            t_caliente.append(time.perf_counter() - inicio)
+            assert leido == d
+
+        n_blobs, comprimido, crudo = db.execute(
+            select(func.count(), func.sum(func.length(Blob.data)), func.sum(Blob.raw_size))
+        ).one()
+
+    json_bytes = sum(len(t) for t in textos)
+    # Cada fila guarda además el hash (64 caracteres)
+    blob_bytes = comprimido + diccionario_bytes + 64 * len(datos)
+    return {
+        "codec": store.codec,
+        "chunk_min_bytes": chunk_min,
+        "dictionary_bytes": diccionario_bytes,
+        "rows": len(datos),
+        "json_bytes": json_bytes,
+        "json_zlib_bytes": sum(len(zlib.compress(t, NIVEL_ZLIB)) for t in textos),
+        "blob_store_bytes": blob_bytes,
+        "blobs": n_blobs,
+        "blobs_raw_bytes": crudo,
+        "saved_vs_json": round(1 - blob_bytes / json_bytes, 4),
+        "guardar": _ms(t_guardar),
+        "cargar_cold": _ms(t_fria),
+        "cargar_warm": _ms(t_caliente),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del blob store con minutas de proyectos")
+    parser.add_argument("--projects", type=int, default=4)
+    parser.add_argument("--units", type=int, default=250, help="unidades por proyecto")
+    parser.add_argument("--codec", choices=("zstd", "zlib"), action="append", help="por defecto los dos")
+    parser.add_argument("--chunk-min", type=int, action="append", help="BLOB_CHUNK_MIN_BYTES (por defecto 2048)")
+    parser.add_argument("--dictionary", choices=("on", "off"), action="append", help="por defecto los dos")
+    parser.add_argument("--samples", type=int, default=64, help="unidades para el diccionario")
+    parser.add_argument("--url", help="URL de SQLAlchemy (por defecto SQLite en memoria)")
+    parser.add_argument("--output", help="archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.url or "sqlite://")
+    datos = [d for p in range(args.projects) for d in unidades_de_proyecto(p, args.units)]
+
+    resultados = [
+        medir(engine, codec, chunk_min, dic == "on", args.samples, datos)
+        for codec in (args.codec or ["zstd", "zlib"])
+        for chunk_min in (args.chunk_min or [2048])
+        for dic in (args.dictionary or ["off", "on"])
+    ]
+    Blob.__table__.drop(engine, checkfirst=True)
+    BlobDictionary.__table__.drop(engine, checkfirst=True)
+
+    reporte = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "dialect": engine.dialect.name,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "projects": args.projects,
+            "units_per_project": args.units,
+        },
+        "results": resultados,
+    }
+
+    salida = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(salida, encoding="utf-8")
+    else:
+        print(salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Micro-benchmark de los generadores de documentos.
+
+Mide por separado cada etapa de generate_minuta_compraventa,
+generate_promesa_minuta y generate_matriz_compraventa:
+
+- context: armar el contexto a partir del formulario (build_*_context)
+- render:  doc.render() de docxtpl sobre la plantilla cacheada
+- save:    doc.save() a memoria + escritura del .docx en disco
+
+Reporta por escenario tiempos (media, p50, p95, mín, máx), documentos por
+segundo y memoria pico (tracemalloc, en una corrida aparte para no afectar
+los tiempos; solo cuenta memoria de Python, lxml reserva la suya aparte y
+se refleja en max_rss_bytes del proceso). La salida es JSON para comparar
+versiones:
+
+    cd backend
+    python -m benchmarks.bench_generators --output bench.json
+    python -m benchmarks.bench_generators --quick --only minuta
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from app.services.template_registry import template_registry
+from app.services.minuta_generator import TEMPLATES_DIR
+from app.services.renderers import RENDERERS as GENERADORES
+from benchmarks import payloads
+
+
+def escenarios(quick: bool = False) -> list:
+    """(generador, nombre, parámetros, payload)"""
+    lista = []
+    tamanos = [1, 10, 50] if quick else [1, 10, 50, 100, 200]
+
+    for tipo, builder in (("minuta", payloads.minuta_compraventa), ("promesa", payloads.promesa_minuta)):
+        for n in tamanos:
+            params = {"comparecientes": n, "num_predios": 2, "profundidad_aclaratorias": 2}
+            lista.append((tipo, f"comparecientes_{n}", params, builder(**params)))
+        casos = [
+            ("solo_solteros_50", {"comparecientes": 50, "conyuges": False, "empresas": False}),
+            ("matrimonios_50", {"comparecientes": 50, "conyuges": True, "empresas": False}),
+            ("empresas_50", {"comparecientes": 50, "conyuges": False, "empresas": True}),
+            ("aclaratorias_profundas", {"comparecientes": 4, "profundidad_aclaratorias": 8 if not quick else 4}),
+            ("muchos_predios", {"comparecientes": 4, "num_predios": 100 if not quick else 20}),
+        ]
+        for nombre, params in casos:
+            lista.append((tipo, nombre, params, builder(**params)))
+
+    for n in tamanos:
+        params = {"comparecientes": n, "parrafos_minuta": 20}
+        lista.append(("matriz", f"comparecientes_{n}", params, payloads.matriz_compraventa(**params)))
+    params = {"comparecientes": 4, "parrafos_minuta": 200 if not quick else 50}
+    lista.append(("matriz", "minuta_html_larga", params, payloads.matriz_compraventa(**params)))
+    return lista
+
+
+def correr_una_vez(tipo: str, data: dict, destino: Path) -> dict:
+    build, plantilla, render_kwargs = GENERADORES[tipo]
+    tiempos = {}
+
+    t0 = time.perf_counter()
+    context = build(data)
+    t1 = time.perf_counter()
+    doc = template_registry.get(TEMPLATES_DIR / plantilla)
+    doc.render(context, **render_kwargs)
+    t2 = time.perf_counter()
+    stream = io.BytesIO()
+    doc.save(stream)
+    with open(destino, "wb") as f:
+        f.write(stream.getvalue())
+    t3 = time.perf_counter()
+
+    tiempos["context"] = t1 - t0
+    tiempos["render"] = t2 - t1
+    tiempos["save"] = t3 - t2
+    tiempos["total"] = t3 - t0
+    tiempos["output_bytes"] = len(stream.getvalue())
+    return tiempos
+
+
+def resumen(valores: list) -> dict:
+    ordenados = sorted(valores)
+    p95 = ordenados[min(len(ordenados) - 1, int(round(0.95 * (len(ordenados) - 1))))]
+    return {
+        "mean_ms": round(statistics.mean(valores) * 1000, 3),
+        "p50_ms": round(statistics.median(valores) * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "min_ms": round(ordenados[0] * 1000, 3),
+        "max_ms": round(ordenados[-1] * 1000, 3),
+    }
+
+
+def medir(tipo: str, data: dict, repeticiones: int, warmup: int, directorio: Path) -> dict:
+    destino = directorio / f"{tipo}.docx"
+    for _ in range(warmup):
+        correr_una_vez(tipo, data, destino)
+
+    corridas = [correr_una_vez(tipo, data, destino) for _ in range(repeticiones)]
+
+    tracemalloc.start()
+    correr_una_vez(tipo, data, destino)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    totales = [c["total"] for c in corridas]
+    return {
+        "stages": {etapa: resumen([c[etapa] for c in corridas]) for etapa in ("context", "render", "save")},
+        "total": resumen(totales),
+        "docs_per_second": round(len(totales) / sum(totales), 3),
+        "peak_memory_bytes": pico,
+        "output_bytes": corridas[-1]["output_bytes"],
+    }
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, cwd=Path(__file__).parent
+        ).decode().strip()
+    except Exception:
+        return "desconocido"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de los generadores de documentos")
+    parser.add_argument("--repeat", type=int, default=5, help="corridas medidas por escenario")
+    parser.add_argument("--warmup", type=int, default=1, help="corridas previas sin medir")
+    parser.add_argument("--quick", action="store_true", help="escenarios reducidos")
+    parser.add_argument("--only", choices=sorted(GENERADORES), action="append", help="limitar a un generador")
+    parser.add_argument("--output", help="archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for tipo, nombre, params, data in escenarios(args.quick):
+            if args.only and tipo not in args.only:
+                continue
+            medicion = medir(tipo, data, args.repeat, args.warmup, Path(tmp))
+            resultados.append({
+                "generator": tipo,
+                "scenario": nombre,
+                "params": params,
+                "payload_bytes": len(json.dumps(data, ensure_ascii=False).encode("utf-8")),
+                **medicion,
+            })
+            print(f"{tipo:8s} {nombre:26s} {medicion['total']['mean_ms']:9.1f} ms  "
+                  f"{medicion['docs_per_second']:7.2f} docs/s  "
+                  f"{medicion['peak_memory_bytes'] / 1e6:7.1f} MB", file=sys.stderr)
+
+    reporte = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        },
+        "results": resultados,
+    }
+
+    salida = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(salida, encoding="utf-8")
+    else:
+        print(salida)
+
+
+if __name__ == "__main__":
+    main()
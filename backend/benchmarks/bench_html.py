@@ -0,0 +1,130 @@
+"""
+Benchmark de la conversión de HTML del editor (app/utils/html_to_richtext).
+
+Mide minutas pegadas desde Word de distintos tamaños (hasta 50 KB y más):
+
+- frio:     conversión completa (RichText + texto plano), caché vacía
+- caliente: la misma minuta otra vez (sale de la caché por hash)
+- bs4:      la implementación anterior con BeautifulSoup, si está instalado,
+            para comparar (un recorrido para RichText y otro para texto plano)
+
+    cd backend
+    python -m benchmarks.bench_html
+    python -m benchmarks.bench_html --kb 50 --repeat 20
+"""
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+
+from app.utils import html_to_richtext as conversor
+from benchmarks import payloads
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:  # bs4 ya no es dependencia de la app
+    BeautifulSoup = None
+
+
+def _bs4_richtext(html):
+    from docxtpl import RichText
+
+    def procesar(element, rt, bold=False, italic=False, underline=False):
+        for child in element.children:
+            if isinstance(child, str):
+                if child.strip():
+                    rt.add(child, bold=bold, italic=italic, underline=underline)
+                continue
+            tag = child.name.lower() if child.name else ''
+            b = bold or tag in ('b', 'strong')
+            i = italic or tag in ('i', 'em')
+            u = underline or tag == 'u'
+            if tag == 'br':
+                rt.add('\n')
+            elif tag == 'li':
+                rt.add('• ', bold=b, italic=i, underline=u)
+                procesar(child, rt, b, i, u)
+                rt.add('\n')
+            else:
+                procesar(child, rt, b, i, u)
+                if tag in ('p', 'div'):
+                    rt.add('\n')
+
+    rt = RichText()
+    procesar(BeautifulSoup(html, 'html.parser'), rt)
+    return rt
+
+
+def _bs4_texto(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    for br in soup.find_all("br"):
+        br.replace_with("\n")
+    for p in soup.find_all("p"):
+        p.insert_after("\n")
+    return re.sub(r'\n\s*\n', '\n\n', soup.get_text()).strip()
+
+
+def _medir(fn, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        tiempos.append(time.perf_counter() - inicio)
+    return {
+        "mean_ms": round(statistics.mean(tiempos) * 1000, 3),
+        "p50_ms": round(statistics.median(tiempos) * 1000, 3),
+        "min_ms": round(min(tiempos) * 1000, 3),
+    }
+
+
+def medir(html, repeticiones):
+    def frio():
+        conversor._cache.clear()
+        conversor.html_to_richtext(html)
+        conversor.html_to_text(html)
+
+    def caliente():
+        conversor.html_to_richtext(html)
+        conversor.html_to_text(html)
+
+    resultado = {"frio": _medir(frio, repeticiones)}
+    caliente()
+    resultado["caliente"] = _medir(caliente, repeticiones)
+    if BeautifulSoup is not None:
+        resultado["bs4"] = _medir(lambda: (_bs4_richtext(html), _bs4_texto(html)), repeticiones)
+        resultado["mismo_resultado"] = (
+            _bs4_richtext(html).xml == conversor.html_to_richtext(html).xml
+            and _bs4_texto(html) == conversor.html_to_text(html)
+        )
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de la conversión de HTML a RichText")
+    parser.add_argument("--kb", type=int, action="append", help="tamaño de la minuta en KB (por defecto 5, 20, 50, 200)")
+    parser.add_argument("--repeat", type=int, default=10, help="corridas medidas por tamaño")
+    parser.add_argument("--output", help="archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for kb in args.kb or [5, 20, 50, 200]:
+        html = payloads.minuta_html(kb)
+        medicion = medir(html, args.repeat)
+        resultados.append({"kb": kb, "html_bytes": len(html.encode("utf-8")), **medicion})
+        linea = f"{kb:4d} KB  frío {medicion['frio']['mean_ms']:8.2f} ms  caliente {medicion['caliente']['mean_ms']:6.3f} ms"
+        if "bs4" in medicion:
+            linea += f"  bs4 {medicion['bs4']['mean_ms']:8.2f} ms  igual={medicion['mismo_resultado']}"
+        print(linea, file=sys.stderr)
+
+    salida = json.dumps({"results": resultados}, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(salida)
+    else:
+        print(salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Payloads sintéticos con la misma forma que envía el frontend.
+
+Sirven para medir los generadores con escenarios realistas: muchos
+comparecientes, matrimonios, empresas, aclaratorias anidadas y muchos predios.
+"""
+import random
+
+NOMBRES = ["JUAN CARLOS", "MARÍA JOSÉ", "LUIS ALBERTO", "ANA LUCÍA", "PEDRO PABLO", "SOFÍA ISABEL"]
+APELLIDOS = ["PÉREZ GARCÍA", "ANDRADE LÓPEZ", "VILLACÍS MORA", "SALAZAR RUIZ", "ORTIZ CEVALLOS"]
+CANTONES = ["Quito", "Rumiñahui", "Cayambe", "Mejía"]
+
+
+def _cedula(rng):
+    return "".join(str(rng.randint(0, 9)) for _ in range(10))
+
+
+def _fecha(rng, desde=1940, hasta=2005):
+    return f"{rng.randint(desde, hasta)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+
+def persona_minuta(rng, casado_con=None):
+    """Compareciente natural en el formato del formulario de minutas"""
+    persona = {
+        'esEmpresa': False,
+        'names': rng.choice(NOMBRES),
+        'lastNames': rng.choice(APELLIDOS),
+        'documentNumber': _cedula(rng),
+        'phoneNumber': "09" + "".join(str(rng.randint(0, 9)) for _ in range(8)),
+        'birthdate': _fecha(rng),
+        'maritalStatus': 'soltero',
+        'nationality': 'ecuatoriana',
+        'profession': 'ingeniero',
+        'occupation': 'empleado privado',
+        'email': 'compareciente@example.com',
+        'address': f"Av. Amazonas N{rng.randint(10, 99)}-{rng.randint(10, 99)} y Colón",
+    }
+    if casado_con is not None:
+        persona['maritalStatus'] = 'casado'
+        persona['partner'] = {'documentNumber': casado_con['documentNumber']}
+        casado_con['maritalStatus'] = 'casado'
+        casado_con['partner'] = {'documentNumber': persona['documentNumber']}
+        persona['address'] = casado_con['address']
+    return persona
+
+
+def empresa_minuta(rng):
+    """Persona jurídica en el formato del formulario de minutas"""
+    return {
+        'esEmpresa': True,
+        'ruc': _cedula(rng) + "001",
+        'razonSocial': "Inmobiliaria Los Andes S.A.",
+        'mainStreet': "Av. República de El Salvador",
+        'numberStreet': "N34-183",
+        'secondaryStreet': "Suiza",
+        'sector': "Benalcázar",
+        'parroquia': "Iñaquito",
+        'canton': "Quito",
+        'province': "Pichincha",
+        'email': "info@example.com",
+        'phone': "022345678",
+        'repPosition': "Gerente General",
+        'repGender': "femenino",
+        'repNames': rng.choice(NOMBRES),
+        'repLastNames': rng.choice(APELLIDOS),
+        'repNationality': "ecuatoriana",
+        'repDocumentNumber': _cedula(rng),
+        'repBirthDate': _fecha(rng),
+        'repProfession': "abogada",
+        'repOccupation': "gerente",
+        'repMainStreet': "Calle Whymper",
+        'repNumberStreet': "E7-41",
+        'repSecondaryStreet': "Orellana",
+        'repParroquia': "Mariscal Sucre",
+        'repCanton': "Quito",
+        'repProvince': "Pichincha",
+    }
+
+
+def comparecientes_minuta(rng, total, con_conyuges=True, con_empresas=True):
+    """Lista de `total` comparecientes mezclando solteros, matrimonios y empresas"""
+    lista = []
+    while len(lista) < total:
+        restante = total - len(lista)
+        tirada = rng.random()
+        if con_empresas and tirada < 0.15:
+            lista.append(empresa_minuta(rng))
+        elif con_conyuges and restante >= 2 and tirada < 0.6:
+            uno = persona_minuta(rng)
+            otro = persona_minuta(rng, casado_con=uno)
+            lista.extend([uno, otro])
+        else:
+            lista.append(persona_minuta(rng))
+    return lista
+
+
+def aclaratorias(rng, profundidad, ancho=1):
+    """Aclaratorias anidadas `profundidad` niveles"""
+    if profundidad <= 0:
+        return []
+    return [
+        {
+            'titulo': 'compraventa',
+            'adquiridoDe': rng.choice(NOMBRES) + " " + rng.choice(APELLIDOS),
+            'fechaOtorgamiento': _fecha(rng, 1990, 2020),
+            'numeroNotaria': str(rng.randint(1, 99)),
+            'cantonNotaria': rng.choice(CANTONES),
+            'notario': "Dr. " + rng.choice(APELLIDOS),
+            'fechaInscripcion': _fecha(rng, 1990, 2020),
+            'cantonInscripcion': rng.choice(CANTONES),
+            'aclaratorias': aclaratorias(rng, profundidad - 1, ancho),
+        }
+        for _ in range(ancho)
+    ]
+
+
+def linderos(rng, arriba_abajo=False):
+    direcciones = ['norte', 'sur', 'este', 'oeste'] + (['arriba', 'abajo'] if arriba_abajo else [])
+    data = {
+        d: [{'metros': f"{rng.uniform(2, 30):.2f}", 'colindancia': f"Departamento {rng.randint(1, 50)}"}
+            for _ in range(rng.randint(1, 3))]
+        for d in direcciones
+    }
+    data['superficie'] = f"{rng.uniform(50, 200):.2f}"
+    return data
+
+
+def predios(rng, total):
+    return [
+        {
+            'tipo': rng.choice(['departamento', 'parqueadero', 'bodega']),
+            'numero': str(rng.randint(1, 999)),
+            'esCompuesto': True,
+            'inmuebles': [
+                {
+                    'tipo': 'departamento',
+                    'nivel': f"+{rng.randint(1, 20)}.00",
+                    'areaCubierta': f"{rng.uniform(30, 150):.2f}",
+                    'areaDescubierta': f"{rng.uniform(0, 20):.2f}",
+                    'alicuotaParcial': f"{rng.uniform(0.1, 2):.4f}",
+                }
+                for _ in range(rng.randint(1, 3))
+            ],
+            'alicuotaTotal': f"{rng.uniform(0.1, 5):.4f}",
+        }
+        for _ in range(total)
+    ]
+
+
+def minuta_compraventa(comparecientes=4, num_predios=2, profundidad_aclaratorias=2, seed=0,
+                       conyuges=True, empresas=True):
+    """Payload de POST /api/minutes/generate-minuta"""
+    rng = random.Random(seed)
+    mitad = max(1, comparecientes // 2)
+    precio = round(rng.uniform(50000, 400000), 2)
+    historia = aclaratorias(rng, 1)[0]
+    historia['aclaratorias'] = aclaratorias(rng, profundidad_aclaratorias)
+    declaratoria = aclaratorias(rng, 1)[0]
+    declaratoria['aclaratorias'] = aclaratorias(rng, profundidad_aclaratorias)
+    return {
+        'tipoContrato': 'compraventa',
+        'vendedores': comparecientes_minuta(rng, mitad, conyuges, empresas),
+        'compradores': comparecientes_minuta(rng, max(1, comparecientes - mitad), conyuges, empresas),
+        'tipoPropiedad': 'horizontal',
+        'nombreConjunto': 'Conjunto Habitacional Torres del Valle',
+        'predios': predios(rng, num_predios),
+        'ubicacion': {'lote': '12', 'numero': 'OE5-120', 'parroquia': 'Cumbayá',
+                      'canton': 'Quito', 'provincia': 'Pichincha'},
+        'modoHistoria': 'formulario',
+        'historiaFormulario': historia,
+        'modoDeclaratoria': 'formulario',
+        'declaratoriaFormulario': declaratoria,
+        'linderosGenerales': linderos(rng),
+        'tieneLInderosEspecificos': True,
+        'linderosEspecificos': linderos(rng, arriba_abajo=True),
+        'modoSujeto': 'formulario',
+        'modoPrecio': 'formulario',
+        'precioTotal': precio,
+        'partesPago': [
+            {'letra': 'a', 'monto': round(precio * 0.3, 2), 'tipoPago': 'contado', 'medioPago': 'transferencia',
+             'momentoPago': 'firma', 'tieneDetalle': True,
+             'detalle': {'bancoOrigen': 'Pichincha', 'cuentaOrigen': '2200112233', 'tipoCuentaOrigen': 'ahorros',
+                         'bancoDestino': 'Pacífico', 'cuentaDestino': '1055667788', 'tipoCuentaDestino': 'corriente'}},
+            {'letra': 'b', 'monto': round(precio * 0.7, 2), 'tipoPago': 'cuotas', 'numeroCuotas': 24,
+             'valorCuota': round(precio * 0.7 / 24, 2), 'periodicidad': 'mensual', 'medioPago': 'cheque',
+             'esCreditoBancario': True, 'nombreBanco': 'Banco del Pacífico'},
+        ],
+        'hayAdministrador': True,
+        'abogado': {'nombre': 'Ab. Carla Benítez', 'numeroMatricula': '17-2010-123',
+                    'tipoMatricula': 'cj', 'provincia': 'Pichincha', 'generoAbogado': 'femenino'},
+    }
+
+
+def promesa_minuta(comparecientes=4, num_predios=2, profundidad_aclaratorias=2, seed=0,
+                   conyuges=True, empresas=True):
+    """Payload de POST /api/minutes/generate-promesa"""
+    data = minuta_compraventa(comparecientes, num_predios, profundidad_aclaratorias, seed, conyuges, empresas)
+    data.update({
+        'tipoContrato': 'promesa',
+        'hayDeclaratoria': True,
+        'plazo': {'esFechaFija': False, 'anios': '1', 'meses': '6', 'dias': '15',
+                  'conProrroga': True, 'fechaProrroga': '2027-06-30'},
+        'clausulaPenal': {'tipoPenal': 'porcentaje', 'porcentaje': 10},
+        'hayCondicionResolutoria': True,
+        'propiedadIntelectual': {'nombreAbogado': 'Carla Benítez', 'generoAbogado': 'femenino'},
+    })
+    return data
+
+
+def persona_matriz(rng):
+    """Compareciente natural en el formato del formulario de matrices"""
+    return {
+        'esEmpresa': False,
+        'cedula': _cedula(rng),
+        'nombres': rng.choice(NOMBRES),
+        'apellidos': rng.choice(APELLIDOS),
+        'genero': rng.choice(['masculino', 'femenino']),
+        'estadoCivil': rng.choice(['soltero', 'casado', 'divorciado', 'viudo']),
+        'nacionalidad': 'ecuatoriana',
+        'fechaNacimiento': _fecha(rng),
+        'email': 'compareciente@example.com',
+        'telefono': "09" + "".join(str(rng.randint(0, 9)) for _ in range(8)),
+        'provincia': 'Pichincha',
+        'canton': 'Quito',
+        'parroquia': 'Iñaquito',
+        'sector': 'La Carolina',
+        'callePrincipal': 'Av. Amazonas',
+        'calleSecundaria': 'Naciones Unidas',
+        'numeroCalle': 'N36-152',
+        'ocupacion': 'empleado privado',
+        'profesion': 'ingeniero',
+    }
+
+
+def empresa_matriz(rng):
+    """Persona jurídica en el formato del formulario de matrices"""
+    return {
+        'esEmpresa': True,
+        'ruc': _cedula(rng) + "001",
+        'razonSocial': 'Constructora Andina Cía. Ltda.',
+        'email': 'info@example.com',
+        'telefono': '022345678',
+        'provincia': 'Pichincha',
+        'canton': 'Quito',
+        'parroquia': 'Iñaquito',
+        'callePrincipal': 'Av. Shyris',
+        'numeroCalle': 'N35-17',
+        'calleSecundaria': 'Suecia',
+        'repDocumentNumber': _cedula(rng),
+        'repNames': rng.choice(NOMBRES),
+        'repLastNames': rng.choice(APELLIDOS),
+        'repGenero': 'masculino',
+        'repNationality': 'ecuatoriana',
+        'repFechaNacimiento': _fecha(rng),
+        'repOccupation': 'gerente',
+        'repProfession': 'economista',
+        'repPosition': 'Gerente General',
+        'repProvincia': 'Pichincha',
+        'repCanton': 'Quito',
+        'repParroquia': 'Cumbayá',
+        'repCallePrincipal': 'Av. Interoceánica',
+    }
+
+
+def matriz_compraventa(comparecientes=4, parrafos_minuta=20, seed=0, empresas=True):
+    """Datos ya preparados para generate_matriz_compraventa (como los arma el endpoint)"""
+    rng = random.Random(seed)
+    participantes = [
+        empresa_matriz(rng) if empresas and rng.random() < 0.15 else persona_matriz(rng)
+        for _ in range(comparecientes)
+    ]
+    mitad = max(1, comparecientes // 2)
+    minuta = "".join(
+        f"<p><strong>CLÁUSULA {i}.-</strong> Texto de la cláusula con <em>énfasis</em> "
+        f"y <u>subrayado</u> sobre el inmueble número {i}.</p>"
+        for i in range(1, parrafos_minuta + 1)
+    )
+    return {
+        'numeroProtocolo': '2026-17-01-05-P01234',
+        'tipoContrato': 'COMPRAVENTA',
+        'cuantia': round(rng.uniform(50000, 400000), 2),
+        'fechaActual': '2026-03-16',
+        'notario': 'Dra. Gabriela Zambrano',
+        'tituloNotario': 'Notaria Quinta del Cantón Quito',
+        'matrizador': 'JP',
+        'isAnyTerceraEdad': False,
+        'needsConcuerdo': False,
+        'datosConcuerdo': None,
+        'abogadoNombre': 'Ab. Carla Benítez',
+        'abogadoNumeroMatricula': '17-2010-123',
+        'abogadoTipoMatricula': 'cj',
+        'abogadoProvincia': 'Pichincha',
+        'abogadoEsMujer': True,
+        'abogadoTexto': minuta,
+        'participantesList': participantes,
+        'vendedoresList': participantes[:mitad],
+        'compradoresList': participantes[mitad:],
+    }
+
+
+def minuta_html(kb=50, seed=0):
+    """
+    Minuta pegada en el editor desde Word, de unos `kb` kilobytes: párrafos con
+    spans de estilo, negritas/cursivas anidadas, listas, <o:p>, entidades y
+    comentarios condicionales
+    """
+    rng = random.Random(seed)
+    partes = ['<!--[if gte mso 9]><xml><o:OfficeDocumentSettings/></xml><![endif]-->']
+    total = len(partes[0])
+    i = 0
+    while total < kb * 1024:
+        i += 1
+        nombre = f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}"
+        if i % 7 == 0:
+            bloque = "<ul>" + "".join(
+                f'<li><span style="font-family:Arial">Inciso {j}: el inmueble ubicado en {rng.choice(CANTONES)}'
+                f' &nbsp;con <b>alícuota</b> {rng.randint(1, 99)}&#37;</span></li>'
+                for j in range(1, rng.randint(3, 6))
+            ) + "</ul>"
+        else:
+            bloque = (
+                f'<p class="MsoNormal" style="text-align:justify"><span style="font-size:11pt">'
+                f'<strong>CLÁUSULA {i}.-</strong> Comparece {nombre}, de estado civil '
+                f'<em>{rng.choice(["soltero", "casado", "divorciado"])}</em>, quien declara '
+                f'<u>bajo juramento</u> que el inmueble &quot;{rng.choice(CANTONES)}&quot; '
+                f'<b><i>no tiene gravámenes</i></b> &amp; se encuentra al día.<br>'
+                f'Valor: ${rng.randint(1000, 99999)}.{rng.randint(0, 99):02d}<o:p></o:p></span></p>\n'
+            )
+        partes.append(bloque)
+        total += len(bloque)
+    return "".join(partes)
@@ -0,0 +1,113 @@
+"""
+Pasa access_logs de id uuid4 en texto (VARCHAR(36)) a UUIDv7 en BINARY(16).
+
+Los uuid4 reparten los INSERT al azar por el índice clustered de InnoDB
+(divisiones de página a medida que la tabla crece); los UUIDv7 van al final.
+Cada fila recibe un UUIDv7 armado con su propio timestamp, así el orden
+del id coincide con el cronológico.
+
+Se copia a una tabla nueva en orden de timestamp, por lotes, y al final se
+intercambian los nombres; la tabla vieja queda como access_logs_uuid4
+(--drop-old la elimina). Correr con la API detenida: lo que la API nueva no
+pueda escribir mientras tanto queda en el archivo de respaldo del log y se
+recupera al arrancar.
+
+    python migrate_access_log_ids.py            # migrar
+    python migrate_access_log_ids.py --dry-run  # solo contar filas
+    python migrate_access_log_ids.py --drop-old # migrar y borrar la tabla vieja
+"""
+import sys
+import time
+from datetime import timezone
+
+from sqlalchemy import MetaData, String, inspect, select, text, insert, func, and_, or_
+
+from app.database import engine
+from app.models.access_log import AccessLog
+from app.utils.uuid7 import uuid7
+
+LOTE = 5000
+TABLA_VIEJA = "access_logs_uuid4"
+TABLA_NUEVA = "access_logs_v7"
+
+
+def _ms(ts) -> int:
+    if ts is None:
+        return time.time_ns() // 1_000_000
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp() * 1000)
+
+
+def _ya_migrada(tabla) -> bool:
+    """La tabla vieja tiene id de texto (VARCHAR(36))"""
+    return not isinstance(tabla.c.id.type, String)
+
+
+def migrate_access_log_ids(dry_run: bool = False, drop_old: bool = False):
+    inspector = inspect(engine)
+    if "access_logs" not in inspector.get_table_names():
+        print("⚠️  No existe la tabla access_logs")
+        return
+
+    vieja = MetaData()
+    vieja.reflect(bind=engine, only=["access_logs"])
+    origen = vieja.tables["access_logs"]
+    if _ya_migrada(origen):
+        print("✅ access_logs ya usa ids UUIDv7 en BINARY(16)")
+        return
+
+    with engine.connect() as conn:
+        total = conn.execute(select(func.count()).select_from(origen)).scalar()
+    print(f"   access_logs: {total} filas")
+    if dry_run:
+        print("✅ Simulación terminada (sin cambios)")
+        return
+
+    destino = AccessLog.__table__.to_metadata(MetaData(), name=TABLA_NUEVA)
+    destino.drop(engine, checkfirst=True)
+    destino.create(engine)
+
+    columnas = [c.key for c in destino.columns if c.key != "id"]
+    copiadas = 0
+    ultimo = None   # (timestamp, id) de la última fila copiada
+    inicio = time.perf_counter()
+
+    # Keyset por (timestamp, id): no depende de OFFSET, que se vuelve lento
+    while True:
+        consulta = select(origen).order_by(origen.c.timestamp, origen.c.id).limit(LOTE)
+        if ultimo is not None:
+            ts, id_ = ultimo
+            consulta = consulta.where(or_(
+                origen.c.timestamp > ts,
+                and_(origen.c.timestamp == ts, origen.c.id > id_),
+            ))
+        with engine.begin() as conn:
+            filas = conn.execute(consulta).mappings().all()
+            if not filas:
+                break
+            conn.execute(insert(destino), [
+                {"id": uuid7(_ms(fila["timestamp"])), **{c: fila[c] for c in columnas}}
+                for fila in filas
+            ])
+        ultimo = (filas[-1]["timestamp"], filas[-1]["id"])
+        copiadas += len(filas)
+        print(f"   {copiadas}/{total} filas ({copiadas / (time.perf_counter() - inicio):.0f} filas/s)")
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "mysql":
+            # Intercambio atómico
+            conn.execute(text(f"RENAME TABLE access_logs TO {TABLA_VIEJA}, {TABLA_NUEVA} TO access_logs"))
+        else:
+            conn.execute(text(f"ALTER TABLE access_logs RENAME TO {TABLA_VIEJA}"))
+            conn.execute(text(f"ALTER TABLE {TABLA_NUEVA} RENAME TO access_logs"))
+        if drop_old:
+            conn.execute(text(f"DROP TABLE {TABLA_VIEJA}"))
+
+    print(f"✅ {copiadas} filas migradas a UUIDv7")
+    if not drop_old:
+        print(f"   La tabla anterior quedó como {TABLA_VIEJA}")
+
+
+if __name__ == "__main__":
+    migrate_access_log_ids(dry_run="--dry-run" in sys.argv, drop_old="--drop-old" in sys.argv)
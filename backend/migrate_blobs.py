@@ -0,0 +1,414 @@
+"""
+Pasa templates.contenido y minutes.contract_data al blob store
+(app/services/blob_store.py): cada fila queda con el hash del JSON
+(contenido_hash / contract_data_hash) y el JSON, partido en fragmentos
+deduplicados y comprimidos, en la tabla blobs.
+
+Antes de migrar se arma el diccionario de compresión con las filas más
+recientes. Cada fila se comprueba leyéndola de vuelta desde la BD (sin
+caché). La columna vieja no se borra: queda como contenido_anterior /
+contract_data_anterior (sin NOT NULL, la API nueva no la escribe) hasta que
+se compruebe la versión nueva; --drop-old la elimina y recién entonces el
+hash pasa a NOT NULL con su FK a blobs (MySQL). Al final se informa el
+tamaño del JSON original frente a lo que ocupan los blobs nuevos; en MySQL,
+--drop-old informa además el tamaño en disco (con OPTIMIZE TABLE para
+liberar el espacio).
+
+Orden del despliegue:
+  1. Respaldo de la BD y API detenida.
+  2. python migrate_blobs.py              (con la versión nueva del código)
+  3. Arrancar la API nueva y comprobar plantillas, minutas y descargas.
+     Si algo falla: detener la API, python migrate_blobs.py --revertir y
+     volver a la versión anterior. Las filas creadas o editadas entre medio
+     se escriben de vuelta desde los blobs.
+  4. python migrate_blobs.py --drop-old   (sin vuelta atrás salvo el respaldo)
+  5. python migrate_blobs.py --gc cada tanto, con la API detenida: editar o
+     borrar minutas deja blobs sin uso que solo se borran así (con la API
+     en marcha podría borrar un blob que se está volviendo a usar).
+
+    python migrate_blobs.py            # migrar (la columna vieja queda como *_anterior)
+    python migrate_blobs.py --dry-run  # solo calcular el ahorro, sin cambios
+    python migrate_blobs.py --drop-old # borrar las columnas *_anterior
+    python migrate_blobs.py --revertir # volver a las columnas viejas
+    python migrate_blobs.py --gc       # borrar blobs que ya no usa ninguna fila
+    python migrate_blobs.py --train    # diccionario nuevo con los formularios recientes
+                                       # (lo usan los blobs que se guarden tras reiniciar la API)
+"""
+import json
+import sys
+import time
+
+from sqlalchemy import delete, func, inspect, select, text
+
+from app.config import settings
+from app.database import engine, SessionLocal
+from app.models import party, system_user, document, minute, company, template, registration_token, access_log, generation_job, blob  # noqa: F401
+from app.models.blob import Blob, BlobDictionary
+from app.models.minute import Minute
+from app.models.template import Template
+from app.services.blob_store import BlobStore, armar_diccionario, blob_store
+
+LOTE = 500
+MUESTRAS = 64   # formularios recientes para el diccionario
+# tabla, columna vieja, columna nueva
+COLUMNAS = [
+    ("templates", "contenido", "contenido_hash"),
+    ("minutes", "contract_data", "contract_data_hash"),
+]
+
+
+def _anterior(vieja: str) -> str:
+    return f"{vieja}_anterior"
+
+
+def _columnas(tabla: str) -> set:
+    return {c["name"] for c in inspect(engine).get_columns(tabla)}
+
+
+def _tipo_mysql(conn, tabla: str, columna: str) -> str:
+    return conn.execute(text(
+        "SELECT column_type FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = :t AND column_name = :c"
+    ), {"t": tabla, "c": columna}).scalar()
+
+
+def _mb(n: int) -> str:
+    return f"{n / 1024 / 1024:.2f} MB"
+
+
+def _tamano_tablas(tablas):
+    """Datos + índices en disco (solo MySQL)"""
+    if engine.dialect.name != "mysql":
+        return None
+    with engine.connect() as conn:
+        return sum(
+            conn.execute(text(
+                "SELECT data_length + index_length FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = :t"
+            ), {"t": t}).scalar() or 0
+            for t in tablas
+        )
+
+
+def _parsear(valor):
+    """El JSON de la columna vieja (JSON en templates, texto en minutes)"""
+    if not isinstance(valor, str):
+        return valor
+    try:
+        return json.loads(valor)
+    except ValueError:
+        return valor
+
+
+def _filas(tabla: str, vieja: str, nueva=None):
+    """(id, valor) de las filas pendientes, por lotes en orden de id"""
+    ultimo = 0
+    pendiente = f" AND {nueva} IS NULL" if nueva else ""
+    while True:
+        with engine.connect() as conn:
+            filas = conn.execute(text(
+                f"SELECT id, {vieja} FROM {tabla} WHERE id > :ultimo{pendiente} ORDER BY id LIMIT {LOTE}"
+            ), {"ultimo": ultimo}).all()
+        if not filas:
+            return
+        yield filas
+        ultimo = filas[-1][0]
+
+
+def _muestras_columnas(pendientes):
+    """Los formularios más recientes de las columnas viejas, el más nuevo al final"""
+    muestras = []
+    with engine.connect() as conn:
+        for tabla, vieja, _ in pendientes:
+            filas = conn.execute(text(f"SELECT {vieja} FROM {tabla} ORDER BY id DESC LIMIT {MUESTRAS}")).scalars()
+            muestras.extend(reversed([_parsear(v) for v in filas]))
+    return muestras
+
+
+def _muestras_blobs(db):
+    """Los formularios más recientes ya guardados en blobs, el más nuevo al final"""
+    hashes = []
+    for columna in (Template.contenido_hash, Minute.contract_data_hash):
+        filas = db.execute(select(columna).order_by(columna.class_.id.desc()).limit(MUESTRAS)).scalars()
+        hashes.extend(reversed(list(filas)))
+    valores = blob_store.cargar_varios(db, hashes)
+    return [valores[h] for h in hashes]
+
+
+def simular(pendientes):
+    """Ahorro que daría la migración, sin escribir nada"""
+    diccionario = armar_diccionario(_muestras_columnas(pendientes)) or None
+    vistos = set()
+    original = crudo = comprimido = 0
+    for tabla, vieja, _ in pendientes:
+        for filas in _filas(tabla, vieja):
+            for _, valor in filas:
+                original += len(valor.encode("utf-8") if isinstance(valor, str) else json.dumps(valor).encode("utf-8"))
+                _, blobs = blob_store.partir(_parsear(valor))
+                for h, raw in blobs.items():
+                    if h not in vistos:
+                        vistos.add(h)
+                        crudo += len(raw)
+                        comprimido += len(blob_store.comprimir(raw, diccionario))
+    return original, crudo, comprimido, len(vistos)
+
+
+def migrar_columna(tabla: str, vieja: str, nueva: str, verificador: BlobStore) -> int:
+    columnas = {c["name"] for c in inspect(engine).get_columns(tabla)}
+    if nueva not in columnas:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {tabla} ADD COLUMN {nueva} VARCHAR(64) NULL"))
+
+    migradas = 0
+    inicio = time.perf_counter()
+    for filas in _filas(tabla, vieja, nueva):
+        db = SessionLocal()
+        try:
+            hashes = {}
+            for id_, valor in filas:
+                hashes[id_] = blob_store.guardar(db, _parsear(valor))
+                db.execute(text(f"UPDATE {tabla} SET {nueva} = :h WHERE id = :id"), {"h": hashes[id_], "id": id_})
+            db.commit()
+
+            # Lectura desde la BD, no desde la caché del blob_store que escribió
+            leidos = verificador.cargar_varios(db, set(hashes.values()))
+            for id_, valor in filas:
+                if leidos[hashes[id_]] != _parsear(valor):
+                    raise RuntimeError(f"{tabla} {id_}: el blob no coincide con el original")
+        finally:
+            db.close()
+        migradas += len(filas)
+        print(f"   {tabla}: {migradas} filas ({migradas / (time.perf_counter() - inicio):.0f} filas/s)")
+    return migradas
+
+
+def _sin_hash(conn, tabla: str, vieja: str, nueva: str):
+    sin_hash = conn.execute(text(f"SELECT COUNT(*) FROM {tabla} WHERE {nueva} IS NULL")).scalar()
+    if sin_hash:
+        raise RuntimeError(f"{tabla}: {sin_hash} filas sin {nueva}, no se toca {vieja}")
+
+
+def retirar_columna(tabla: str, vieja: str, nueva: str):
+    """La columna vieja pasa a *_anterior, sin NOT NULL (la API nueva no la escribe)"""
+    with engine.begin() as conn:
+        _sin_hash(conn, tabla, vieja, nueva)
+        if engine.dialect.name == "mysql":
+            tipo = _tipo_mysql(conn, tabla, vieja)
+            conn.execute(text(f"ALTER TABLE {tabla} CHANGE {vieja} {_anterior(vieja)} {tipo} NULL"))
+        else:
+            # SQLite (desarrollo): no puede quitar NOT NULL, se copia a una columna nueva
+            conn.execute(text(f"ALTER TABLE {tabla} ADD COLUMN {_anterior(vieja)} TEXT NULL"))
+            conn.execute(text(f"UPDATE {tabla} SET {_anterior(vieja)} = {vieja}"))
+            conn.execute(text(f"ALTER TABLE {tabla} DROP COLUMN {vieja}"))
+    print(f"   {tabla}.{vieja} queda como {_anterior(vieja)} hasta --drop-old")
+
+
+def migrate_blobs(dry_run: bool = False):
+    BlobDictionary.__table__.create(engine, checkfirst=True)
+    Blob.__table__.create(engine, checkfirst=True)
+    inspector = inspect(engine)
+    tablas_bd = set(inspector.get_table_names())
+    pendientes = [
+        (tabla, vieja, nueva) for tabla, vieja, nueva in COLUMNAS
+        if tabla in tablas_bd and vieja in {c["name"] for c in inspector.get_columns(tabla)}
+    ]
+    if not pendientes:
+        print("✅ templates y minutes ya guardan su JSON en blobs")
+        return
+
+    if dry_run:
+        original, crudo, comprimido, n = simular(pendientes)
+        print(f"   JSON actual: {_mb(original)}")
+        print(f"   Blobs: {n} ({_mb(crudo)} sin comprimir, {_mb(comprimido)} con {blob_store.codec})")
+        if original:
+            print(f"   Ahorro estimado: {100 * (1 - comprimido / original):.1f}%")
+        print("✅ Simulación terminada (sin cambios)")
+        return
+
+    with engine.connect() as conn:
+        original = sum(
+            conn.execute(text(f"SELECT COALESCE(SUM(LENGTH({vieja})), 0) FROM {tabla}")).scalar()
+            for tabla, vieja, _ in pendientes
+        )
+        blobs_antes = conn.execute(select(func.count(), func.coalesce(func.sum(func.length(Blob.data)), 0))).one()
+
+    diccionario_bytes = 0
+    db = SessionLocal()
+    try:
+        if not db.execute(select(func.count()).select_from(BlobDictionary)).scalar():
+            muestras = _muestras_columnas(pendientes)
+            if muestras:
+                dict_id = blob_store.entrenar(db, muestras)
+                diccionario_bytes = len(armar_diccionario(muestras))
+                print(f"   Diccionario {dict_id} con {len(muestras)} formularios ({_mb(diccionario_bytes)})")
+    finally:
+        db.close()
+
+    verificador = BlobStore(blob_store.codec, settings.BLOB_CHUNK_MIN_BYTES, 0)
+    for tabla, vieja, nueva in pendientes:
+        migrar_columna(tabla, vieja, nueva, verificador)
+        retirar_columna(tabla, vieja, nueva)
+
+    with engine.connect() as conn:
+        blobs_despues = conn.execute(select(func.count(), func.coalesce(func.sum(func.length(Blob.data)), 0))).one()
+    nuevos = blobs_despues[0] - blobs_antes[0]
+    comprimido = blobs_despues[1] - blobs_antes[1] + diccionario_bytes
+    print(f"   JSON original: {_mb(original)}")
+    print(f"   Blobs nuevos: {nuevos} ({_mb(comprimido)} con {blob_store.codec}, diccionario incluido)")
+    if original:
+        print(f"   Ahorro: {100 * (1 - comprimido / original):.1f}%")
+    print("✅ Migración terminada; comprobar la API nueva y después correr --drop-old (o --revertir)")
+
+
+def _retiradas():
+    """(tabla, vieja, nueva) con la columna *_anterior todavía en la BD"""
+    tablas_bd = set(inspect(engine).get_table_names())
+    return [
+        (tabla, vieja, nueva) for tabla, vieja, nueva in COLUMNAS
+        if tabla in tablas_bd and _anterior(vieja) in _columnas(tabla)
+    ]
+
+
+def quitar_anteriores(dry_run: bool = False):
+    """Borra las columnas *_anterior; antes comprueba que todos los blobs de todas las filas se leen"""
+    retiradas = _retiradas()
+    if not retiradas:
+        print("✅ No quedan columnas *_anterior")
+        return
+
+    db = SessionLocal()
+    try:
+        verificador = BlobStore(blob_store.codec, settings.BLOB_CHUNK_MIN_BYTES, 0)
+        for tabla, vieja, nueva in retiradas:
+            with engine.connect() as conn:
+                _sin_hash(conn, tabla, vieja, nueva)
+            raices = set(db.execute(text(f"SELECT DISTINCT {nueva} FROM {tabla}")).scalars())
+            # LookupError si falta alguno
+            print(f"   {tabla}: {len(verificador.alcanzables(db, raices))} blobs alcanzables, todos presentes")
+    finally:
+        db.close()
+    if dry_run:
+        print("✅ Simulación terminada (sin cambios)")
+        return
+
+    tablas = [t for t, _, _ in retiradas] + ["blobs"]
+    disco_antes = _tamano_tablas(tablas)
+    for tabla, vieja, nueva in retiradas:
+        with engine.begin() as conn:
+            if engine.dialect.name == "mysql":
+                conn.execute(text(
+                    f"ALTER TABLE {tabla} DROP COLUMN {_anterior(vieja)}, MODIFY {nueva} VARCHAR(64) NOT NULL, "
+                    f"ADD CONSTRAINT fk_{tabla}_{nueva} FOREIGN KEY ({nueva}) REFERENCES blobs(hash)"
+                ))
+            else:
+                # SQLite (desarrollo): no puede cambiar NOT NULL ni agregar la FK a una tabla existente
+                conn.execute(text(f"ALTER TABLE {tabla} DROP COLUMN {_anterior(vieja)}"))
+        print(f"   {tabla}.{_anterior(vieja)} borrada")
+
+    if engine.dialect.name == "mysql":
+        with engine.connect() as conn:
+            for tabla in tablas:
+                conn.execute(text(f"OPTIMIZE TABLE {tabla}"))
+        print(f"   En disco (datos + índices): {_mb(disco_antes)} → {_mb(_tamano_tablas(tablas))}")
+    print("✅ Columnas anteriores borradas")
+
+
+def _como_columna(tabla: str, valor):
+    """El valor como lo guardaba la columna vieja (inverso de _parsear)"""
+    if tabla == "minutes" and isinstance(valor, str):
+        return valor   # contract_data que no era JSON
+    return json.dumps(valor, ensure_ascii=False)
+
+
+def revertir(dry_run: bool = False):
+    """
+    Vuelve de *_anterior a la columna vieja, para correr la versión anterior
+    de la API. Las filas creadas o editadas después de migrar (sin valor
+    anterior o con uno distinto del blob) se escriben desde los blobs.
+    """
+    retiradas = _retiradas()
+    if not retiradas:
+        print("⚠️  No hay columnas *_anterior: ya se corrió --drop-old (queda el respaldo) o no se migró")
+        return
+
+    verificador = BlobStore(blob_store.codec, settings.BLOB_CHUNK_MIN_BYTES, 0)
+    for tabla, vieja, nueva in retiradas:
+        reescritas = 0
+        for filas in _filas(tabla, f"{_anterior(vieja)}, {nueva}"):
+            db = SessionLocal()
+            try:
+                valores = verificador.cargar_varios(db, {h for _, _, h in filas})
+                cambios = [
+                    {"id": id_, "v": _como_columna(tabla, valores[h])}
+                    for id_, anterior, h in filas
+                    if anterior is None or _parsear(anterior) != valores[h]
+                ]
+                if cambios and not dry_run:
+                    db.execute(text(f"UPDATE {tabla} SET {_anterior(vieja)} = :v WHERE id = :id"), cambios)
+                    db.commit()
+            finally:
+                db.close()
+            reescritas += len(cambios)
+        print(f"   {tabla}: {reescritas} filas {'a escribir' if dry_run else 'escritas'} desde los blobs")
+        if dry_run:
+            continue
+
+        with engine.begin() as conn:
+            if engine.dialect.name == "mysql":
+                tipo = _tipo_mysql(conn, tabla, _anterior(vieja))
+                conn.execute(text(f"ALTER TABLE {tabla} CHANGE {_anterior(vieja)} {vieja} {tipo} NOT NULL"))
+            else:
+                conn.execute(text(f"ALTER TABLE {tabla} RENAME COLUMN {_anterior(vieja)} TO {vieja}"))
+            # La versión anterior no conoce el hash: si quedara, sus INSERT lo dejarían vacío
+            conn.execute(text(f"ALTER TABLE {tabla} DROP COLUMN {nueva}"))
+        print(f"   {tabla}.{vieja} restaurada")
+    if dry_run:
+        print("✅ Simulación terminada (sin cambios)")
+        return
+    print("✅ Columnas restauradas: desplegar la versión anterior de la API (los blobs quedan en su tabla)")
+
+
+def recolectar(dry_run: bool = False):
+    """Borra los blobs que no alcanza ninguna plantilla ni minuta"""
+    db = SessionLocal()
+    try:
+        raices = set(db.execute(select(Template.contenido_hash)).scalars())
+        raices.update(db.execute(select(Minute.contract_data_hash)).scalars())
+        usados = blob_store.alcanzables(db, raices)
+        huerfanos = [h for h in db.execute(select(Blob.hash)).scalars() if h not in usados]
+        print(f"   {len(usados)} blobs en uso, {len(huerfanos)} sin uso")
+        if dry_run or not huerfanos:
+            return
+        for i in range(0, len(huerfanos), LOTE):
+            db.execute(delete(Blob).where(Blob.hash.in_(huerfanos[i:i + LOTE])))
+        db.commit()
+        print(f"✅ {len(huerfanos)} blobs borrados")
+    finally:
+        db.close()
+
+
+def entrenar():
+    """Diccionario nuevo con los formularios más recientes del blob store"""
+    db = SessionLocal()
+    try:
+        muestras = _muestras_blobs(db)
+        if not muestras:
+            print("⚠️  No hay formularios guardados para armar el diccionario")
+            return
+        dict_id = blob_store.entrenar(db, muestras)
+        print(f"✅ Diccionario {dict_id} con {len(muestras)} formularios (se usa al reiniciar la API)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if "--train" in sys.argv:
+        entrenar()
+    elif "--drop-old" in sys.argv:
+        quitar_anteriores(dry_run="--dry-run" in sys.argv)
+    elif "--revertir" in sys.argv:
+        revertir(dry_run="--dry-run" in sys.argv)
+    elif "--gc" in sys.argv:
+        recolectar(dry_run="--dry-run" in sys.argv)
+    else:
+        migrate_blobs(dry_run="--dry-run" in sys.argv)
@@ -0,0 +1,94 @@
+"""
+Agrega la columna file_hash (SHA-256 del .docx, ETag de las descargas) a
+minutes, documents y generation_jobs, y la completa leyendo cada archivo
+guardado del storage configurado.
+
+Los registros sin file_hash se siguen descargando (el ETag sale de la clave
+del archivo), así que se puede correr con la API en marcha. Los registros
+cuyo archivo ya no existe (retención) quedan sin hash.
+
+    python migrate_file_hashes.py            # agregar la columna y completar
+    python migrate_file_hashes.py --dry-run  # solo contar lo pendiente
+"""
+import sys
+import time
+
+from sqlalchemy import inspect, text
+
+from app.database import engine
+from app.services.storage import document_storage, hash_contenido
+
+LOTE = 200
+# tabla, id menor que cualquiera (generation_jobs usa UUID)
+TABLAS = [("minutes", 0), ("documents", 0), ("generation_jobs", "")]
+
+
+def _filas(tabla: str, ultimo):
+    """(id, file_path) pendientes, por lotes en orden de id"""
+    while True:
+        with engine.connect() as conn:
+            filas = conn.execute(text(
+                f"SELECT id, file_path FROM {tabla} "
+                f"WHERE file_hash IS NULL AND file_path IS NOT NULL AND id > :ultimo ORDER BY id LIMIT {LOTE}"
+            ), {"ultimo": ultimo}).all()
+        if not filas:
+            return
+        yield filas
+        ultimo = filas[-1][0]
+
+
+def completar(tabla: str, primero) -> tuple:
+    completadas = sin_archivo = 0
+    inicio = time.perf_counter()
+    for filas in _filas(tabla, primero):
+        hashes = []
+        for id_, key in filas:
+            if not document_storage.exists(key):
+                sin_archivo += 1
+                continue
+            hashes.append({"id": id_, "h": hash_contenido(document_storage.read(key))})
+        if hashes:
+            with engine.begin() as conn:
+                conn.execute(text(f"UPDATE {tabla} SET file_hash = :h WHERE id = :id"), hashes)
+        completadas += len(hashes)
+        print(f"   {tabla}: {completadas} archivos ({completadas / (time.perf_counter() - inicio):.0f}/s)")
+    return completadas, sin_archivo
+
+
+def migrate_file_hashes(dry_run: bool = False):
+    inspector = inspect(engine)
+    tablas_bd = set(inspector.get_table_names())
+    tablas = [(t, primero) for t, primero in TABLAS if t in tablas_bd]
+
+    for tabla, _ in tablas:
+        if "file_hash" in {c["name"] for c in inspector.get_columns(tabla)}:
+            continue
+        if dry_run:
+            print(f"   Falta {tabla}.file_hash")
+            continue
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {tabla} ADD COLUMN file_hash VARCHAR(64) NULL"))
+        print(f"   {tabla}.file_hash agregada")
+
+    if dry_run:
+        with engine.connect() as conn:
+            for tabla, _ in tablas:
+                columnas = {c["name"] for c in inspector.get_columns(tabla)}
+                pendiente = " AND file_hash IS NULL" if "file_hash" in columnas else ""
+                n = conn.execute(text(f"SELECT COUNT(*) FROM {tabla} WHERE file_path IS NOT NULL{pendiente}")).scalar()
+                print(f"   {tabla}: {n} archivos sin hash")
+        print("✅ Simulación terminada (sin cambios)")
+        return
+
+    total = faltantes = 0
+    for tabla, primero in tablas:
+        completadas, sin_archivo = completar(tabla, primero)
+        total += completadas
+        faltantes += sin_archivo
+    if faltantes:
+        print(f"⚠️  {faltantes} registros apuntan a archivos que ya no existen (quedan sin hash)")
+    print(f"✅ {total} archivos con hash")
+
+
+if __name__ == "__main__":
+    migrate_file_hashes(dry_run="--dry-run" in sys.argv)
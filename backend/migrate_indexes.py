@@ -0,0 +1,50 @@
+"""
+Crea los índices declarados en los modelos que falten en la BD
+(create_all no agrega índices a tablas que ya existen).
+
+En InnoDB (MySQL 5.6+) ADD INDEX es una operación en línea: la tabla sigue
+aceptando INSERT mientras se construye el índice.
+
+    python migrate_indexes.py            # crear los que falten
+    python migrate_indexes.py --dry-run  # solo mostrar cuáles faltan
+"""
+import sys
+import time
+
+from sqlalchemy import inspect
+
+from app.database import engine, Base
+from app.models import party, system_user, document, minute, company, template, registration_token, access_log, generation_job, blob  # noqa: F401
+
+
+def migrate_indexes(dry_run: bool = False):
+    inspector = inspect(engine)
+    tablas_bd = set(inspector.get_table_names())
+    creados = 0
+
+    for tabla in Base.metadata.sorted_tables:
+        if tabla.name not in tablas_bd:
+            continue
+        existentes = {ix["name"] for ix in inspector.get_indexes(tabla.name)}
+        for index in sorted(tabla.indexes, key=lambda ix: ix.name):
+            if index.name in existentes:
+                continue
+            columnas = ", ".join(c.name for c in index.columns)
+            if dry_run:
+                print(f"   Falta {tabla.name}.{index.name} ({columnas})")
+                continue
+            inicio = time.perf_counter()
+            index.create(engine)
+            creados += 1
+            print(f"   {tabla.name}.{index.name} ({columnas}) creado en {time.perf_counter() - inicio:.1f} s")
+
+    if dry_run:
+        print("✅ Simulación terminada (sin cambios)")
+    elif creados:
+        print(f"✅ {creados} índices creados")
+    else:
+        print("✅ Todos los índices ya existen")
+
+
+if __name__ == "__main__":
+    migrate_indexes(dry_run="--dry-run" in sys.argv)
@@ -0,0 +1,46 @@
+"""
+Agrega la columna version a parties y companies (ETag de GET /api/users/{id}
+y GET /api/companies/{ruc}). Las filas existentes empiezan en 1.
+
+En MySQL 8 ADD COLUMN con DEFAULT es instantáneo (no reescribe la tabla).
+
+    python migrate_row_versions.py            # agregar la columna donde falte
+    python migrate_row_versions.py --dry-run  # solo mostrar dónde falta
+"""
+import sys
+
+from sqlalchemy import inspect, text
+
+from app.database import engine
+
+TABLAS = ["parties", "companies"]
+
+
+def migrate_row_versions(dry_run: bool = False):
+    inspector = inspect(engine)
+    tablas_bd = set(inspector.get_table_names())
+    agregadas = 0
+
+    for tabla in TABLAS:
+        if tabla not in tablas_bd:
+            continue
+        if "version" in {c["name"] for c in inspector.get_columns(tabla)}:
+            continue
+        if dry_run:
+            print(f"   Falta {tabla}.version")
+            continue
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {tabla} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+        agregadas += 1
+        print(f"   {tabla}.version agregada")
+
+    if dry_run:
+        print("✅ Simulación terminada (sin cambios)")
+    elif agregadas:
+        print(f"✅ {agregadas} columnas agregadas")
+    else:
+        print("✅ parties y companies ya tienen version")
+
+
+if __name__ == "__main__":
+    migrate_row_versions(dry_run="--dry-run" in sys.argv)
@@ -0,0 +1,80 @@
+"""
+Pasa los documentos guardados con path absoluto (generated_documents/ plano)
+al storage configurado y deja en la BD la clave relativa.
+
+    python migrate_storage.py            # migrar
+    python migrate_storage.py --dry-run  # solo mostrar qué se haría
+"""
+import hashlib
+import os
+import sys
+
+from app.database import SessionLocal
+from app.models import party, system_user, company, template, registration_token, access_log, blob  # noqa: F401
+from app.models.minute import Minute
+from app.models.document import Document
+from app.models.generation_job import GenerationJob
+from app.services.storage import document_storage, LocalStorage
+
+
+def clave_para(path: str) -> str:
+    nombre = os.path.basename(path)
+    h = hashlib.sha1(nombre.encode()).hexdigest()
+    return f"{h[:2]}/{h[2:4]}/{nombre}"
+
+
+def migrar_archivo(path: str, dry_run: bool) -> str:
+    key = clave_para(path)
+    if dry_run:
+        return key
+    if isinstance(document_storage, LocalStorage):
+        destino = document_storage.local_path(key)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        os.replace(path, destino)
+    else:
+        with open(path, "rb") as f:
+            document_storage.write(key, f.read())
+        os.remove(path)
+    return key
+
+
+def migrate_storage(dry_run: bool = False):
+    db = SessionLocal()
+    migrados = {}   # path absoluto -> clave (un job y su Minute comparten archivo)
+    faltantes = 0
+
+    try:
+        for modelo in (Minute, Document, GenerationJob):
+            registros = db.query(modelo).filter(modelo.file_path.isnot(None)).all()
+            actualizados = 0
+            for registro in registros:
+                path = registro.file_path
+                if not os.path.isabs(path):
+                    continue
+                if path not in migrados:
+                    if not os.path.exists(path):
+                        faltantes += 1
+                        continue
+                    migrados[path] = migrar_archivo(path, dry_run)
+                registro.file_path = migrados[path]
+                actualizados += 1
+            print(f"   {modelo.__tablename__}: {actualizados} registros")
+
+        if dry_run:
+            db.rollback()
+            print("✅ Simulación terminada (sin cambios)")
+        else:
+            db.commit()
+            print(f"✅ {len(migrados)} archivos migrados")
+        if faltantes:
+            print(f"   ⚠️  {faltantes} registros apuntan a archivos que ya no existen")
+
+    except Exception as e:
+        print(f"❌ Error al migrar: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate_storage(dry_run="--dry-run" in sys.argv)
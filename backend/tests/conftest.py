@@ -0,0 +1,33 @@
+"""
+app.config exige las variables de conexión; las pruebas que necesitan BD
+usan la fixture db_sqlite (SQLite en un archivo temporal).
+
+    cd backend
+    python -m pytest tests
+"""
+import os
+
+import pytest
+
+for _nombre, _valor in {
+    "DB_HOST": "localhost", "DB_PORT": "3306", "DB_USER": "test",
+    "DB_PASSWORD": "test", "DB_NAME": "test", "SECRET_KEY": "test",
+}.items():
+    os.environ.setdefault(_nombre, _valor)
+
+
+@pytest.fixture
+def db_sqlite(tmp_path):
+    """SessionLocal apuntando a una BD SQLite nueva con todas las tablas"""
+    from sqlalchemy import create_engine
+
+    from app import database
+    from app.models import party, system_user, document, minute, company, template, registration_token, access_log, generation_job, blob  # noqa: F401
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    database.Base.metadata.create_all(bind=engine)
+    anterior = database.SessionLocal.kw["bind"]
+    database.SessionLocal.configure(bind=engine)
+    yield database.SessionLocal
+    database.SessionLocal.configure(bind=anterior)
+    engine.dispose()
@@ -0,0 +1,175 @@
+"""
+Comparación diferencial de app/utils/number_to_words.py contra la versión
+anterior (tests/number_to_words_baseline.py).
+
+Cada entrada se convierte con las dos versiones. Una diferencia solo se
+acepta si cae en uno de los errores corregidos de la versión anterior:
+
+- veintiseis: algún grupo de tres cifras termina en 26 ("veintidós")
+- apocope:    un grupo antes de "mil" o "millones" termina en 1 ("veintiuno mil")
+- billones:   10^12 o más ("millones millones")
+- negativo:   números negativos (palabras del final de la tabla)
+- decimales:  la parte decimal anterior no es la exacta (ceros iniciales
+              perdidos, ruido de punto flotante); la nueva siempre se compara
+              con la exacta, Decimal(repr(x)) redondeado a MAX_DECIMALES
+- ordinal:    decenas 40, 50, 60, 70 y 90 con unidad ("Cuodrogésimo")
+
+Cualquier otra diferencia es una regresión. Sin argumentos corre la muestra
+reducida que usa tests/test_number_to_words.py; --exhaustivo corre las ~3,8
+millones de entradas de la comparación original (varios minutos).
+
+    cd backend
+    python -m tests.diferencial_number_to_words --exhaustivo
+"""
+import argparse
+import random
+import sys
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.utils import number_to_words as nuevo
+from tests import number_to_words_baseline as anterior
+
+_ORDINALES_CORREGIDOS = {40, 50, 60, 70, 90}
+
+
+def _grupos(n: int) -> list:
+    """Grupos de tres cifras, del menos significativo al más"""
+    grupos = []
+    while n:
+        n, g = divmod(n, 1000)
+        grupos.append(g)
+    return grupos
+
+
+def motivo_entero(n: int):
+    """Error corregido que explica una diferencia en el entero n, o None"""
+    if n < 0:
+        return "negativo"
+    if n >= 10 ** 12:
+        return "billones"
+    grupos = _grupos(n)
+    if any(g % 100 == 26 for g in grupos):
+        return "veintiseis"
+    if any(g > 1 and g % 10 == 1 and g % 100 != 11 for g in grupos[1:]):
+        return "apocope"
+    return None
+
+
+def decimales_exactos(valor) -> str:
+    """Dígitos en letras de la parte decimal exacta ('' si no tiene)"""
+    d = Decimal(repr(valor)) if isinstance(valor, float) else Decimal(str(valor).strip().replace(",", "."))
+    d = abs(d).quantize(Decimal(1).scaleb(-nuevo.MAX_DECIMALES))
+    fraccion = str(d).partition(".")[2].rstrip("0")
+    return nuevo.numero_a_digitos(fraccion) if fraccion else ""
+
+
+def comparar_numero(valor):
+    """Lista de (motivo, entrada, anterior, nueva) para numero_a_letras(valor)"""
+    viejo, actual = anterior.numero_a_letras(valor), nuevo.numero_a_letras(valor)
+    if isinstance(valor, int) or (isinstance(valor, str) and "." not in valor and "," not in valor):
+        if viejo == actual:
+            return []
+        return [(motivo_entero(int(valor)), valor, viejo, actual)]
+
+    diferencias = []
+    entero = int(Decimal(repr(valor)) if isinstance(valor, float) else Decimal(str(valor).replace(",", ".")))
+    viejo_entero, _, viejo_dec = viejo.partition(" coma ")
+    actual_entero, _, actual_dec = actual.partition(" coma ")
+    if actual_dec != decimales_exactos(valor):
+        # La versión nueva siempre debe dar la parte decimal exacta
+        diferencias.append((None, valor, viejo, actual))
+    elif viejo_dec != actual_dec:
+        diferencias.append(("decimales", valor, viejo, actual))
+    if viejo_entero != actual_entero:
+        diferencias.append((motivo_entero(entero), valor, viejo, actual))
+    return diferencias
+
+
+def comparar_fecha(d: date):
+    texto = d.isoformat()
+    viejo, actual = anterior.formatear_fecha_notarial(texto), nuevo.formatear_fecha_notarial(texto)
+    if viejo == actual:
+        return []
+    return [(motivo_entero(d.year), texto, viejo, actual)]
+
+
+def comparar_ordinal(n: int):
+    viejo, actual = anterior.numero_a_ordinal_notaria(n), nuevo.numero_a_ordinal_notaria(n)
+    if viejo == actual:
+        return []
+    corregido = 20 <= n < 100 and n % 10 and (n // 10) * 10 in _ORDINALES_CORREGIDOS
+    return [("ordinal" if corregido else None, n, viejo, actual)]
+
+
+def comparar_identicas(fn: str, valor):
+    """Funciones que no cambiaron de resultado"""
+    viejo, actual = getattr(anterior, fn)(valor), getattr(nuevo, fn)(valor)
+    return [] if viejo == actual else [(None, f"{fn}({valor!r})", viejo, actual)]
+
+
+def casos(exhaustivo: bool = False):
+    """(nombre, función de comparación, entradas)"""
+    rng = random.Random(2026)
+    enteros = 2_000_001 if exhaustivo else 200_001
+    centavos = 1_000_001 if exhaustivo else 100_001
+    aleatorios = 200_000 if exhaustivo else 10_000
+    textos = 50_000 if exhaustivo else 5_000
+    cadenas = 300_000 if exhaustivo else 10_000
+    desde, hasta = (date(1900, 1, 1), date(2100, 12, 31)) if exhaustivo else (date(1990, 1, 1), date(2040, 12, 31))
+
+    yield "enteros", comparar_numero, range(enteros)
+    yield "enteros grandes", comparar_numero, (rng.randrange(10 ** 15) for _ in range(aleatorios))
+    yield "montos con centavos", comparar_numero, (c / 100 for c in range(centavos))
+    yield "float aleatorios", comparar_numero, (
+        round(rng.uniform(0, 10 ** rng.randint(1, 9)), rng.randint(1, 6)) for _ in range(aleatorios)
+    )
+    yield "textos", comparar_numero, (
+        f"{rng.randrange(10 ** 7)}{rng.choice(['.', ','])}{rng.randrange(100):02d}" for _ in range(textos)
+    )
+    yield "fechas", comparar_fecha, (desde + timedelta(days=i) for i in range((hasta - desde).days + 1))
+    yield "ordinales", comparar_ordinal, range(-5, 2001)
+    yield "dígitos", lambda v: comparar_identicas("numero_a_digitos", v), (
+        "".join(rng.choice("0123456789-") for _ in range(rng.randint(1, 12))) for _ in range(cadenas)
+    )
+    yield "números de casa", lambda v: comparar_identicas("numero_casa_a_letras", v), (
+        f"{rng.choice(['N', 'S', 'E', 'OE', ''])}{rng.randint(1, 99)}-{rng.randint(1, 999)}" for _ in range(cadenas)
+    )
+    yield "días del mes", lambda v: comparar_identicas("dia_mes_letras", v), range(1, 32)
+
+
+def correr(exhaustivo: bool = False):
+    """(Counter de motivos aceptados, lista de regresiones, entradas revisadas)"""
+    aceptadas, regresiones, total = Counter(), [], 0
+    for _, comparar, entradas in casos(exhaustivo):
+        for valor in entradas:
+            total += 1
+            for motivo, entrada, viejo, actual in comparar(valor):
+                if motivo is None:
+                    regresiones.append((entrada, viejo, actual))
+                else:
+                    aceptadas[motivo] += 1
+    return aceptadas, regresiones, total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comparación de number_to_words con la versión anterior")
+    parser.add_argument("--exhaustivo", action="store_true", help="las ~3,8 millones de entradas")
+    args = parser.parse_args(argv)
+
+    aceptadas, regresiones, total = correr(args.exhaustivo)
+    print(f"{total} entradas revisadas")
+    for motivo, n in sorted(aceptadas.items()):
+        print(f"   {motivo}: {n} diferencias (error corregido)")
+    for entrada, viejo, actual in regresiones[:20]:
+        print(f"   REGRESIÓN {entrada!r}: {viejo!r} -> {actual!r}")
+    if regresiones:
+        print(f"❌ {len(regresiones)} diferencias sin explicar")
+        return 1
+    print("✅ Solo difieren los errores corregidos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Un render más largo que el lease: el trabajo se retoma y solo cuenta el
+resultado del reclamo vigente.
+"""
+from datetime import datetime, timedelta
+
+from app.models.generation_job import GenerationJob, JobStatus, JobType
+from app.models.minute import Minute
+from app.services.job_queue import JobQueue
+
+
+def _encolar(SessionLocal) -> str:
+    db = SessionLocal()
+    job = GenerationJob(job_type=JobType.MINUTA, payload={"vendedores": [{"nombre": "X"}]}, created_by=1)
+    db.add(job)
+    db.commit()
+    job_id = job.id
+    db.close()
+    return job_id
+
+
+def _vencer_lease(SessionLocal, job_id: str):
+    db = SessionLocal()
+    db.query(GenerationJob).filter(GenerationJob.id == job_id).update(
+        {GenerationJob.started_at: datetime.utcnow() - timedelta(days=1)}
+    )
+    db.commit()
+    db.close()
+
+
+def _estado(SessionLocal, job_id: str):
+    db = SessionLocal()
+    job = db.query(GenerationJob).filter(GenerationJob.id == job_id).one()
+    minutas = [m.id for m in db.query(Minute).all()]
+    db.close()
+    return job, minutas
+
+
+def test_intento_vencido_no_completa(db_sqlite):
+    cola = JobQueue()
+    job_id = _encolar(db_sqlite)
+
+    assert cola._claim() == (job_id, 1)
+    _vencer_lease(db_sqlite, job_id)
+    assert cola._claim() == (job_id, 2)
+
+    # El primer worker termina tarde: no crea registro ni toca el trabajo
+    assert cola._complete(job_id, 1, "a/viejo.docx", "h1") is False
+    job, minutas = _estado(db_sqlite, job_id)
+    assert job.status == JobStatus.PROCESANDO and minutas == []
+
+    assert cola._complete(job_id, 2, "b/nuevo.docx", "h2") is True
+    job, minutas = _estado(db_sqlite, job_id)
+    assert job.status == JobStatus.COMPLETADO
+    assert minutas == [job.result_id] and job.file_path == "b/nuevo.docx"
+
+    # Ni un error tardío ni un segundo _complete cambian el trabajo terminado
+    assert cola._fail(job_id, 1, "render viejo") is False
+    assert cola._complete(job_id, 2, "c/otra.docx", "h3") is False
+    job, minutas = _estado(db_sqlite, job_id)
+    assert job.status == JobStatus.COMPLETADO and job.error is None
+    assert minutas == [job.result_id] and job.file_path == "b/nuevo.docx"
+
+
+def test_error_tardio_no_pisa_el_reclamo_vigente(db_sqlite):
+    cola = JobQueue()
+    job_id = _encolar(db_sqlite)
+
+    cola._claim()
+    _vencer_lease(db_sqlite, job_id)
+    cola._claim()
+
+    assert cola._fail(job_id, 1, "render viejo") is False
+    job, _ = _estado(db_sqlite, job_id)
+    assert job.status == JobStatus.PROCESANDO and job.attempts == 2
+
+    assert cola._fail(job_id, 2, "falló") is True
+    job, _ = _estado(db_sqlite, job_id)
+    assert job.status == JobStatus.ERROR and job.error == "falló"
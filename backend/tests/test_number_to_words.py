@@ -0,0 +1,103 @@
+"""
+Montos, ordinales y fechas que se escriben en los documentos.
+
+GOLDEN fija el texto de los errores corregidos en la versión por tablas
+(26, ceros decimales, apócope, billones, negativos, ordinales) y de algunos
+casos que no cambiaron; la prueba diferencial compara una muestra contra la
+versión anterior (tests/diferencial_number_to_words.py, que también corre la
+comparación exhaustiva con --exhaustivo).
+"""
+import pytest
+
+from app.utils.number_to_words import (
+    fechas_notariales,
+    formatear_fecha_notarial,
+    numero_a_letras,
+    numero_a_ordinal_notaria,
+    numeros_a_letras,
+)
+from tests import diferencial_number_to_words
+
+GOLDEN = [
+    # 26 se escribía "veintidós"
+    (26, "veintiséis"),
+    (126, "ciento veintiséis"),
+    (26000, "veintiséis mil"),
+    (2026, "dos mil veintiséis"),
+    # Ceros iniciales de la parte decimal
+    (1.05, "uno coma cero cinco"),
+    (0.05, "cero coma cero cinco"),
+    ("1500,05", "mil quinientos coma cero cinco"),
+    # Ruido de punto flotante
+    (7836727.1, "siete millones ochocientos treinta y seis mil setecientos veintisiete coma uno"),
+    # Apócope antes de mil y millones
+    (21000, "veintiún mil"),
+    (31000, "treinta y un mil"),
+    (21000000, "veintiún millones"),
+    (101000000, "ciento un millones"),
+    # Billones
+    (10 ** 12, "un billón"),
+    (2 * 10 ** 12 + 26, "dos billones veintiséis"),
+    # Negativos
+    (-3, "menos tres"),
+    (-1.5, "menos uno coma cinco"),
+    # Sin cambios
+    (0, "cero"),
+    (1, "uno"),
+    (100, "cien"),
+    (1000, "mil"),
+    (1000000, "un millón"),
+    (1001000, "un millón mil"),
+    (1250.5, "mil doscientos cincuenta coma cinco"),
+    ("", "cero"),
+    (None, "cero"),
+]
+
+GOLDEN_ORDINALES = [
+    (1, "Primera"),
+    (13, "Décimo Tercera"),
+    (22, "Vigésimo Segunda"),
+    (30, "Trigésima"),
+    # Las decenas reemplazaban cada "a" ("Cuodrogésimo")
+    (41, "Cuadragésimo Primera"),
+    (57, "Quincuagésimo Séptima"),
+    (63, "Sexagésimo Tercera"),
+    (78, "Septuagésimo Octava"),
+    (99, "Nonagésimo Novena"),
+    (100, "Notaría No. 100"),
+    ("Notaría 41", "Cuadragésimo Primera"),
+]
+
+GOLDEN_FECHAS = [
+    ("2026-01-26", "lunes veintiséis de enero del año dos mil veintiséis"),
+    ("2025-12-31", "miércoles treinta y uno de diciembre del año dos mil veinticinco"),
+    ("2000-02-29", "martes veintinueve de febrero del año dos mil"),
+]
+
+
+@pytest.mark.parametrize("valor, esperado", GOLDEN)
+def test_numero_a_letras(valor, esperado):
+    assert numero_a_letras(valor) == esperado
+
+
+@pytest.mark.parametrize("valor, esperado", GOLDEN_ORDINALES)
+def test_ordinales(valor, esperado):
+    assert numero_a_ordinal_notaria(valor) == esperado
+
+
+@pytest.mark.parametrize("fecha, esperado", GOLDEN_FECHAS)
+def test_fechas(fecha, esperado):
+    assert formatear_fecha_notarial(fecha) == esperado
+
+
+def test_lotes_igual_que_uno_a_uno():
+    valores = [v for v, _ in GOLDEN]
+    assert numeros_a_letras(valores) == [numero_a_letras(v) for v in valores]
+    fechas = [f for f, _ in GOLDEN_FECHAS]
+    assert fechas_notariales(fechas) == [formatear_fecha_notarial(f) for f in fechas]
+
+
+def test_diferencial_contra_version_anterior():
+    aceptadas, regresiones, _ = diferencial_number_to_words.correr()
+    assert regresiones == []
+    assert set(aceptadas) == {"veintiseis", "apocope", "billones", "decimales", "ordinal"}
@@ -0,0 +1,44 @@
+"""
+Las entradas del caché son copias propias: un acierto no rejuvenece el
+archivo guardado en el storage (retención) y expulsarlas libera disco.
+"""
+import os
+import time
+
+from app.services import render_cache as modulo
+from app.services.render_cache import RenderCache
+from app.services.storage import LocalStorage, apply_retention
+
+
+def test_acierto_no_cambia_el_archivo_guardado(tmp_path, monkeypatch):
+    storage = LocalStorage(tmp_path / "storage")
+    monkeypatch.setattr(modulo, "document_storage", storage)
+    cache = RenderCache(tmp_path / "cache", 10 * 1024 * 1024)
+    clave = "ab" * 32
+
+    cache.save(clave, b"docx" * 100, "aa/bb/minuta.docx")
+    guardado = storage.local_path("aa/bb/minuta.docx")
+    entrada = cache._path(clave)
+    assert os.stat(guardado).st_ino != os.stat(entrada).st_ino
+    assert os.stat(guardado).st_nlink == 1
+
+    viejo = time.time() - 40 * 86400
+    os.utime(guardado, (viejo, viejo))
+    assert cache.lookup(clave) == b"docx" * 100
+    assert os.stat(guardado).st_mtime == viejo
+    assert apply_retention(storage, max_age_days=30)["deleted"] == 1
+    assert cache.lookup(clave) == b"docx" * 100
+
+
+def test_recorrido_quita_hard_links_de_versiones_anteriores(tmp_path):
+    cache = RenderCache(tmp_path / "cache", 10 * 1024 * 1024)
+    guardado = tmp_path / "guardado.docx"
+    guardado.write_bytes(b"x" * 1000)
+    enlazada = cache._path("cd" * 32)
+    enlazada.parent.mkdir(parents=True)
+    os.link(guardado, enlazada)
+    cache.store_bytes("ef" * 32, b"y" * 500)
+
+    cache._recorrer()
+    assert not enlazada.exists() and guardado.exists()
+    assert cache.stats()["entries"] == 1 and cache.stats()["bytes"] == 500
@@ -0,0 +1,60 @@
+"""
+Reciclar el pool mientras otros hilos envían trabajos: ningún envío debe
+caer en el pool que se está cerrando.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.render_pool import RenderPool
+
+
+class _PoolDeHilos(RenderPool):
+    """Mismo ciclo de vida con hilos: submit tras shutdown también da RuntimeError"""
+
+    def _create_executor(self):
+        self._tasks = 0
+        return ThreadPoolExecutor(max_workers=self.size)
+
+
+def _doble(x):
+    return 2 * x
+
+
+def test_reciclar_con_envios_concurrentes():
+    pool = _PoolDeHilos()
+    pool.size = 2
+    pool.max_tasks = 3          # un pool nuevo cada 3 trabajos
+    pool._executor = pool._create_executor()
+    errores, resultados = [], []
+
+    def enviar(base):
+        for i in range(300):
+            try:
+                resultados.append(pool.run_sync(_doble, base + i))
+            except Exception as e:
+                errores.append(e)
+
+    hilos = [threading.Thread(target=enviar, args=(n * 1000,)) for n in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    pool.shutdown()
+
+    assert errores == []
+    assert sorted(resultados) == sorted(2 * (n * 1000 + i) for n in range(8) for i in range(300))
+
+
+def test_pool_roto_se_reemplaza_y_reintenta():
+    from concurrent.futures.process import BrokenProcessPool
+
+    class _Roto(ThreadPoolExecutor):
+        def submit(self, *args, **kwargs):
+            raise BrokenProcessPool("un proceso murió")
+
+    pool = _PoolDeHilos()
+    pool.size = 1
+    pool._executor = _Roto(max_workers=1)
+    assert pool.run_sync(_doble, 21) == 42
+    assert not isinstance(pool._executor, _Roto)
+    pool.shutdown()
@@ -0,0 +1,71 @@
+"""
+La firma de templates se compara cada TEMPLATE_INDEX_CHECK_SECONDS y fuera
+del lock: las búsquedas concurrentes no esperan la consulta ni la recarga.
+"""
+import threading
+
+from app.models.template import Template
+from app.services.blob_store import blob_store
+from app.services.template_index import TemplateIndex
+
+
+def _alta(SessionLocal, nombre: str):
+    db = SessionLocal()
+    db.add(Template(
+        nombre=nombre, nombre_vendedor="Vendedor", tipo_contrato="compraventa",
+        tipo_documento="minuta", contenido_hash=blob_store.guardar(db, {}), creado_por=1,
+    ))
+    db.commit()
+    db.close()
+
+
+def _nombres(indice, SessionLocal, q):
+    db = SessionLocal()
+    try:
+        return [r["nombre"] for r in indice.buscar(db, q)]
+    finally:
+        db.close()
+
+
+def test_firma_cada_intervalo_e_invalidar(db_sqlite):
+    indice = TemplateIndex(intervalo=3600)
+    _alta(db_sqlite, "Torre Peña")
+    assert _nombres(indice, db_sqlite, "pena") == ["Torre Peña"]
+
+    # Alta de otro proceso: no se ve hasta que toque comparar la firma
+    _alta(db_sqlite, "Casa Peñón")
+    assert _nombres(indice, db_sqlite, "pen") == ["Torre Peña"]
+    indice.intervalo = 0
+    assert sorted(_nombres(indice, db_sqlite, "pen")) == ["Casa Peñón", "Torre Peña"]
+
+    # Alta de este proceso: invalidar() recarga en la búsqueda siguiente
+    indice.intervalo = 3600
+    _alta(db_sqlite, "Edificio Peñas")
+    indice.invalidar()
+    assert len(_nombres(indice, db_sqlite, "pen")) == 3
+    assert indice.reloads == 3
+
+
+def test_busquedas_no_esperan_la_recarga(db_sqlite):
+    indice = TemplateIndex(intervalo=0)
+    _alta(db_sqlite, "Torre Peña")
+    assert _nombres(indice, db_sqlite, "pena") == ["Torre Peña"]
+    _alta(db_sqlite, "Casa Peñón")
+
+    cargando, seguir = threading.Event(), threading.Event()
+    cargar = TemplateIndex._cargar
+
+    def cargar_lento(db):
+        cargando.set()
+        assert seguir.wait(5)
+        return cargar(db)
+
+    indice._cargar = cargar_lento
+    hilo = threading.Thread(target=_nombres, args=(indice, db_sqlite, "pen"))
+    hilo.start()
+    assert cargando.wait(5)
+    # Otra búsqueda mientras se recarga: usa el índice vigente sin esperar
+    assert _nombres(indice, db_sqlite, "pen") == ["Torre Peña"]
+    seguir.set()
+    hilo.join()
+    assert sorted(_nombres(indice, db_sqlite, "pen")) == ["Casa Peñón", "Torre Peña"]
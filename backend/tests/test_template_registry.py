@@ -0,0 +1,47 @@
+"""
+CachedDocxTemplate sobrescribe métodos internos de docxtpl (init_docx,
+build_xml, build_headers_footers_xml, render_xml_part). Esta prueba renderiza
+cada plantilla real con DocxTemplate y con el registro y exige las mismas
+partes XML byte a byte: si una versión nueva de docxtpl cambia esos métodos,
+falla aquí antes de llegar a los documentos.
+"""
+import zipfile
+from io import BytesIO
+
+import pytest
+from docxtpl import DocxTemplate
+
+from app.services.minuta_generator import TEMPLATES_DIR
+from app.services.renderers import RENDERERS
+from app.services.template_registry import template_registry
+from benchmarks import payloads
+
+PAYLOADS = {
+    "minuta": lambda: payloads.minuta_compraventa(comparecientes=4, num_predios=2, profundidad_aclaratorias=2),
+    "promesa": lambda: payloads.promesa_minuta(comparecientes=4, num_predios=2, profundidad_aclaratorias=2),
+    "matriz": lambda: payloads.matriz_compraventa(comparecientes=4, parrafos_minuta=5),
+}
+
+
+def _partes_xml(doc) -> dict:
+    stream = BytesIO()
+    doc.save(stream)
+    with zipfile.ZipFile(stream) as z:
+        return {n: z.read(n) for n in z.namelist() if n.endswith(".xml")}
+
+
+@pytest.mark.parametrize("tipo", sorted(RENDERERS))
+def test_mismo_xml_que_docxtpl(tipo):
+    build, plantilla, render_kwargs = RENDERERS[tipo]
+
+    original = DocxTemplate(str(TEMPLATES_DIR / plantilla))
+    original.render(build(PAYLOADS[tipo]()), **render_kwargs)
+
+    # Dos renders con el mismo clon de la caché: el segundo usa lo ya compilado
+    for _ in range(2):
+        cacheado = template_registry.get(TEMPLATES_DIR / plantilla)
+        cacheado.render(build(PAYLOADS[tipo]()), **render_kwargs)
+        esperado, obtenido = _partes_xml(original), _partes_xml(cacheado)
+        assert obtenido.keys() == esperado.keys()
+        for nombre in esperado:
+            assert obtenido[nombre] == esperado[nombre], nombre